@@ -0,0 +1,143 @@
+import sys
+import os
+import json
+import time
+import argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+from fft_matcher import (FrameSpectra, match_template_fft, choose_backend, spatial_cost, fft_cost, fft_frame_cost,
+                         BACKEND_AUTO, BACKEND_FFT, BACKEND_SPATIAL)
+from image_finder_client import ImageFinderClient, ImageFinderConfig, as_template
+from replay_backends import SyntheticScreenSource
+from replay_telemetry import percentile
+
+# Spatial (cv2.matchTemplate) vs frequency-domain NCC over a template-size x search-size matrix.
+# Also reports what the cost model in fft_matcher would pick, to calibrate the SPATIAL_*/FFT_* cost constants.
+# --check times the whole scale x method grid with MATCH_BACKEND spatial, fft and auto and exits with 1
+# if auto is slower than both fixed backends in any cell.
+# Usage: python bench_fft_match.py [--templates 16,32,64,128,256] [--searches 100x100,960x540,1920x1080,3840x2160] [--check]
+
+CHECK_TOLERANCE = 0.10  # timing noise allowed before auto counts as slower
+
+
+def time_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return percentile(timings, 50)
+
+
+def bench_cell(search_gray, templ_gray, repeats: int):
+    """One grid cell = both MATCHING_METHODS for one template, as _match_gray runs it."""
+    methods = (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED)
+    spatial_ms = time_ms(lambda: [cv2.matchTemplate(search_gray, templ_gray, m) for m in methods], repeats)
+
+    shape = (cv2.getOptimalDFTSize(search_gray.shape[0]), cv2.getOptimalDFTSize(search_gray.shape[1]))
+    start = time.perf_counter()
+    warm = FrameSpectra(search_gray)
+    warm.spectrum(shape)
+    warm.integrals()
+    frame_ms = (time.perf_counter() - start) * 1000.0
+
+    def fft_cell():
+        # frame spectrum/integrals are shared per screenshot, correlation and window norms are per template
+        warm.clear_template_cache()
+        return [match_template_fft(warm, templ_gray, m) for m in methods]
+
+    fft_ms = time_ms(fft_cell, repeats)
+    a = cv2.minMaxLoc(cv2.matchTemplate(search_gray, templ_gray, methods[0]))
+    b = cv2.minMaxLoc(fft_cell()[0])
+    # the frame spectrum is shared by every scale of the grid
+    scales = len(ImageFinderConfig.SCALE_FACTORS)
+    winner = "fft" if fft_ms + frame_ms / scales < spatial_ms else "spatial"
+    picked = choose_backend(search_gray.shape, [templ_gray.shape] * scales, BACKEND_AUTO, methods=len(methods))
+    return {
+        "spatial_ms": round(spatial_ms, 3),
+        "fft_ms": round(fft_ms, 3),
+        "fft_frame_ms": round(frame_ms, 3),
+        "model_spatial_ms": round(2 * spatial_cost(search_gray.shape, templ_gray.shape) * 1000.0, 3),
+        "model_fft_ms": round(fft_cost(search_gray.shape, templ_gray.shape) * 1000.0, 3),
+        "model_fft_frame_ms": round(fft_frame_cost(search_gray.shape) * 1000.0, 3),
+        "winner": winner,
+        "auto": picked,
+        "same_peak": a[3] == b[3],
+        "peak_diff": round(abs(a[1] - b[1]), 6),
+    }
+
+
+def check_cell(search_gray, templ_gray, repeats: int):
+    """
+    Whole grid per backend as _match_gray runs it (fresh frame spectra each call, no pruning, no early exit).
+    Backends run interleaved and the fastest repeat counts, so load changes hit all three alike.
+    """
+    finders = {backend: ImageFinderClient(workers=1, early_exit=1.01, backend=backend, full_search="single",
+                                          adaptive=False, cache_size=0, prefilter=False)
+               for backend in (BACKEND_SPATIAL, BACKEND_FFT, BACKEND_AUTO)}
+    samples = {backend: [] for backend in finders}
+    for _ in range(repeats):
+        for backend, finder in finders.items():
+            start = time.perf_counter()
+            finder._match_gray(search_gray, templ_gray)
+            samples[backend].append((time.perf_counter() - start) * 1000.0)
+    timings = {backend: min(values) for backend, values in samples.items()}
+    fastest = min(timings[BACKEND_SPATIAL], timings[BACKEND_FFT])
+    slowest = max(timings[BACKEND_SPATIAL], timings[BACKEND_FFT])
+    tasks, _ = finders[BACKEND_AUTO]._grid_tasks(as_template(templ_gray), search_gray.shape)
+    shapes = list(dict.fromkeys(task[0].shape[:2] for task in tasks))
+    return {
+        "spatial_grid_ms": round(timings[BACKEND_SPATIAL], 3),
+        "fft_grid_ms": round(timings[BACKEND_FFT], 3),
+        "auto_grid_ms": round(timings[BACKEND_AUTO], 3),
+        "auto": choose_backend(search_gray.shape, shapes, BACKEND_AUTO, methods=len(ImageFinderConfig.MATCHING_METHODS)),
+        "auto_vs_fastest": round(timings[BACKEND_AUTO] / fastest, 3) if fastest else None,
+        "auto_loses": timings[BACKEND_AUTO] > slowest * (1.0 + CHECK_TOLERANCE),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FFT vs spatial template matching benchmark")
+    parser.add_argument("--templates", default="16,32,64,128,256")
+    parser.add_argument("--searches", default="100x100,960x540,1920x1080,3840x2160")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", default="")
+    parser.add_argument("--check", action="store_true", help="fail if auto is slower than both fixed backends")
+    args = parser.parse_args()
+
+    results = []
+    for search in args.searches.split(","):
+        width, height = (int(v) for v in search.lower().split("x"))
+        for size in (int(s) for s in args.templates.split(",") if s):
+            if size > min(width, height):
+                continue
+            icon = SyntheticScreenSource.make_icon(size, seed=size)
+            screen = SyntheticScreenSource(width, height, seed=1, placements=[(icon, (width - size) // 2, (height - size) // 2)])
+            search_gray = cv2.cvtColor(screen.grab(), cv2.COLOR_BGR2GRAY)
+            templ_gray = cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY)
+            row = {"bench": "fft_match", "search": search, "template": size}
+            row.update(check_cell(search_gray, templ_gray, args.repeats) if args.check
+                       else bench_cell(search_gray, templ_gray, args.repeats))
+            results.append(row)
+            print(json.dumps(row))
+
+    failed = []
+    if args.check:
+        failed = [r for r in results if r["auto_loses"]]
+        print(f"auto slower than both fixed backends in {len(failed)}/{len(results)} cells "
+              f"(worst auto/fastest ratio {max((r['auto_vs_fastest'] or 0) for r in results) if results else 0}).")
+    else:
+        agree = sum(1 for r in results if r["auto"] == r["winner"])
+        print(f"Cost model picked the faster backend in {agree}/{len(results)} cells "
+              f"(fft faster in {sum(1 for r in results if r['winner'] == BACKEND_FFT)}).")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.out}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
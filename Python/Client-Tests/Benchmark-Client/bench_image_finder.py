@@ -0,0 +1,210 @@
+import sys
+import os
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+import numpy as np
+from image_finder_client import ImageFinderClient, ImageFinderConfig
+from replay_backends import SyntheticScreenSource
+from replay_telemetry import percentile
+
+# Reproducible finder benchmark and accuracy suite: synthetic screenshots with known icon
+# placements under scale jitter, noise and theme shifts, run through every finder method.
+# Reports latency percentiles, hit rate and peak traced memory per scenario and method.
+# Usage: python bench_image_finder.py [--cases 10] [--methods TEMPLATE,PYRAMID,ORB,SIFT] [--out finder.json]
+#        python bench_image_finder.py --baseline finder_old.json   (compares against an earlier run)
+
+METHOD_SIFT = "SIFT"
+SCENARIOS = ("clean", "jitter", "noise", "theme")
+HIT_TOLERANCE_PX = 3
+
+
+# ---------------- synthetic cases ----------------
+
+def apply_theme(image: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Brightness/contrast change plus a colour tint, as after switching the desktop theme."""
+    alpha = float(rng.uniform(0.7, 0.9))
+    beta = float(rng.uniform(-40, -15))
+    tint = rng.integers(-20, 21, size=3)
+    shifted = image.astype(np.float32) * alpha + beta + tint
+    return np.clip(shifted, 0, 255).astype(np.uint8)
+
+
+def make_cases(scenario: str, n_cases: int, width: int, height: int, seed: int):
+    """(screen_gray, icon_gray, expected_center) for one scenario, deterministic per seed."""
+    rng = np.random.default_rng(seed + SCENARIOS.index(scenario) * 7919)
+    cases = []
+    for i in range(n_cases):
+        size = int(rng.choice([24, 32, 48, 64]))
+        icon = SyntheticScreenSource.make_icon(size, seed=seed * 1000 + i)
+        scale = float(rng.uniform(0.9, 1.1)) if scenario == "jitter" else 1.0
+        shown = cv2.resize(icon, (max(1, round(size * scale)), max(1, round(size * scale))), interpolation=cv2.INTER_AREA)
+        x = int(rng.integers(0, width - shown.shape[1]))
+        y = int(rng.integers(0, height - shown.shape[0]))
+        screen = SyntheticScreenSource(width, height, seed=seed + i, placements=[(shown, x, y)]).grab()
+        if scenario == "noise":
+            screen = np.clip(screen.astype(np.float32) + rng.normal(0, 8, screen.shape), 0, 255).astype(np.uint8)
+        elif scenario == "theme":
+            screen = apply_theme(screen, rng)
+        cases.append((
+            cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY),
+            cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY),
+            (x + shown.shape[1] // 2, y + shown.shape[0] // 2),
+        ))
+    return cases
+
+
+# ---------------- finders ----------------
+
+class SiftFinder:
+    """
+    SIFT pipeline of the Tests/ImageTest prototype (ratio test + homography) on arrays,
+    returning (center_x, center_y, w, h, confidence) like ImageFinderClient.
+    """
+
+    def __init__(self, ratio_thresh: float = 0.75):
+        self.detector = cv2.SIFT_create()
+        self.ratio_thresh = ratio_thresh
+        self.matcher = cv2.BFMatcher()
+
+    def find_array(self, icon: np.ndarray, screen: np.ndarray):
+        kp1, des1 = self.detector.detectAndCompute(icon, None)
+        kp2, des2 = self.detector.detectAndCompute(screen, None)
+        if des1 is None or des2 is None or len(kp2) < 2:
+            return None
+        matches = self.matcher.knnMatch(des1, des2, k=2)
+        good = [m for m, n in (p for p in matches if len(p) == 2) if m.distance < self.ratio_thresh * n.distance]
+        if len(good) <= 4:
+            return None
+        src = np.float32([kp1[m.queryIdx].pt for m in good]).reshape(-1, 1, 2)
+        dst = np.float32([kp2[m.trainIdx].pt for m in good]).reshape(-1, 1, 2)
+        M, _ = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+        if M is None:
+            return None
+        h, w = icon.shape[:2]
+        corners = cv2.perspectiveTransform(np.float32([[0, 0], [0, h - 1], [w - 1, h - 1], [w - 1, 0]]).reshape(-1, 1, 2), M)
+        x, y, bw, bh = cv2.boundingRect(corners)
+        return (x + bw // 2, y + bh // 2, bw, bh, len(good) / len(matches))
+
+
+def make_finder(method: str):
+    if method == METHOD_SIFT:
+        if not hasattr(cv2, "SIFT_create"):
+            return None
+        return SiftFinder()
+    # no result cache: warm-up and memory pass repeat the timed searches
+    return ImageFinderClient(method=method, cache_size=0)
+
+
+# ---------------- measurement ----------------
+
+def is_hit(match, expected) -> bool:
+    return match is not None and abs(match[0] - expected[0]) <= HIT_TOLERANCE_PX and abs(match[1] - expected[1]) <= HIT_TOLERANCE_PX
+
+
+def bench_method(method: str, scenario: str, cases, memory_cases: int):
+    finder = make_finder(method)
+    if finder is None:
+        return {"bench": "image_finder", "scenario": scenario, "method": method, "skipped": "not available in this OpenCV build"}
+    screen, icon, _ = cases[0]
+    finder.find_array(icon, screen)  # warm up pools, detectors and the schedule
+
+    timings, hits, confidences = [], 0, []
+    for screen, icon, expected in cases:
+        start = time.perf_counter()
+        match = finder.find_array(icon, screen)
+        timings.append((time.perf_counter() - start) * 1000.0)
+        if is_hit(match, expected):
+            hits += 1
+            confidences.append(float(match[-1]))
+
+    # separate pass: tracing slows allocations down and would skew the latencies
+    peaks = []
+    for screen, icon, _ in cases[:memory_cases]:
+        tracemalloc.start()
+        finder.find_array(icon, screen)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        "bench": "image_finder",
+        "scenario": scenario,
+        "method": method,
+        "cases": len(cases),
+        "ms": {f"p{q}": round(percentile(timings, q), 3) for q in (50, 95, 99)},
+        "accuracy": round(hits / len(cases), 3),
+        "hit_confidence_p50": round(percentile(confidences, 50), 4) if confidences else None,
+        "peak_traced_mb": round(max(peaks) / 2 ** 20, 2) if peaks else None,
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path: str, tolerance: float) -> None:
+    """Prints p50 latency ratio and accuracy change per scenario/method against an earlier run."""
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["method"]): r for r in json.load(f)["results"] if "ms" in r}
+    for row in results:
+        old = baseline.get((row["scenario"], row["method"]))
+        if old is None or "ms" not in row:
+            continue
+        ratio = row["ms"]["p50"] / old["ms"]["p50"] if old["ms"]["p50"] else float("nan")
+        delta = row["accuracy"] - old["accuracy"]
+        flag = "  <-- regression" if ratio > tolerance or delta < 0 else ""
+        print(f"{row['scenario']:>7} {row['method']:>8}: p50 x{ratio:.2f}, accuracy {delta:+.3f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image finder benchmark and accuracy suite")
+    parser.add_argument("--cases", type=int, default=10)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--methods", default=",".join([ImageFinderConfig.METHOD_TEMPLATE, ImageFinderConfig.METHOD_PYRAMID,
+                                                        ImageFinderConfig.METHOD_ORB, METHOD_SIFT]))
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--memory-cases", type=int, default=3, help="cases traced with tracemalloc per method")
+    parser.add_argument("--baseline", default="", help="earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="p50 ratio flagged as regression")
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    results = []
+    for scenario in (s for s in args.scenarios.split(",") if s):
+        cases = make_cases(scenario, args.cases, width, height, args.seed)
+        for method in (m.upper() for m in args.methods.split(",") if m):
+            row = bench_method(method, scenario, cases, args.memory_cases)
+            results.append(row)
+            print(json.dumps(row))
+
+    if args.baseline:
+        compare(results, args.baseline, args.tolerance)
+    if args.out:
+        report = {"environment": environment(), "size": args.size, "seed": args.seed, "results": results}
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import sys
+import os
+import json
+import time
+import argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+import numpy as np
+from image_finder_client import ImageFinderClient
+from replay_backends import SyntheticScreenSource
+from replay_telemetry import percentile
+
+# Polling for a UI element on successive captures: full grid per capture vs searching only
+# around the changed tiles after a miss (find_incremental). Each capture changes a few small
+# screen areas (clock, spinner); the icon appears on capture --appear. Also checks both agree
+# exactly on every capture (found at the same position with the same confidence, or both missed).
+# Usage: python bench_incremental_match.py [--captures 30] [--changes 2] [--size 1920x1080] [--out bench_incremental.json]
+
+
+def make_captures(count: int, changes: int, appear: int, width: int, height: int, icon: np.ndarray, seed: int):
+    rng = np.random.default_rng(seed)
+    current = SyntheticScreenSource(width, height, seed=seed).grab()
+    captures = []
+    target = (width // 2, height // 2)
+    for i in range(count):
+        current = current.copy()
+        for _ in range(changes):
+            x, y = int(rng.integers(0, width - 40)), int(rng.integers(0, height - 24))
+            cv2.rectangle(current, (x, y), (x + 40, y + 24), tuple(int(c) for c in rng.integers(0, 256, 3)), -1)
+        if i == appear:
+            current[target[1]:target[1] + icon.shape[0], target[0]:target[0] + icon.shape[1]] = icon
+        captures.append(cv2.cvtColor(current, cv2.COLOR_BGR2GRAY))
+    return captures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental re-matching benchmark")
+    parser.add_argument("--captures", type=int, default=30)
+    parser.add_argument("--changes", type=int, default=2, help="changed screen areas per capture")
+    parser.add_argument("--appear", type=int, default=20, help="capture on which the icon appears")
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--icon", type=int, default=40)
+    # TM_CCORR_NORMED reaches ~0.88 somewhere on the synthetic background, so polling needs a stricter hit
+    parser.add_argument("--accept", type=float, default=0.95, help="confidence that counts as found")
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    icon = SyntheticScreenSource.make_icon(args.icon, seed=5)
+    icon_gray = cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY)
+    captures = make_captures(args.captures, args.changes, args.appear, width, height, icon, seed=3)
+
+    # plain grid without cache/schedule, as every retry ran before
+    full = ImageFinderClient(cache_size=0, adaptive=False, early_exit=1.01)
+    incremental = ImageFinderClient()
+    full_ms, inc_ms, agree = [], [], 0
+    for capture in captures:
+        start = time.perf_counter()
+        a = full.find_array(icon_gray, capture)
+        full_ms.append((time.perf_counter() - start) * 1000.0)
+        start = time.perf_counter()
+        b = incremental.find_incremental(icon_gray, capture, accept=args.accept)
+        inc_ms.append((time.perf_counter() - start) * 1000.0)
+        a = a if a is not None and a[4] >= args.accept else None
+        b = b if b is not None and b[4] >= args.accept else None
+        if (a is None and b is None) or (a is not None and b is not None and a[:4] == b[:4] and abs(a[4] - b[4]) < 1e-4):
+            agree += 1
+
+    stats = incremental.incremental.stats()
+    result = {
+        "bench": "incremental_match",
+        "screen": f"{width}x{height}",
+        "captures": args.captures,
+        "changes_per_capture": args.changes,
+        "full_ms": {f"p{q}": round(percentile(full_ms, q), 3) for q in (50, 95, 99)},
+        # first capture is a normal search that seeds the kept capture
+        "incremental_ms": {f"p{q}": round(percentile(inc_ms[1:], q), 3) for q in (50, 95, 99)},
+        "incremental_first_ms": round(inc_ms[0], 3),
+        "dirty_tile_fraction": round(stats["incremental_dirty_tiles"] / stats["incremental_tiles"], 4) if stats["incremental_tiles"] else None,
+        "agree": f"{agree}/{len(captures)}",
+    }
+    print(json.dumps(result))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump([result], f, indent=2)
+        print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import sys
+import os
+import json
+import time
+import argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+from image_finder_client import ImageFinderClient
+from replay_backends import SyntheticScreenSource
+from replay_telemetry import percentile
+
+# Plain scale x method grid vs the adaptive schedule (best-first order, early exit, cells
+# skipped by their score bound) over a replay-like sequence of clicks that share one display scale.
+# Usage: python bench_match_schedule.py [--clicks 30] [--scale 1.05] [--workers 1] [--out bench_match_schedule.json]
+
+
+def make_clicks(count: int, scale: float, width: int, height: int):
+    clicks = []
+    for i in range(count):
+        icon = SyntheticScreenSource.make_icon(40, seed=i)
+        shown = cv2.resize(icon, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+        x, y = (97 * i) % (width - 100), (61 * i) % (height - 100)
+        screen = SyntheticScreenSource(width, height, seed=i, placements=[(shown, x, y)])
+        clicks.append((cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY), cv2.cvtColor(screen.grab(), cv2.COLOR_BGR2GRAY),
+                       (x + shown.shape[1] // 2, y + shown.shape[0] // 2)))
+    return clicks
+
+
+def bench_mode(name: str, finder: ImageFinderClient, clicks):
+    timings = []
+    hits = 0
+    for icon, screen, (tx, ty) in clicks:
+        start = time.perf_counter()
+        match = finder.find_array(icon, screen)
+        timings.append((time.perf_counter() - start) * 1000.0)
+        if match is not None and abs(match[0] - tx) <= 2 and abs(match[1] - ty) <= 2:
+            hits += 1
+    row = {
+        "bench": "match_schedule",
+        "mode": name,
+        "clicks": len(clicks),
+        "ms": {f"p{q}": round(percentile(timings, q), 3) for q in (50, 95, 99)},
+        "accuracy": round(hits / len(clicks), 3),
+    }
+    row.update(finder.schedule.stats())
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive match schedule benchmark")
+    parser.add_argument("--clicks", type=int, default=30)
+    parser.add_argument("--scale", type=float, default=1.05)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    clicks = make_clicks(args.clicks, args.scale, width, height)
+    results = [
+        bench_mode("grid", ImageFinderClient(workers=args.workers, adaptive=False, early_exit=1.01), clicks),
+        bench_mode("adaptive", ImageFinderClient(workers=args.workers, adaptive=True), clicks),
+    ]
+    for row in results:
+        print(json.dumps(row))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+import time
+import argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+from image_finder_client import ImageFinderClient
+from replay_backends import SyntheticScreenSource
+from replay_telemetry import percentile
+
+# Wall time of the scale x method grid for 1..N match workers on a synthetic full-screen search.
+# Usage: python bench_parallel_match.py [--workers 1,2,4,8] [--repeats 10] [--out bench_parallel_match.json]
+
+
+def bench_workers(workers_list, repeats: int, width: int, height: int, early_exit: float):
+    icon = SyntheticScreenSource.make_icon(48, seed=3)
+    screen = SyntheticScreenSource(width, height, seed=7)
+    target = (width * 2 // 3, height // 2)
+    screen.place(icon, *target)
+    screen_gray = cv2.cvtColor(screen.grab(), cv2.COLOR_BGR2GRAY)
+    icon_gray = cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY)
+
+    results = []
+    baseline = None
+    for workers in workers_list:
+        finder = ImageFinderClient(workers=workers, early_exit=early_exit)
+        finder._match_gray(screen_gray, icon_gray)  # warm up pool threads
+        timings = []
+        match = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            match = finder._match_gray(screen_gray, icon_gray)
+            timings.append((time.perf_counter() - start) * 1000.0)
+        p50 = percentile(timings, 50)
+        if baseline is None:
+            baseline = p50
+        results.append({
+            "bench": "parallel_match",
+            "screen": f"{width}x{height}",
+            "workers": workers,
+            "early_exit": early_exit,
+            "ms": {f"p{q}": round(percentile(timings, q), 3) for q in (50, 95, 99)},
+            "speedup_p50": round(baseline / p50, 2) if p50 else None,
+            "match": [int(v) for v in match[:4]] + [round(float(match[4]), 4)] if match else None,
+        })
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel template match benchmark")
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--early-exit", type=float, default=1.01,
+                        help="confidence that stops the grid early (>1 disables early exit)")
+    parser.add_argument("--cv-threads", type=int, default=-1,
+                        help="cv2.setNumThreads value; 1 isolates the pool speedup from OpenCV's own threading")
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    if args.cv_threads >= 0:
+        cv2.setNumThreads(args.cv_threads)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    workers_list = [int(w) for w in args.workers.split(",") if w]
+    results = bench_workers(workers_list, args.repeats, width, height, args.early_exit)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
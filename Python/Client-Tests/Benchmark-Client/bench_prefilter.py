@@ -0,0 +1,98 @@
+import sys
+import os
+import json
+import time
+import argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+import numpy as np
+from image_finder_client import ImageFinderClient, ImageFinderConfig
+from replay_backends import SyntheticScreenSource
+from replay_telemetry import percentile
+
+# Integral-image prefilter (prefilter.py) on vs off over the full scale x method grid:
+# fraction of match positions pruned, latency, and whether every result is unchanged.
+# "desktop" screens have solid backgrounds like real windows, "textured" ones keep the noise.
+# Usage: python bench_prefilter.py [--cases 10] [--size 1920x1080] [--out bench_prefilter.json]
+
+HIT_TOLERANCE_PX = 3
+
+
+def make_cases(n_cases: int, width: int, height: int, seed: int, desktop: bool):
+    rng = np.random.default_rng(seed)
+    cases = []
+    for i in range(n_cases):
+        size = int(rng.choice([24, 32, 48, 64]))
+        icon = SyntheticScreenSource.make_icon(size, seed=seed * 1000 + i)
+        scale = float(rng.choice(ImageFinderConfig.SCALE_FACTORS))
+        shown = cv2.resize(icon, (int(size * scale), int(size * scale)))
+        x = int(rng.integers(0, width - shown.shape[1]))
+        y = int(rng.integers(0, height - shown.shape[0]))
+        screen = SyntheticScreenSource(width, height, seed=seed + i).grab()
+        if desktop:
+            # the synthetic background is noise below grey level 40; real desktops are mostly solid
+            screen = np.where(screen < 40, 32, screen).astype(np.uint8)
+        screen[y:y + shown.shape[0], x:x + shown.shape[1]] = shown
+        cases.append((cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY), cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY),
+                      (x + shown.shape[1] // 2, y + shown.shape[0] // 2)))
+    return cases
+
+
+def bench_screens(name: str, cases, workers: int):
+    # plain grid without early exit/pruning/cache, so the prefilter is the only difference
+    finders = {
+        "off": ImageFinderClient(workers=workers, adaptive=False, early_exit=1.01, cache_size=0, prefilter=False),
+        "on": ImageFinderClient(workers=workers, adaptive=False, early_exit=1.01, cache_size=0, prefilter=True),
+    }
+    timings = {mode: [] for mode in finders}
+    hits = {mode: 0 for mode in finders}
+    identical = 0
+    for screen, icon, (tx, ty) in cases:
+        matches = {}
+        for mode, finder in finders.items():
+            start = time.perf_counter()
+            matches[mode] = finder.find_array(icon, screen)
+            timings[mode].append((time.perf_counter() - start) * 1000.0)
+            m = matches[mode]
+            if m is not None and abs(m[0] - tx) <= HIT_TOLERANCE_PX and abs(m[1] - ty) <= HIT_TOLERANCE_PX:
+                hits[mode] += 1
+        a, b = matches["off"], matches["on"]
+        if (a is None and b is None) or (a is not None and b is not None and a[:4] == b[:4] and abs(a[4] - b[4]) < 1e-4):
+            identical += 1
+    stats = finders["on"].stats()
+    row = {
+        "bench": "prefilter",
+        "screens": name,
+        "cases": len(cases),
+        "pruned_fraction": round(stats["prefilter_pruned"] / stats["prefilter_positions"], 4) if stats["prefilter_positions"] else 0.0,
+        "identical": f"{identical}/{len(cases)}",
+    }
+    for mode in finders:
+        row[f"{mode}_ms"] = {f"p{q}": round(percentile(timings[mode], q), 3) for q in (50, 95, 99)}
+        row[f"{mode}_accuracy"] = round(hits[mode] / len(cases), 3)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Integral-image prefilter benchmark")
+    parser.add_argument("--cases", type=int, default=10)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    results = []
+    for name, desktop in (("desktop", True), ("textured", False)):
+        results.append(bench_screens(name, make_cases(args.cases, width, height, args.seed, desktop), args.workers))
+        print(json.dumps(results[-1]))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import sys
+import os
+import json
+import time
+import argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+import numpy as np
+from image_finder_client import ImageFinderClient, ImageFinderConfig
+from replay_backends import SyntheticScreenSource
+from replay_telemetry import percentile
+
+# Full-screen search: existing TEMPLATE sweep vs coarse-to-fine PYRAMID, latency and accuracy.
+# Usage: python bench_pyramid.py [--cases 20] [--size 1920x1080] [--out bench_pyramid.json]
+
+HIT_TOLERANCE_PX = 3
+
+
+def make_cases(n_cases: int, width: int, height: int, seed: int):
+    """(screen_gray, icon_gray, expected_center) with random icon size, scale and position."""
+    rng = np.random.default_rng(seed)
+    cases = []
+    for i in range(n_cases):
+        size = int(rng.choice([24, 32, 48, 64]))
+        icon = SyntheticScreenSource.make_icon(size, seed=seed * 1000 + i)
+        # replay display may differ slightly from the recording
+        scale = float(rng.choice(ImageFinderConfig.SCALE_FACTORS))
+        shown = cv2.resize(icon, (int(size * scale), int(size * scale)))
+        x = int(rng.integers(0, width - shown.shape[1]))
+        y = int(rng.integers(0, height - shown.shape[0]))
+        screen = SyntheticScreenSource(width, height, seed=seed + i, placements=[(shown, x, y)])
+        cases.append((
+            cv2.cvtColor(screen.grab(), cv2.COLOR_BGR2GRAY),
+            cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY),
+            (x + shown.shape[1] // 2, y + shown.shape[0] // 2),
+        ))
+    return cases
+
+
+def bench_method(label: str, match_fn, cases, threshold: float):
+    timings = []
+    hits = 0
+    for screen_gray, icon_gray, (ex, ey) in cases:
+        start = time.perf_counter()
+        match = match_fn(icon_gray, screen_gray)
+        timings.append((time.perf_counter() - start) * 1000.0)
+        if match is not None and match[-1] >= threshold \
+                and abs(match[0] - ex) <= HIT_TOLERANCE_PX and abs(match[1] - ey) <= HIT_TOLERANCE_PX:
+            hits += 1
+    result = {
+        "bench": "pyramid",
+        "method": label,
+        "cases": len(cases),
+        "accuracy": round(hits / len(cases), 4) if cases else None,
+        "ms": {f"p{q}": round(percentile(timings, q), 3) for q in (50, 95, 99)},
+    }
+    print(json.dumps(result))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pyramid vs template sweep benchmark")
+    parser.add_argument("--cases", type=int, default=20)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    cases = make_cases(args.cases, width, height, args.seed)
+    results = []
+    for method in (ImageFinderConfig.METHOD_TEMPLATE, ImageFinderConfig.METHOD_PYRAMID):
+        finder = ImageFinderClient(method=method)
+        results.append(bench_method(method, finder.find_array, cases, finder.threshold))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import sys
+import os
+import io
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+from macro_replay import MacroReplayManager, MouseScreenshotFinder
+from image_finder_client import ImageFinderClient
+from async_replay import AsyncReplayEngine
+from replay_backends import RecordingInputBackend, SyntheticScreenSource
+from replay_telemetry import percentile
+
+# Headless replay benchmark: scheduler throughput, timing accuracy and click search latency.
+# Usage: python bench_replay.py [--sizes 1000,10000,100000,1000000] [--engine threads|async] [--out bench_replay.json]
+
+
+def write_synthetic_macro(macro_dir: str, n_events: int, spacing: float, key_every: int = 50):
+    """Moves every `spacing` seconds plus a key press/release pair every `key_every` moves."""
+    t0 = 1_700_000_000.0
+    with open(os.path.join(macro_dir, "mouse_moves.log"), "w") as moves, \
+            open(os.path.join(macro_dir, "actions.log"), "w") as actions:
+        for i in range(n_events):
+            t = t0 + i * spacing
+            moves.write(json.dumps({"type": "move", "x": i % 1920, "y": (i * 7) % 1080, "time": t}) + "\n")
+            if key_every and i % key_every == 0:
+                actions.write(json.dumps({"type": "press", "key": "'a'", "time": t}) + "\n")
+                actions.write(json.dumps({"type": "release", "key": "'a'", "time": t + spacing / 2}) + "\n")
+
+
+def run_replay(macro_dir: str, screen: SyntheticScreenSource, engine: str = "threads"):
+    backend = RecordingInputBackend()
+    cwd = os.getcwd()
+    os.chdir(macro_dir)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            load_start = time.perf_counter()
+            manager = MacroReplayManager("mouse_moves.log", "actions.log", results_dir="results",
+                                         backend=backend, screen=screen)
+            load_s = time.perf_counter() - load_start
+            replay_start = time.perf_counter()
+            if engine == "async":
+                asyncio.run(AsyncReplayEngine(manager).run())
+            else:
+                manager.replay_all()
+            replay_s = time.perf_counter() - replay_start
+    finally:
+        os.chdir(cwd)
+    return backend, manager.telemetry.summary(), load_s, replay_s
+
+
+def bench_scheduler(sizes, screen, engine: str = "threads"):
+    results = []
+    for n in sizes:
+        for label, spacing in (("throughput", 0.0), ("accuracy", 0.001)):
+            if label == "accuracy" and n > 10_000:
+                continue  # real-time replay of larger macros only measures sleep()
+            with tempfile.TemporaryDirectory() as td:
+                os.makedirs(os.path.join(td, "screenshots"))
+                write_synthetic_macro(td, n, spacing)
+                backend, summary, load_s, replay_s = run_replay(td, screen, engine)
+            results.append({
+                "bench": f"scheduler_{label}",
+                "engine": engine,
+                "events": len(backend.calls),
+                "load_s": round(load_s, 4),
+                "replay_s": round(replay_s, 4),
+                "events_per_s": round(len(backend.calls) / replay_s, 1) if replay_s else None,
+                "lateness_ms": summary["lateness_ms"],
+            })
+            print(json.dumps(results[-1]))
+    return results
+
+
+def clean_click(finder: MouseScreenshotFinder, icon_path: str, shot_path: str, width: int, height: int):
+    """
+    A click position whose surrounding region holds no confident (false) match, so the
+    search really falls through to the full screenshot.
+    """
+    for y in range(100, height, 240):
+        for x in range(100, width, 240):
+            with contextlib.redirect_stdout(io.StringIO()):
+                finder.find_click_position(icon_path, shot_path, x, y)
+            if finder.last_stats.get("stage") == "full":
+                return x, y
+    raise RuntimeError("Every click region contains a confident match, no clean point for the full search")
+
+
+def bench_search(screen: SyntheticScreenSource, repeats: int):
+    icon = SyntheticScreenSource.make_icon(32, seed=1)
+    target = (1400, 700)
+    screen.place(icon, *target)
+    results = []
+    with tempfile.TemporaryDirectory() as td:
+        icon_path = os.path.join(td, "icon.png")
+        shot_path = os.path.join(td, "screen.png")
+        cv2.imwrite(icon_path, icon)
+        screen.capture(shot_path)
+        # result cache off: every repeat (and the clean-point probe) runs its search for real
+        finder = MouseScreenshotFinder(ImageFinderClient(cache_size=0))
+        cx, cy = target[0] + 16, target[1] + 16
+        full_click = clean_click(finder, icon_path, shot_path, screen.width, screen.height)
+        for label, click in (("region", (cx, cy)), ("full", full_click)):
+            timings = []
+            for _ in range(repeats):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    finder.find_click_position(icon_path, shot_path, *click)
+                    timings.append((time.perf_counter() - start) * 1000.0)
+                assert finder.last_stats.get("stage") == label, f"search_{label} ended in stage {finder.last_stats.get('stage')}"
+            results.append({
+                "bench": f"search_{label}",
+                "click": list(click),
+                "stage": finder.last_stats.get("stage"),
+                "confidence": finder.last_stats.get("confidence"),
+                "ms": {f"p{q}": round(percentile(timings, q), 3) for q in (50, 95, 99)},
+            })
+            print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless replay benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads")
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    screen = SyntheticScreenSource(1920, 1080)
+    results = bench_scheduler(sizes, screen, args.engine) + bench_search(screen, args.repeats)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import sys
+import os
+import json
+import time
+import argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Makro-Client')))
+
+import cv2
+from image_finder_client import ImageFinderClient
+from replay_backends import SyntheticScreenSource
+from replay_telemetry import percentile
+import tiled_search
+
+# Full-screen search on synthetic high-resolution desktops: single call vs tiled process pool.
+# The icon is placed across a tile border to check the de-duplication.
+# Usage: python bench_tiled_search.py [--sizes 5120x2880,7680x4320] [--workers 2,4,8] [--out bench_tiled_search.json]
+
+
+def bench_size(width: int, height: int, workers_list, repeats: int, icon_size: int):
+    icon = SyntheticScreenSource.make_icon(icon_size, seed=11)
+    border = tiled_search.tile_grid(width, height)[1][0]
+    target = (border - icon_size // 2, height // 2)
+    screen = SyntheticScreenSource(width, height, seed=5, placements=[(icon, *target)])
+    frame_gray = cv2.cvtColor(screen.grab(), cv2.COLOR_BGR2GRAY)
+    icon_gray = cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY)
+    expected = (target[0] + icon_size // 2, target[1] + icon_size // 2)
+
+    results = []
+    baseline = None
+    runs = [("single", 1)] + [("tiled", w) for w in workers_list]
+    for mode, workers in runs:
+        # early exit, schedule and result cache off so every repeat runs the full grid
+        finder = ImageFinderClient(full_search=mode, tile_workers=workers, early_exit=1.01, adaptive=False, cache_size=0)
+        finder.find_array(icon_gray, frame_gray)  # start pool processes
+        timings = []
+        match = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            match = finder.find_array(icon_gray, frame_gray)
+            timings.append((time.perf_counter() - start) * 1000.0)
+        p50 = percentile(timings, 50)
+        if baseline is None:
+            baseline = p50
+        results.append({
+            "bench": "tiled_search",
+            "screen": f"{width}x{height}",
+            "mode": mode,
+            "workers": workers,
+            "ms": {f"p{q}": round(percentile(timings, q), 3) for q in (50, 95, 99)},
+            "speedup_p50": round(baseline / p50, 2) if p50 else None,
+            "found": bool(match) and abs(match[0] - expected[0]) <= 1 and abs(match[1] - expected[1]) <= 1,
+            "confidence": round(float(match[-1]), 4) if match else None,
+        })
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiled full-screen search benchmark")
+    parser.add_argument("--sizes", default="5120x2880,7680x4320")
+    parser.add_argument("--workers", default="2,4,8")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--icon", type=int, default=48)
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    workers_list = [int(w) for w in args.workers.split(",") if w]
+    results = []
+    try:
+        for size in args.sizes.split(","):
+            width, height = (int(v) for v in size.lower().split("x"))
+            results += bench_size(width, height, workers_list, args.repeats, args.icon)
+    finally:
+        tiled_search.shutdown()
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
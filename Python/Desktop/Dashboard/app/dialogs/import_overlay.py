@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import os
-from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QPushButton, QFileDialog,
     QWidget, QHBoxLayout, QProgressBar, QFrame, QSizePolicy
 )
 
+from ..worker import ImportWorker
+
 
 class DropZone(QFrame):
     pathDropped = Signal(str)
@@ -79,18 +81,24 @@ class ImportOverlay(QDialog):
     """
     Compact import dialog:
       - Accepts ZIP or folder (macro package)
+      - Imports in a worker thread with byte progress; Cancel/Esc/✕ abort and roll back
     Result:
       self.selected_path: str | None
       self.selected_kind: str in {"zip","folder"} | None
+      self.imported_meta: dict | None (set when accepted)
     """
-    def __init__(self, parent: QWidget | None = None):
+    def __init__(self, store, parent: QWidget | None = None):
         super().__init__(parent)
         self.setModal(True)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Dialog)
         self.setAttribute(Qt.WA_TranslucentBackground, True)
 
+        self.store = store
         self.selected_path: str | None = None
         self.selected_kind: str | None = None
+        self.imported_meta: dict | None = None
+        self._worker: ImportWorker | None = None
+        self._thread: QThread | None = None
 
         outer = QVBoxLayout(self)
         outer.setContentsMargins(0, 0, 0, 0)
@@ -119,16 +127,16 @@ class ImportOverlay(QDialog):
 
         # Drop-zone
         self.dropzone = DropZone()
-        self.dropzone.pathDropped.connect(self._start_progress_and_accept)
+        self.dropzone.pathDropped.connect(self._start_import)
 
         # Buttons (ZIP / Folder only)
         buttons = QHBoxLayout(); buttons.setSpacing(10)
-        btnZip = QPushButton("Choose ZIP…"); btnZip.clicked.connect(self._browse_zip)
-        btnDir = QPushButton("Choose folder…"); btnDir.clicked.connect(self._browse_folder)
-        buttons.addStretch(1); buttons.addWidget(btnZip); buttons.addWidget(btnDir); buttons.addStretch(1)
+        self.btnZip = QPushButton("Choose ZIP…"); self.btnZip.clicked.connect(self._browse_zip)
+        self.btnDir = QPushButton("Choose folder…"); self.btnDir.clicked.connect(self._browse_folder)
+        buttons.addStretch(1); buttons.addWidget(self.btnZip); buttons.addWidget(self.btnDir); buttons.addStretch(1)
 
-        # Progress + status
-        self.progress = QProgressBar(); self.progress.setMinimum(0); self.progress.setMaximum(100)
+        # Progress + status (Promille der kopierten Bytes)
+        self.progress = QProgressBar(); self.progress.setMinimum(0); self.progress.setMaximum(1000)
         self.progress.setValue(0); self.progress.setTextVisible(False); self.progress.setObjectName("importProgress")
         self.status = QLabel(""); self.status.setAlignment(Qt.AlignCenter); self.status.setObjectName("statusMsg")
 
@@ -173,15 +181,17 @@ class ImportOverlay(QDialog):
     def _browse_zip(self):
         path, _ = QFileDialog.getOpenFileName(self, "Choose macro ZIP", "", "ZIP files (*.zip)")
         if path:
-            self._start_progress_and_accept(path)
+            self._start_import(path)
 
     def _browse_folder(self):
         path = QFileDialog.getExistingDirectory(self, "Choose macro folder", "")
         if path:
-            self._start_progress_and_accept(path)
+            self._start_import(path)
 
-    # Progress & accept
-    def _start_progress_and_accept(self, path: str):
+    # Import & progress
+    def _start_import(self, path: str):
+        if self._worker is not None:
+            return
         # only accept ZIP or folder
         if os.path.isdir(path):
             kind = "folder"
@@ -193,21 +203,55 @@ class ImportOverlay(QDialog):
 
         self.selected_path = path
         self.selected_kind = kind
-
+        self._set_busy(True)
         self.status.setText("Importing…")
-        self.progress.setValue(12)
-
-        steps = [28, 52, 78, 100]
-        self._i = 0
-
-        def tick():
-            if self._i < len(steps):
-                self.progress.setValue(steps[self._i])
-                self._i += 1
-            else:
-                self.accept()
-                timer.stop()
-
-        timer = QTimer(self)
-        timer.timeout.connect(tick)
-        timer.start(85)
+        self.progress.setValue(0)
+
+        self._worker = ImportWorker(self.store, path, kind)
+        self._worker.progressed.connect(self._on_progress)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+        self._worker.canceled.connect(self._on_canceled)
+        self._thread = self._worker.start(self)
+
+    def _set_busy(self, busy: bool):
+        self.btnZip.setEnabled(not busy)
+        self.btnDir.setEnabled(not busy)
+        self.dropzone.setAcceptDrops(not busy)
+
+    def _on_progress(self, done: int, total: int):
+        self.progress.setValue(int(done * 1000 / total) if total else 1000)
+        if self._worker is not None and not self._worker.cancel_requested:
+            self.status.setText(f"Importing… {done / 1e6:.1f} / {total / 1e6:.1f} MB")
+
+    def _on_finished(self, meta: dict):
+        self._join_worker()
+        self.imported_meta = meta
+        self.progress.setValue(1000)
+        self.accept()
+
+    def _on_failed(self, message: str):
+        self._join_worker()
+        self._set_busy(False)
+        self.progress.setValue(0)
+        self.status.setText(f"Import failed: {message}")
+
+    def _on_canceled(self):
+        self._join_worker()
+        super().reject()
+
+    def _join_worker(self):
+        # run() ist mit dem Signal fertig; der Thread endet sofort
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+        self._worker = None
+        self._thread = None
+
+    def reject(self):
+        # während des Imports: abbrechen; geschlossen wird nach dem Aufräumen (canceled)
+        if self._worker is not None:
+            self._worker.cancel()
+            self.status.setText("Canceling…")
+            return
+        super().reject()
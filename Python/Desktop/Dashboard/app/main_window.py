@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from pathlib import Path
 import sys
 import subprocess
@@ -8,23 +7,28 @@ import os
 from typing import Optional
 
 from PySide6.QtCore import Qt, QFileSystemWatcher, QTimer, QObject, Signal, Slot
-from PySide6.QtGui import QFont, QAction, QIcon, QPixmap, QPainter, QColor
+from PySide6.QtGui import QFont, QAction
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLineEdit, QComboBox, QLabel,
-    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QStatusBar, QSplitter,
+    QPushButton, QTableView, QHeaderView, QStatusBar, QSplitter,
     QSizePolicy, QApplication, QSystemTrayIcon, QMenu, QInputDialog, QDialog,
     QTextEdit, QDialogButtonBox, QStyle, QMessageBox, QFileDialog, QToolButton
 )
 
 from .widgets.side_nav import SideNav
+from .widgets.macro_table import MacroTableModel, MacroFilterProxy, MacroRowDelegate, ROW_HEIGHT
 from .dialogs.import_overlay import ImportOverlay
 from .dialogs.record_window import RecordWindow
 from .services.macro_store import MacroStore
+from .services.search_index import SearchIndex
 from .services.replay_service import ReplayService, ReplayError
 from .services.hotkey_service import HotkeyService
 from .services.recorder_service import RecorderService
 from .dialogs.settings_dialog import SettingsDialog
 
+# Ctrl+Shift+Alt+<Buchstabe> der Replay-Steuerung; nicht als Macro-Hotkey verwendbar
+RESERVED_HOTKEYS = {"s": "Stop", "p": "Pause/Resume", "n": "Step"}
+
 
 class _UiDispatcher(QObject):
     trigger = Signal(object)
@@ -80,6 +84,7 @@ class MainWindow(QMainWindow):
 
         self.store = MacroStore()
         self._data = self.store.load_all()
+        self.search = SearchIndex()
 
         self.replay = ReplayService(self.store)
 
@@ -88,12 +93,17 @@ class MainWindow(QMainWindow):
         self.hotkeys.set_ui_dispatcher(lambda fn: self._dispatcher.trigger.emit(fn))
         self.hotkeys.on_start_request = self._hotkey_start_requested
         self.hotkeys.on_stop_request = self._hotkey_stop_requested
+        self.hotkeys.on_pause_request = self._hotkey_pause_requested
+        self.hotkeys.on_step_request = self._hotkey_step_requested
         self.hotkeys.set_stop_hotkey("<ctrl>+<shift>+<alt>+s")
+        self.hotkeys.set_pause_hotkey("<ctrl>+<shift>+<alt>+p")
+        self.hotkeys.set_step_hotkey("<ctrl>+<shift>+<alt>+n")
         self.hotkeys.start()
 
         self.recorder = RecorderService(self.store)
         self._record_win: RecordWindow | None = None
 
+        self._pending_deletes: list[str] = []
         self._poll = QTimer(self); self._poll.setInterval(400); self._poll.timeout.connect(self._poll_replay); self._poll.start()
 
         quit_action = QAction("Quit", self); quit_action.setShortcut("Ctrl+Q"); quit_action.triggered.connect(QApplication.instance().quit)
@@ -101,12 +111,16 @@ class MainWindow(QMainWindow):
 
         self._setup_tray()
 
+        # Dateisystem-Events kommen beim Import/Kopieren in Schüben: erst nach einer Ruhepause neu laden
+        self._reload_timer = QTimer(self); self._reload_timer.setSingleShot(True); self._reload_timer.setInterval(300)
+        self._reload_timer.timeout.connect(self._reload_from_disk)
+
         self.fs_watcher = None
         try:
             watch_dir = str(self.store.root)
             os.makedirs(watch_dir, exist_ok=True)
             self.fs_watcher = QFileSystemWatcher([watch_dir])
-            self.fs_watcher.directoryChanged.connect(self._reload_from_disk)
+            self.fs_watcher.directoryChanged.connect(self._schedule_reload)
         except Exception as e:
             self.fs_watcher = None
             if self.statusBar():
@@ -147,14 +161,24 @@ class MainWindow(QMainWindow):
         list_container = QWidget()
         lv = QVBoxLayout(list_container); lv.setContentsMargins(0, 0, 0, 0); lv.setSpacing(10)
 
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Macro", "Action", "Actions", "Hotkey"])
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        # Model/View: Zeilen sind Daten, Buttons zeichnet der Delegate; Filter/Sortierung
+        # kommen fertig aus dem SearchIndex, der Proxy bildet nur die sichtbaren ids ab
+        self.model = MacroTableModel(self._format_hotkey_display, self)
+        self.proxy = MacroFilterProxy(self._visible_ids, self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(ROW_HEIGHT)
         self.table.setShowGrid(False)
         self.table.setAlternatingRowColors(True)
-        self.table.setMouseTracking(True)
+        self.delegate = MacroRowDelegate(self.table)
+        self.table.setItemDelegate(self.delegate)
+        self.delegate.actionTriggered.connect(self._on_row_action)
 
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)
@@ -177,12 +201,13 @@ class MainWindow(QMainWindow):
 
         self.setStatusBar(QStatusBar())
 
-        self.searchEdit.textChanged.connect(self._refresh_table)
-        self.categoryBox.currentIndexChanged.connect(self._refresh_table)
-        self.authorEdit.textChanged.connect(self._refresh_table)
-        self.timeBox.currentIndexChanged.connect(self._refresh_table)
-        self.hotkeyFilter.currentIndexChanged.connect(self._refresh_table)
-        self.sortBox.currentIndexChanged.connect(self._refresh_table)
+        # Filter/Sortierung ändern nur den Proxy, die Zeilen bleiben
+        self.searchEdit.textChanged.connect(self.proxy.refilter)
+        self.categoryBox.currentIndexChanged.connect(self.proxy.refilter)
+        self.authorEdit.textChanged.connect(self.proxy.refilter)
+        self.timeBox.currentIndexChanged.connect(self.proxy.refilter)
+        self.hotkeyFilter.currentIndexChanged.connect(self.proxy.refilter)
+        self.sortBox.currentIndexChanged.connect(self.proxy.refilter)
 
         self._apply_styles()
         self._refresh_table()
@@ -209,11 +234,13 @@ class MainWindow(QMainWindow):
                         break
                 else:
                     self._data.insert(0, meta)
+                self._apply_row_changes({mid}, [])
             else:
                 self._data = self.store.load_all()
+                self._refresh_table()
         except Exception:
             self._data = self.store.load_all()
-        self._refresh_table()
+            self._refresh_table()
         name = meta.get("name") or "New macro"
         self.statusBar().showMessage(f"Saved recording: {name}", 3000)
 
@@ -243,31 +270,35 @@ class MainWindow(QMainWindow):
         self.showNormal(); self.raise_(); self.activateWindow()
 
     def _open_import_overlay(self):
-        dlg = ImportOverlay(self)
+        # der Dialog importiert selbst (Worker-Thread, echter Fortschritt, Abbruch mit Rollback)
+        dlg = ImportOverlay(self.store, self)
         dlg.move(self.geometry().center() - dlg.rect().center())
         if dlg.exec() != QDialog.Accepted:
             self.statusBar().showMessage("Import canceled.", 1800); return
-        if not dlg.selected_path:
+        meta = dlg.imported_meta
+        if not meta:
             self.statusBar().showMessage("No path selected.", 2000); return
-        try:
-            kind = dlg.selected_kind
-            if kind == "zip":
-                meta = self.store.add_from_zip(dlg.selected_path)
-            elif kind == "folder":
-                meta = self.store.add_from_folder(dlg.selected_path)
-            else:
-                raise ValueError("Only ZIP or folder are supported.")
+        if all(r.get("id") != meta["id"] for r in self._data):
             self._data.insert(0, meta)
-            self._refresh_table()
-            counts = meta.get("counts", {})
-            a = counts.get("actions.log", 0); m = counts.get("mouse_moves.log", 0)
-            self.statusBar().showMessage(f"Imported: {meta['name']}  (actions: {a} / moves: {m})", 3500)
-        except Exception as ex:
-            self.statusBar().showMessage(f"Import failed: {ex}", 5000)
+        self._apply_row_changes({meta["id"]}, [])
+        counts = meta.get("counts", {})
+        a = counts.get("actions.log", 0); m = counts.get("mouse_moves.log", 0)
+        self.statusBar().showMessage(f"Imported: {meta['name']}  (actions: {a} / moves: {m})", 3500)
+
+    def _schedule_reload(self, *_):
+        # jeder weitere Event schiebt den Reload hinaus -> ein Refresh pro Schub
+        self._reload_timer.start()
 
     def _reload_from_disk(self):
-        self._data = self.store.load_all()
-        self._refresh_table()
+        """Lädt neu (MetaCache: nur geänderte meta.json) und aktualisiert nur betroffene Zeilen."""
+        fresh = self.store.load_all()
+        old = {r.get("id"): r for r in self._data}
+        new = {r.get("id"): r for r in fresh}
+        changed = {mid for mid, r in new.items() if old.get(mid) != r}
+        removed = [mid for mid in old if mid not in new]
+        self._data = fresh
+        if changed or removed:
+            self._apply_row_changes(changed, removed)
 
     def _row_desc(self, row: dict) -> str:
         return row.get("description") or (row.get("extra") or {}).get("description") or ""
@@ -280,58 +311,19 @@ class MainWindow(QMainWindow):
             return f"Ctrl+Shift+Alt+{s.upper()}"
         return s
 
-    def _passes_filters(self, row: dict) -> bool:
-        if (c := self.categoryBox.currentText()) != "All" and row.get("category") != c:
-            return False
-        a = self.authorEdit.text().strip().lower()
-        if a and a not in (row.get("author", "") or "").lower():
-            return False
-        sel = self.timeBox.currentText()
-        if sel != "All":
-            limits = {"Today": 1, "Last 7 days": 7, "Last month": 31, "Last 3 months": 93}
-            limit_days = limits.get(sel)
-            if limit_days is not None:
-                try:
-                    dt = datetime.fromisoformat((row.get("downloaded_at", "") or "").replace("Z", "+00:00"))
-                    age_days = (datetime.now(timezone.utc) - dt).days
-                    if age_days > limit_days:
-                        return False
-                except Exception:
-                    return False
-        hk = self.hotkeyFilter.currentText()
-        if hk == "With hotkey" and not row.get("hotkey"):
-            return False
-        if hk == "Without hotkey" and row.get("hotkey"):
-            return False
-        q = self.searchEdit.text().strip().lower()
-        if q:
-            if q in (row.get("name", "") or "").lower():
-                return True
-            if q in self._row_desc(row).lower():
-                return True
-            return False
-        return True
-
-    def _sort_rows(self, rows: list[dict]) -> list[dict]:
-        sel = self.sortBox.currentText()
-        if sel in ("Newest", "Oldest"):
-            def key(r):
-                try:
-                    return datetime.fromisoformat((r.get("downloaded_at", "") or "").replace("Z", "+00:00"))
-                except Exception:
-                    return datetime.fromtimestamp(0, tz=timezone.utc)
-            return sorted(rows, key=key, reverse=(sel == "Newest"))
-        if sel == "Most actions":
-            return sorted(rows, key=lambda r: (r.get("counts") or {}).get("actions.log", 0), reverse=True)
-        if sel == "Fewest actions":
-            return sorted(rows, key=lambda r: (r.get("counts") or {}).get("actions.log", 0))
-        if sel == "Name A–Z":
-            return sorted(rows, key=lambda r: (r.get("name") or "").lower())
-        if sel == "Name Z–A":
-            return sorted(rows, key=lambda r: (r.get("name") or "").lower(), reverse=True)
-        if sel == "Hotkey first":
-            return sorted(rows, key=lambda r: (0 if r.get("hotkey") else 1, (r.get("name") or "").lower()))
-        return rows
+    def _visible_ids(self) -> list[str]:
+        """ids der Zeilen, die alle Filter erfüllen, in der gewählten Sortierung."""
+        cat = self.categoryBox.currentText()
+        limits = {"Today": 1, "Last 7 days": 7, "Last month": 31, "Last 3 months": 93}
+        hotkey = {"With hotkey": True, "Without hotkey": False}.get(self.hotkeyFilter.currentText())
+        ids = self.search.query(
+            category=None if cat == "All" else cat,
+            author=self.authorEdit.text(),
+            days=limits.get(self.timeBox.currentText()),
+            hotkey=hotkey,
+            text=self.searchEdit.text(),
+        )
+        return self.search.ordered(self.sortBox.currentText(), ids)
 
     def _make_macro_cell(self, row: dict) -> QWidget:
         name = row.get("name") or "Unnamed"
@@ -365,92 +357,53 @@ class MainWindow(QMainWindow):
 
         return wrap
 
-    def _safe_theme_icon(self, fallback_style_icon: QStyle.StandardPixmap, theme_name: str | None = None) -> QIcon:
-        if theme_name:
-            ico = QIcon.fromTheme(theme_name)
-            if not ico.isNull():
-                return ico
-        return self.style().standardIcon(fallback_style_icon)
-
-    def _icon_button(self, icon: QIcon, text_fallback: str) -> QPushButton:
-        btn = QPushButton()
-        btn.setMinimumHeight(36)
-        btn.setMinimumWidth(42)
-        if not icon.isNull():
-            btn.setIcon(icon)
-        else:
-            btn.setText(text_fallback)
-        btn.setProperty("cellAction", True)
-        return btn
-
     def _show_details(self, row: dict):
         dlg = MacroDetailsDialog(row, self)
         dlg.move(self.geometry().center() - dlg.rect().center())
         dlg.exec()
 
     def _refresh_table(self):
-        rows = [r for r in self._data if self._passes_filters(r)]
-        rows = self._sort_rows(rows)
-        self.table.setRowCount(len(rows))
-
-        name_font = QFont(); name_font.setPointSize(15); name_font.setWeight(QFont.Medium)
-        def colorize_icon(icon: QIcon, color: QColor) -> QIcon:
-            pixmap = icon.pixmap(64, 64)
-            painter = QPainter(pixmap)
-            painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-            painter.fillRect(pixmap.rect(), color)
-            painter.end()
-            return QIcon(pixmap)
-        for r, row in enumerate(rows):
-            item = QTableWidgetItem(row.get("name") or "Unnamed")
-            item.setFont(name_font)
-            item.setFlags(item.flags() & ~Qt.ItemIsEditable & ~Qt.ItemIsSelectable)
-            self.table.setItem(r, 0, item)
-
-            play_btn = QPushButton("Play")
-            play_btn.setMinimumHeight(36)
-            play_btn.setMinimumWidth(110)
-            play_btn.setProperty("cellAction", True)
-            play_btn.clicked.connect(lambda _, id=row["id"]: self._play_macro(id))
-            act_wrap = QWidget(); act_h = QHBoxLayout(act_wrap); act_h.setContentsMargins(0, 0, 0, 0); act_h.addStretch(1); act_h.addWidget(play_btn); act_h.addStretch(1)
-            self.table.setCellWidget(r, 1, act_wrap)
-
-            edit_icon   = self._safe_theme_icon(QStyle.SP_FileDialogDetailedView, "document-properties")
-            export_icon = self._safe_theme_icon(QStyle.SP_DriveFDIcon, "document-save-as")
-            folder_icon = self._safe_theme_icon(QStyle.SP_DirOpenIcon, "folder-open")
-            delete_icon = self._safe_theme_icon(QStyle.SP_TrashIcon, "edit-delete")
-            btnEdit   = self._icon_button(edit_icon,   "Edit")
-            btnExport = self._icon_button(export_icon, "Export")
-            btnFolder = self._icon_button(folder_icon, "Folder")
-            btnDelete = self._icon_button(delete_icon, "Delete")
-            
-            btnEdit.setIcon(colorize_icon(btnEdit.icon(), QColor("black")))
-            btnExport.setIcon(colorize_icon(btnExport.icon(), QColor("black")))
-            btnFolder.setIcon(colorize_icon(btnFolder.icon(), QColor("black")))
-            btnDelete.setIcon(colorize_icon(btnDelete.icon(), QColor("black")))
-            
-            btnEdit.clicked.connect(lambda _, id=row["id"]: self._open_action_editor(id))
-            btnExport.clicked.connect(lambda _, id=row["id"]: self._export_macro(id))
-            btnFolder.clicked.connect(lambda _, id=row["id"]: self._open_folder(id))
-            btnDelete.clicked.connect(lambda _, id=row["id"]: self._delete_macro(id))
-
-            actions_container = QWidget()
-            hl = QHBoxLayout(actions_container); hl.setContentsMargins(0, 0, 0, 0); hl.setSpacing(10)
-            hl.addStretch(1); hl.addWidget(btnEdit); hl.addWidget(btnExport); hl.addWidget(btnFolder); hl.addWidget(btnDelete); hl.addStretch(1)
-            self.table.setCellWidget(r, 2, actions_container)
-
-            hk_text = self._format_hotkey_display(row.get("hotkey"))
-            hk_btn = QPushButton(hk_text); hk_btn.setMinimumHeight(32); hk_btn.setMinimumWidth(140)
-            hk_btn.setObjectName("hotkeyPill")
-            hk_btn.clicked.connect(lambda _, id=row["id"]: self._set_hotkey_for(id))
-            hk_wrap = QWidget(); hk_l = QHBoxLayout(hk_wrap); hk_l.setContentsMargins(0, 0, 0, 0)
-            hk_l.addStretch(1); hk_l.addWidget(hk_btn, 0, Qt.AlignCenter); hk_l.addStretch(1)
-            self.table.setCellWidget(r, 3, hk_wrap)
-
-            self.table.setRowHeight(r, 68)
-
+        self.search.build(self._data)
+        self.model.set_rows(self._data)
+        self._sync_hotkeys(self._data)
+
+    def _apply_row_changes(self, changed: set, removed: list):
+        """
+        Überträgt geänderte/neue/entfernte Macros aus self._data ins Modell; der Proxy
+        ordnet die betroffenen Zeilen selbst neu ein, alle anderen bleiben unberührt.
+        """
+        if len(changed) + len(removed) > 50:
+            # jede Einzeländerung baut die Proxy-Zuordnung neu auf; bei vielen ist ein Neuaufbau billiger
+            for mid in removed:
+                self.hotkeys.set_macro_hotkey(mid, None)
+            self._refresh_table()
+            return
+        for mid in removed:
+            # Index vor dem Modell: der Proxy fragt bei jeder Modelländerung die sichtbaren ids ab
+            self.search.remove(mid)
+            self.model.remove(mid)
+            self.hotkeys.set_macro_hotkey(mid, None)
+        rows = []
+        for i, row in enumerate(self._data):
+            if row.get("id") in changed:
+                self.search.update(row, i)
+                self.model.upsert(row, i)
+                rows.append(row)
         self._sync_hotkeys(rows)
 
+    def _on_row_action(self, macro_id: str, action: str):
+        handlers = {
+            "play": self._play_macro,
+            "edit": self._open_action_editor,
+            "export": self._export_macro,
+            "folder": self._open_folder,
+            "delete": self._delete_macro,
+            "hotkey": self._set_hotkey_for,
+        }
+        handler = handlers.get(action)
+        if handler is not None:
+            handler(macro_id)
+
     def _ensure_editor_on_path(self) -> Path:
         desktop_root = Path(__file__).resolve().parents[2]
         viewer_dir = desktop_root / "MakroTimelineViewer"
@@ -593,8 +546,17 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage(f"Marketplace konnte nicht geöffnet werden: {e}", 4000)
 
     def _sync_hotkeys(self, rows):
+        clashes = []
         for row in rows:
-            self.hotkeys.set_macro_hotkey(row["id"], row.get("hotkey"))
+            key = row.get("hotkey")
+            if key and key.lower() in RESERVED_HOTKEYS:
+                # ältere Macros mit s/p/n würden die Replay-Steuerung überschreiben: nicht registrieren
+                clashes.append(f"{row.get('name') or row['id']} ({key.upper()})")
+                key = None
+            self.hotkeys.set_macro_hotkey(row["id"], key)
+        if clashes:
+            self.statusBar().showMessage(
+                "Hotkey not active, letter is reserved for replay control: " + ", ".join(clashes), 6000)
 
     def _set_hotkey_for(self, macro_id: str):
         current = self._find_meta(macro_id).get("hotkey") or ""
@@ -611,8 +573,8 @@ class MainWindow(QMainWindow):
         else:
             if len(letter) != 1 or not letter.isalpha():
                 self.statusBar().showMessage("Please enter exactly one letter (a–z).", 3000); return
-            if letter == "s":
-                self.statusBar().showMessage("Letter 's' is reserved for Stop (Ctrl+Shift+Alt+S).", 4000); return
+            if letter in RESERVED_HOTKEYS:
+                self.statusBar().showMessage(f"Letter '{letter}' is reserved for {RESERVED_HOTKEYS[letter]} (Ctrl+Shift+Alt+{letter.upper()}).", 4000); return
             normalized = letter
         try:
             meta = self.store.set_hotkey(macro_id, normalized)
@@ -620,7 +582,7 @@ class MainWindow(QMainWindow):
                 if row["id"] == macro_id:
                     self._data[i] = meta
                     break
-            self._refresh_table()
+            self._apply_row_changes({macro_id}, [])
             shown = "removed" if not normalized else f"set to Ctrl+Shift+Alt+{normalized.upper()}"
             self.statusBar().showMessage(f"Hotkey {shown}.", 2500)
         except Exception as e:
@@ -642,14 +604,23 @@ class MainWindow(QMainWindow):
         box.setDefaultButton(QMessageBox.No)
         if box.exec() != QMessageBox.Yes:
             return
-        try:
+        if self.replay.is_running():
+            # der Replay-Prozess läuft im Makro-Ordner: erst löschen, wenn _poll_replay sein Ende sieht
             try:
-                self.replay.stop_replay()
+                self.replay.abort_replay()
             except Exception:
                 pass
+            if self.replay.is_running():
+                self._pending_deletes.append(macro_id)
+                self.statusBar().showMessage(f"Stopping replay, then deleting: {name}", 3000)
+                return
+        self._remove_macro(macro_id, name)
+
+    def _remove_macro(self, macro_id: str, name: str):
+        try:
             self.store.delete_macro(macro_id)
             self._data = [r for r in self._data if r.get("id") != macro_id]
-            self._refresh_table()
+            self._apply_row_changes(set(), [macro_id])
             self.statusBar().showMessage(f"Deleted: {name}", 3000)
         except Exception as e:
             self.statusBar().showMessage(f"Delete failed: {e}", 5000)
@@ -661,13 +632,30 @@ class MainWindow(QMainWindow):
     def _hotkey_stop_requested(self):
         print("[UI] hotkey_stop_requested()", flush=True)
         try:
-            self.replay.stop_replay()
-            self.statusBar().showMessage("Replay stopped (hotkey).", 2000)
+            self.replay.abort_replay()
+            self.statusBar().showMessage("Stopping replay (hotkey)…", 2000)
         except Exception as ex:
             self.statusBar().showMessage(f"Stop failed: {ex}", 2000)
 
+    def _hotkey_pause_requested(self):
+        print("[UI] hotkey_pause_requested()", flush=True)
+        if not self.replay.is_running():
+            return
+        paused = self.replay.toggle_pause()
+        self.statusBar().showMessage("Replay paused. (Resume: Ctrl+Shift+Alt+P, Step: Ctrl+Shift+Alt+N)" if paused else "Replay resumed.", 3000)
+
+    def _hotkey_step_requested(self):
+        print("[UI] hotkey_step_requested()", flush=True)
+        if self.replay.is_running() and self.replay.step_replay():
+            self.statusBar().showMessage("Stepping to next click…", 2000)
+
     def _poll_replay(self):
         err = self.replay.poll_finish()
+        if self._pending_deletes and not self.replay.is_running():
+            pending, self._pending_deletes = self._pending_deletes, []
+            for macro_id in pending:
+                meta = self._find_meta(macro_id)
+                self._remove_macro(macro_id, meta.get("name") if meta else macro_id)
         if err is not None:
             if err:
                 self.statusBar().showMessage(err, 5000)
@@ -766,11 +754,9 @@ class MainWindow(QMainWindow):
         QMenu::item { padding:6px 10px; border-radius:6px; }
         QMenu::item:selected { background:#1f1a12; color:#ffcf73; }
 
-        QTableWidget { background:#0f0f0f; color:#eaeaea; alternate-background-color:#101010; border:1px solid #242424; border-radius:8px; }
+        QTableView { background:#0f0f0f; color:#eaeaea; alternate-background-color:#101010; border:1px solid #242424; border-radius:8px; }
         QHeaderView::section { background:#121212; color:#bfbfbf; border:0; padding:12px; font-weight:700; border-bottom:2px solid #FFB238; }
 
-        #hotkeyPill { background:#FFB238; color:#111; border:none; border-radius:999px; padding:6px 12px; font-weight:700; }
-
-        QTableWidget::item:hover { background: rgba(255, 187, 80, 0.10); }
-        QTableWidget::item:selected { background: rgba(255, 187, 80, 0.22); color:#fff; }
+        QTableView::item:hover { background: rgba(255, 187, 80, 0.10); }
+        QTableView::item:selected { background: rgba(255, 187, 80, 0.22); color:#fff; }
         """)
@@ -23,6 +23,8 @@ class HotkeyService:
     - Standard: <ctrl>+<shift>+<alt> + <key/combination>
     - set_macro_hotkey(macro_id, key_or_combo)  # 'k' oder '<f5>' etc.
     - set_stop_hotkey(combo)                    # z.B. '<ctrl>+<shift>+<alt>+s'
+    - set_pause_hotkey(combo) / set_step_hotkey(combo)
+      -> on_pause_request / on_step_request (Steuerkanal des laufenden Replays)
 
     Extras:
       * Debounce (250 ms) gegen Doppel-Trigger
@@ -34,9 +36,13 @@ class HotkeyService:
     def __init__(self) -> None:
         self.on_start_request: Optional[Callable[[str], None]] = None
         self.on_stop_request: Optional[Callable[[], None]] = None
+        self.on_pause_request: Optional[Callable[[], None]] = None
+        self.on_step_request: Optional[Callable[[], None]] = None
 
         self._macro_map: Dict[str, str] = {}   # macro_id -> key_or_combo
         self._stop_combo: Optional[str] = None
+        self._pause_combo: Optional[str] = None
+        self._step_combo: Optional[str] = None
 
         self._listener: Optional["keyboard.GlobalHotKeys"] = None
         self._last_trigger_ms: float = 0.0
@@ -76,7 +82,20 @@ class HotkeyService:
         _log(f"set_stop_hotkey({repr(combo)})")
         self._rebuild_listener()
 
+    def set_pause_hotkey(self, combo: Optional[str]) -> None:
+        self._pause_combo = combo or None
+        _log(f"set_pause_hotkey({repr(combo)})")
+        self._rebuild_listener()
+
+    def set_step_hotkey(self, combo: Optional[str]) -> None:
+        self._step_combo = combo or None
+        _log(f"set_step_hotkey({repr(combo)})")
+        self._rebuild_listener()
+
     def set_macro_hotkey(self, macro_id: str, key_or_combo: Optional[str]) -> None:
+        if self._macro_map.get(macro_id) == (key_or_combo or None):
+            # unverändert: Listener nicht neu aufbauen (wird bei jedem Tabellen-Refresh aufgerufen)
+            return
         if key_or_combo:
             self._macro_map[macro_id] = key_or_combo
         else:
@@ -104,6 +123,10 @@ class HotkeyService:
         combo_map: Dict[str, Callable[[], None]] = {}
         if self._stop_combo:
             combo_map[self._stop_combo] = self._on_stop
+        if self._pause_combo:
+            combo_map[self._pause_combo] = self._on_pause
+        if self._step_combo:
+            combo_map[self._step_combo] = self._on_step
 
         for mid, key in self._macro_map.items():
             combo_map[self._with_base(key)] = self._make_start_cb(mid)
@@ -162,26 +185,36 @@ class HotkeyService:
         return _cb
 
     def _on_stop(self) -> None:
+        self._trigger_control("stop", lambda: self.on_stop_request)
+
+    def _on_pause(self) -> None:
+        self._trigger_control("pause", lambda: self.on_pause_request)
+
+    def _on_step(self) -> None:
+        self._trigger_control("step", lambda: self.on_step_request)
+
+    def _trigger_control(self, name: str, get_cb: Callable[[], Optional[Callable[[], None]]]) -> None:
         if self._debounced():
             return
-        _log("TRIGGER stop")
+        _log(f"TRIGGER {name}")
         self._release_modifiers_async()
 
         def invoke():
-            _log("CALL stop_cb")
+            _log(f"CALL {name}_cb")
             try:
-                if self.on_stop_request:
-                    self.on_stop_request()
+                cb = get_cb()
+                if cb:
+                    cb()
                 else:
-                    _log("WARN: on_stop_request not set")
+                    _log(f"WARN: on_{name}_request not set")
             except Exception as ex:
-                _log(f"ERROR in on_stop_request: {ex!r}")
+                _log(f"ERROR in on_{name}_request: {ex!r}")
 
         if self._ui_dispatch:
             try:
                 self._ui_dispatch(invoke)
             except Exception as ex:
-                _log(f"ERROR in ui_dispatch(stop): {ex!r}; fallback thread")
+                _log(f"ERROR in ui_dispatch({name}): {ex!r}; fallback thread")
                 threading.Thread(target=invoke, daemon=True).start()
         else:
             threading.Thread(target=invoke, daemon=True).start()
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Fortschritt in Bytes: (kopiert, gesamt)
+ProgressFn = Callable[[int, int], None]
+
+CHUNK_SIZE = 1 << 20
+# höchstens so viele Fortschrittsmeldungen pro Import (viele kleine Screenshots)
+PROGRESS_STEPS = 200
+
+
+class ImportCanceled(Exception):
+    pass
+
+
+class ImportMember:
+    """Eine zu kopierende Datei: Zielpfad relativ zum Macro-Ordner (mit "/"), Größe, Quelle."""
+
+    __slots__ = ("rel", "size", "open", "src_path")
+
+    def __init__(self, rel: str, size: int, opener: Callable[[], BinaryIO], src_path: Optional[str] = None) -> None:
+        self.rel = rel
+        self.size = size
+        self.open = opener
+        # nur bei Ordnern: Quelldatei, deren Zeitstempel übernommen werden (wie copy2)
+        self.src_path = src_path
+
+
+class ImportPlan:
+    def __init__(self, members: List[ImportMember], src_meta: Dict[str, Any], name: str) -> None:
+        self.members = members
+        self.src_meta = src_meta
+        # Name des Payload-Ordners (Fallback für den Macro-Namen)
+        self.name = name
+
+    @property
+    def total(self) -> int:
+        return sum(m.size for m in self.members)
+
+
+class _LineCounter:
+    """Zählt Zeilen wie die Iteration über eine Textdatei (\\n, \\r\\n und \\r trennen)."""
+
+    def __init__(self) -> None:
+        self.breaks = 0
+        self.last = b""
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.breaks += chunk.count(b"\n") + chunk.count(b"\r") - chunk.count(b"\r\n")
+        if self.last == b"\r" and chunk[:1] == b"\n":
+            self.breaks -= 1
+        self.last = chunk[-1:]
+
+    @property
+    def lines(self) -> int:
+        return self.breaks + (1 if self.last and self.last not in (b"\n", b"\r") else 0)
+
+
+def _safe_rel(parts: Iterable[str]) -> str:
+    parts = list(parts)
+    if not parts or any(p in ("", ".", "..") or ":" in p for p in parts):
+        raise ValueError(f"Ungültiger Pfad im Macro-Paket: {'/'.join(parts)}")
+    return "/".join(parts)
+
+
+# ----------------- ZIP -----------------
+
+def plan_zip(zf: zipfile.ZipFile, files: Any, fallback_name: str = "") -> ImportPlan:
+    """
+    Importplan aus dem Inhaltsverzeichnis eines ZIPs, ohne etwas zu entpacken. Der
+    Payload-Ordner wird nach denselben Regeln wie bei Ordnern bestimmt
+    (MacroStore._find_macro_payload_root), nachdem ein einzelner Top-Level-Ordner betreten wurde.
+    """
+    # Ordner (als Tupel) -> {Dateiname: ZipInfo}; spätere Einträge gleichen Namens gewinnen (wie getinfo)
+    tree: Dict[Tuple[str, ...], Dict[str, zipfile.ZipInfo]] = {(): {}}
+    for info in zf.infolist():
+        parts = tuple(p for p in info.filename.replace("\\", "/").split("/") if p)
+        if not parts:
+            continue
+        dirs = parts if info.is_dir() else parts[:-1]
+        for i in range(len(dirs) + 1):
+            tree.setdefault(dirs[:i], {})
+        if not info.is_dir():
+            tree[dirs][parts[-1]] = info
+
+    def children(d: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+        return sorted(k for k in tree if len(k) == len(d) + 1 and k[:len(d)] == d)
+
+    def has_logs(d: Tuple[str, ...]) -> bool:
+        names = {n.lower() for n in tree.get(d, {})}
+        return files.ACTIONS.lower() in names or files.ACTIONS_FIXED.lower() in names
+
+    top = [k for k in children(()) if not k[0].startswith("__MACOSX")]
+    top_files = [n for n in tree[()] if not n.startswith("__MACOSX")]
+    start: Tuple[str, ...] = top[0] if len(top) == 1 and not top_files else ()
+
+    payload = start
+    if not has_logs(start):
+        subdirs = [k for k in children(start) if not k[-1].startswith("__MACOSX")]
+        if len(subdirs) == 1 and has_logs(subdirs[0]):
+            payload = subdirs[0]
+        else:
+            found = sorted((k for k in tree if len(k) > len(start) and k[:len(start)] == start and has_logs(k)),
+                           key=lambda k: (len(k), k))
+            if found:
+                payload = found[0]
+
+    here = tree.get(payload, {})
+
+    def resolve(name: str) -> Optional[zipfile.ZipInfo]:
+        want = name.lower()
+        for n, info in here.items():
+            if n.lower() == want:
+                return info
+        return None
+
+    def member(rel: str, info: zipfile.ZipInfo) -> ImportMember:
+        return ImportMember(rel, info.file_size, lambda info=info: zf.open(info))
+
+    members: List[ImportMember] = []
+    for log in (files.ACTIONS, files.MOVES):
+        info = resolve(log)
+        if info is None:
+            raise FileNotFoundError(f"{log} wurde nicht gefunden.")
+        members.append(member(log, info))
+    fixed = resolve(files.ACTIONS_FIXED)
+    if fixed is not None:
+        members.append(member(files.ACTIONS_FIXED, fixed))
+    for opt in (files.SCREENSHOTS, files.RESULTS):
+        base = payload + (opt,)
+        for d in sorted(k for k in tree if k[:len(base)] == base):
+            for n, info in tree[d].items():
+                members.append(member(_safe_rel((opt,) + d[len(base):] + (n,)), info))
+
+    src_meta: Dict[str, Any] = {}
+    meta_info = here.get(files.META)
+    if meta_info is not None:
+        try:
+            loaded = json.loads(zf.read(meta_info).decode("utf-8"))
+            src_meta = loaded if isinstance(loaded, dict) else {}
+        except Exception:
+            src_meta = {}
+    return ImportPlan(members, src_meta, payload[-1] if payload else fallback_name)
+
+
+# ----------------- Ordner -----------------
+
+def plan_folder(src_p: Path, files: Any) -> ImportPlan:
+    """Importplan aus einem (Payload-)Ordner; Dateigrößen per stat."""
+
+    def resolve(name: str) -> Optional[Path]:
+        want = name.lower()
+        try:
+            for f in src_p.iterdir():
+                if f.name.lower() == want and f.is_file():
+                    return f
+        except Exception:
+            pass
+        return None
+
+    def member(rel: str, p: str | Path) -> ImportMember:
+        p = str(p)
+        return ImportMember(rel, os.stat(p).st_size, lambda p=p: open(p, "rb"), p)
+
+    members: List[ImportMember] = []
+    for log in (files.ACTIONS, files.MOVES):
+        src_log = resolve(log)
+        if not src_log:
+            raise FileNotFoundError(f"{log} wurde nicht gefunden.")
+        members.append(member(log, src_log))
+    fixed = resolve(files.ACTIONS_FIXED)
+    if fixed is not None:
+        members.append(member(files.ACTIONS_FIXED, fixed))
+    for opt in (files.SCREENSHOTS, files.RESULTS):
+        base = src_p / opt
+        if not base.is_dir():
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames.sort()
+            rel_dir = Path(dirpath).relative_to(base).parts
+            for n in sorted(filenames):
+                members.append(member(_safe_rel((opt,) + rel_dir + (n,)), os.path.join(dirpath, n)))
+
+    src_meta: Dict[str, Any] = {}
+    meta_path = src_p / files.META
+    if meta_path.exists():
+        try:
+            loaded = json.loads(meta_path.read_text(encoding="utf-8"))
+            src_meta = loaded if isinstance(loaded, dict) else {}
+        except Exception:
+            src_meta = {}
+    return ImportPlan(members, src_meta, src_p.name)
+
+
+# ----------------- Kopieren -----------------
+
+def stream_members(plan: ImportPlan, dst: Path, progress: Optional[ProgressFn] = None,
+                   cancel: Optional[threading.Event] = None, count_lines: Iterable[str] = ()) -> Dict[str, int]:
+    """
+    Kopiert alle Dateien des Plans blockweise nach dst (ein Durchgang, kein Zwischenordner)
+    und prüft je Datei die geschriebene Größe; ZIP-Einträge prüfen zusätzlich ihre CRC.
+    cancel wird vor jedem Block geprüft (ImportCanceled); aufräumen muss der Aufrufer.
+    Rückgabe: Zeilenzahlen der Dateien aus count_lines, beim Kopieren mitgezählt.
+    """
+    total = plan.total
+    step = max(total // PROGRESS_STEPS, 1)
+    done = 0
+    next_report = step
+    wanted: Set[str] = set(count_lines)
+    lines: Dict[str, int] = {}
+    if progress is not None:
+        progress(0, total)
+    for m in plan.members:
+        if cancel is not None and cancel.is_set():
+            raise ImportCanceled()
+        target = dst.joinpath(*m.rel.split("/"))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        counter = _LineCounter() if m.rel in wanted else None
+        written = 0
+        with m.open() as fsrc, open(target, "wb") as fdst:
+            while True:
+                chunk = fsrc.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                fdst.write(chunk)
+                written += len(chunk)
+                done += len(chunk)
+                if counter is not None:
+                    counter.feed(chunk)
+                if progress is not None and done >= next_report:
+                    progress(done, total)
+                    next_report = done + step
+                if cancel is not None and cancel.is_set():
+                    raise ImportCanceled()
+        if written != m.size:
+            raise ValueError(f"{m.rel}: {written} statt {m.size} Bytes gelesen.")
+        if m.src_path is not None:
+            try:
+                shutil.copystat(m.src_path, target)
+            except OSError:
+                pass
+        if counter is not None:
+            lines[m.rel] = counter.lines
+    if progress is not None:
+        progress(total, total)
+    return lines
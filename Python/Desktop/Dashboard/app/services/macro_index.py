@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# user_version der Datenbank: 0 = neu angelegt, 1 = index.json übernommen
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS macros (
+    id            TEXT PRIMARY KEY,
+    dir           TEXT,
+    meta          TEXT,
+    meta_mtime_ns INTEGER,
+    meta_size     INTEGER
+);
+"""
+
+_COLUMNS = ("id", "dir", "meta", "meta_mtime_ns", "meta_size")
+
+_UPSERT = (
+    f"INSERT INTO macros ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)}) "
+    "ON CONFLICT(id) DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS[1:])
+)
+
+
+class MacroIndex:
+    """
+    Eingebetteter SQLite-Index über alle Macros eines Roots (ersetzt index.json).
+
+    Eine Zeile pro Macro: id, Ordner, die vollständige meta.json und deren Stat (mtime_ns, Größe).
+    Gelesen wird nur id -> Ordner und der Startstand des MetaCache; Filter und Suche
+    laufen im Speicher (SearchIndex), daher keine weiteren Spalten.
+    Schreibzugriffe ändern genau eine Zeile in einer Transaktion; beim Abgleich mit den
+    Ordnern (über den MetaCache) werden nur die Zeilen geänderter Ordner geschrieben.
+    """
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.path = Path(db_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        # Dashboard-Threads (Recorder, Import) teilen sich die Verbindung, daher Lock statt Thread-Bindung
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError:
+                pass
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    # ---------------- Migration ----------------
+
+    def migrate_from_json(self, index_path: str | Path, root: str | Path) -> int:
+        """
+        Einmalige Übernahme einer alten index.json. Die Zeilen bekommen noch keine meta,
+        der nächste Abgleich liest deren Ordner daher vollständig ein. Rückgabe: übernommene Zeilen.
+        """
+        with self._lock:
+            version = int(self._conn.execute("PRAGMA user_version").fetchone()[0])
+        if version >= SCHEMA_VERSION:
+            return 0
+        rows: List[Dict[str, Any]] = []
+        try:
+            p = Path(index_path)
+            if p.exists():
+                txt = p.read_text(encoding="utf-8")
+                loaded = json.loads(txt) if txt.strip() else []
+                rows = [r for r in loaded if isinstance(r, dict) and r.get("id")]
+        except Exception:
+            rows = []
+        with self._lock, self._conn:
+            for r in rows:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO macros (id, dir) VALUES (?, ?)",
+                    (r["id"], str(Path(root) / str(r["id"]))),
+                )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return len(rows)
+
+    # ---------------- Schreiben ----------------
+
+    @staticmethod
+    def _row(meta: Dict[str, Any], d: str, stamp: Optional[Tuple[int, int]]) -> Tuple[Any, ...]:
+        return (
+            meta.get("id"), d, json.dumps(meta, ensure_ascii=False),
+            stamp[0] if stamp is not None else None, stamp[1] if stamp is not None else None,
+        )
+
+    def upsert(self, meta: Dict[str, Any], d: str | Path, stamp: Optional[Tuple[int, int]] = None) -> None:
+        """Legt die Zeile eines Macros an bzw. ersetzt sie (stamp: (mtime_ns, Größe) der meta.json)."""
+        if not meta.get("id"):
+            return
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT, self._row(meta, str(d), stamp))
+
+    def delete(self, macro_id: str) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM macros WHERE id = ?", (macro_id,))
+            return cur.rowcount > 0
+
+    # ---------------- Abgleich mit den Ordnern ----------------
+
+    def snapshot(self) -> Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]]:
+        """Gespeicherte Stände je Ordner: {dir: ((mtime_ns, size), meta)} (Startwerte für den MetaCache)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dir, meta, meta_mtime_ns, meta_size FROM macros "
+                "WHERE meta IS NOT NULL AND meta_mtime_ns IS NOT NULL"
+            ).fetchall()
+        return {r["dir"]: ((r["meta_mtime_ns"], r["meta_size"]), json.loads(r["meta"])) for r in rows}
+
+    def sync(self, entries: Iterable[Tuple[str, Tuple[int, int], Dict[str, Any]]],
+             changed: Iterable[str]) -> Tuple[int, int]:
+        """
+        Übernimmt den Stand der Ordner: entries = alle aktuellen (dir, stamp, meta).
+        Geschrieben werden nur Zeilen geänderter oder verschobener Ordner; Zeilen ohne Ordner fallen weg.
+        Rückgabe: (geschriebene, entfernte) Zeilen.
+        """
+        changed_set = set(changed)
+        written = 0
+        with self._lock, self._conn:
+            known = {r["id"]: r["dir"] for r in self._conn.execute("SELECT id, dir FROM macros")}
+            current = set()
+            for d, stamp, meta in entries:
+                mid = meta.get("id")
+                if not mid:
+                    continue
+                current.add(mid)
+                if d in changed_set or known.get(mid) != d:
+                    self._conn.execute(_UPSERT, self._row(meta, d, stamp))
+                    written += 1
+            stale = [mid for mid in known if mid not in current]
+            for mid in stale:
+                self._conn.execute("DELETE FROM macros WHERE id = ?", (mid,))
+        return written, len(stale)
+
+    # ---------------- Lesen ----------------
+
+    def dir_for(self, macro_id: str) -> Optional[str]:
+        with self._lock:
+            r = self._conn.execute("SELECT dir FROM macros WHERE id = ?", (macro_id,)).fetchone()
+        return r["dir"] if r is not None else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM macros").fetchone()[0])
@@ -7,9 +7,14 @@ import uuid
 import datetime
 import zipfile
 import re
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
+
+from .macro_import import ImportPlan, ProgressFn, plan_folder, plan_zip, stream_members
+from .macro_index import MacroIndex
+from .meta_cache import META_CACHE, MetaCache, meta_stamp
 
 
 APP_VENDOR = "EON"
@@ -65,11 +70,15 @@ class FileNames:
     MOVES: str = "mouse_moves.log"
     META: str = "meta.json"
     INDEX: str = "index.json"
+    INDEX_DB: str = "index.sqlite3"
     SCREENSHOTS: str = "screenshots"
     RESULTS: str = "results"
 
 
 class MacroStore:
+    # prozessweit geteilt: alle Instanzen sehen dieselben, per stat validierten Metas
+    _meta_cache: MetaCache = META_CACHE
+
     # ----------------- Config (Root) -----------------
     @staticmethod
     def get_config_root() -> Path:
@@ -93,9 +102,8 @@ class MacroStore:
         self.root.mkdir(parents=True, exist_ok=True)
 
         self._files = FileNames()
-        self._index_path = self.root / self._files.INDEX
-        if not self._index_path.exists():
-            self._write_index([])
+        self._index = self._open_index(self.root)
+        self._index_synced = False
 
     # ----------------- Root switch / Migration -----------------
     def probe_macros(self, base: Optional[str | Path] = None) -> List[Path]:
@@ -160,39 +168,52 @@ class MacroStore:
                 pass
 
         # Root umstellen
+        self._index.close()
         self.root = new_root_p
-        self._index_path = self.root / self._files.INDEX
-        if not self._index_path.exists():
-            self._write_index([])
+        self._index = self._open_index(self.root)
+        self._index_synced = False
 
         # Setting persistieren
         self.save_config_root(self.root)
 
     # ----------------- Index helpers -----------------
-    def _read_index(self) -> List[Dict[str, Any]]:
-        try:
-            if not self._index_path.exists():
-                return []
-            txt = self._index_path.read_text(encoding="utf-8")
-            return json.loads(txt) if txt.strip() else []
-        except Exception:
-            return []
+    def _open_index(self, root: Path) -> MacroIndex:
+        """SQLite-Index des Roots; eine vorhandene index.json wird einmalig übernommen."""
+        index = MacroIndex(root / self._files.INDEX_DB)
+        index.migrate_from_json(root / self._files.INDEX, root)
+        return index
 
-    def _write_index(self, rows: List[Dict[str, Any]]) -> None:
-        try:
-            self._index_path.parent.mkdir(parents=True, exist_ok=True)
-            self._index_path.write_text(
-                json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8"
-            )
-        except Exception:
-            pass
+    def _refresh(self) -> List[Any]:
+        """
+        Gleicht Cache und Index mit den Ordnern ab; gelesen werden nur geänderte meta.json.
+        Rückgabe: aktuelle Cache-Einträge (inkl. Kopien mit doppelter id).
+        """
+        entries, changed, removed = self._meta_cache.refresh(
+            self.root, self._files.META, self._load_meta_from_dir, seed=self._index.snapshot
+        )
+        if changed or removed or not self._index_synced:
+            self._index.sync(((e.dir, e.stamp, e.meta) for e in entries if self._meta_cache.owns(e)), changed)
+            self._index_synced = True
+        return entries
+
+    def _meta(self, d: Path) -> Optional[Dict[str, Any]]:
+        """Meta eines Ordners aus dem Cache (liest die Datei nur nach Änderungen)."""
+        return self._meta_cache.get(d, self._files.META, self._load_meta_from_dir)
+
+    def _index_dir(self, d: Path) -> Optional[Dict[str, Any]]:
+        """Liest die meta.json eines Ordners neu und schreibt genau dessen Cache-Eintrag und Indexzeile."""
+        d = _canonical(d)
+        stamp = meta_stamp(d / self._files.META)
+        if stamp is None:
+            return None
+        meta = self._load_meta_from_dir(d)
+        if meta:
+            self._meta_cache.put(d, meta, stamp)
+            self._index.upsert(meta, d, stamp)
+        return meta
 
-    def _find_index_row(self, macro_id: str) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
-        rows = self._read_index()
-        for i, r in enumerate(rows):
-            if r.get("id") == macro_id:
-                return i, r
-        return None, None
+    def close(self) -> None:
+        self._index.close()
 
     # ----------------- Path helpers -----------------
     def dir_for(self, macro_id: str) -> str:
@@ -202,21 +223,13 @@ class MacroStore:
         p = _canonical(self.root / macro_id)
         if (p / self._files.META).exists():
             return p
-        try:
-            for d in self.root.iterdir():
-                if not d.is_dir():
-                    continue
-                meta_path = d / self._files.META
-                if not meta_path.exists():
-                    continue
-                try:
-                    j = json.loads(meta_path.read_text(encoding="utf-8"))
-                    if j.get("id") == macro_id:
-                        return d
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        # O(1) über die id->Ordner-Zuordnung; ein Abgleich nur, wenn die id unbekannt ist
+        for attempt in range(2):
+            known = self._meta_cache.dir_for(self.root, macro_id) or self._index.dir_for(macro_id)
+            if known and (Path(known) / self._files.META).exists():
+                return Path(known)
+            if attempt == 0:
+                self._refresh()
         return None
 
     def find_existing_dir(self, macro_id: str) -> Optional[str]:
@@ -262,113 +275,37 @@ class MacroStore:
     def get_display_name(self, macro_id: str) -> str:
         """Bevorzugt name aus meta.json, fallback: Ordnername, fallback: macro_id."""
         d = self._guess_dir_for(macro_id)
-        if d and (d / self._files.META).exists():
-            try:
-                j = json.loads((d / self._files.META).read_text(encoding="utf-8"))
-                nm = (j.get("name") or "").strip()
-                if nm:
-                    return nm
-            except Exception:
-                pass
-            return d.name
+        if d:
+            j = self._meta(d) or {}
+            nm = (j.get("name") or "").strip()
+            return nm or d.name
         return macro_id
 
     # ----------------- Load / add / update -----------------
     def load_all(self) -> List[Dict[str, Any]]:
-        index_rows = self._read_index()
-        results: List[Dict[str, Any]] = []
-        valid_ids: List[str] = []
-
-        for r in index_rows:
-            mid = r.get("id")
-            if not mid:
-                continue
-            d = self._guess_dir_for(mid)
-            if not d:
-                continue
-            disk = self._load_meta_from_dir(d)
-            if not disk:
-                continue
-
-            merged = dict(r)
-            merged.update(disk)
-            merged.setdefault("name", merged.get("id", "Unnamed"))
-            merged.setdefault("description", "")
-            merged.setdefault("author", "")
-            merged.setdefault("category", "Utilities")
-            merged.setdefault("hotkey", None)
-
-            results.append(merged)
-            valid_ids.append(mid)
-
-        seen = set(valid_ids)
-        try:
-            for d in self.root.iterdir():
-                if not d.is_dir():
-                    continue
-                disk = self._load_meta_from_dir(d)
-                if not disk:
-                    continue
-                if disk.get("id") not in seen:
-                    results.append(disk)
-                    valid_ids.append(disk.get("id"))
-        except Exception:
-            pass
-
-        old_ids = [r.get("id") for r in index_rows if r.get("id")]
-        if set(old_ids) != set(valid_ids):
-            try:
-                rows_out: List[Dict[str, Any]] = []
-                for meta in results:
-                    rows_out.append({
-                        "id": meta.get("id"),
-                        "name": meta.get("name"),
-                        "author": meta.get("author", ""),
-                        "category": meta.get("category", "Utilities"),
-                        "downloaded_at": meta.get("downloaded_at"),
-                        "hotkey": meta.get("hotkey"),
-                        "description": meta.get("description", ""),
-                    })
-                def _key(x):
-                    return x.get("downloaded_at") or x.get("created_at") or ""
-                rows_out = sorted(rows_out, key=_key, reverse=True)
-                self._write_index(rows_out)
-            except Exception:
-                pass
+        """
+        Alle Macros, neueste zuerst. Kommt aus dem MetaCache; neu gelesen werden nur
+        meta.json-Dateien, die sich seit dem letzten Abgleich geändert haben.
+        """
+        entries = self._refresh()
+        rows = [dict(e.meta) for e in entries if self._meta_cache.owns(e)]
 
-        def _key_res(x):
+        def _key(x):
             return x.get("downloaded_at") or x.get("created_at") or ""
-        return sorted(results, key=_key_res, reverse=True)
+        return sorted(rows, key=_key, reverse=True)
 
-    def add_from_zip(self, zip_path: str) -> Dict[str, Any]:
-        import tempfile
+    def add_from_zip(self, zip_path: str, progress: Optional[ProgressFn] = None,
+                     cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Importiert ein Macro-ZIP: die benötigten Einträge werden direkt aus dem Archiv in den
+        neuen Macro-Ordner gestreamt (kein temporäres Entpacken, kein zweites Kopieren).
+        progress(kopiert, gesamt) meldet Bytes; ein gesetztes cancel bricht ab und entfernt den Ordner.
+        """
         p = Path(zip_path)
         if not zip_path or not p.is_file():
             raise FileNotFoundError("ZIP nicht gefunden.")
-        with tempfile.TemporaryDirectory() as td:
-            td_p = Path(td)
-            with zipfile.ZipFile(p, "r") as zf:
-                zf.extractall(td)
-
-            # Falls das ZIP genau einen Top-Level-Ordner enthält, in diesen Ordner wechseln
-            entries = [e for e in td_p.iterdir() if not e.name.startswith("__MACOSX")]
-            if len(entries) == 1 and entries[0].is_dir():
-                src_root = entries[0]
-            else:
-                # sonst: direkt das temp-Verzeichnis nutzen
-                src_root = td_p
-
-            return self.add_from_folder(str(src_root))
-
-    def _try_load_src_meta(self, src_p: Path) -> Optional[Dict[str, Any]]:
-        """Liest (falls vorhanden) eine meta.json im Quellordner und gibt sie zurück."""
-        meta_path = src_p / self._files.META
-        if meta_path.exists():
-            try:
-                return json.loads(meta_path.read_text(encoding="utf-8"))
-            except Exception:
-                return None
-        return None
+        with zipfile.ZipFile(p, "r") as zf:
+            return self._import(plan_zip(zf, self._files, fallback_name=p.stem), progress, cancel)
 
     def _find_macro_payload_root(self, src_p: Path) -> Path:
         """
@@ -413,64 +350,57 @@ class MacroStore:
         # Fallback: original (führt ggf. zu "actions.log wurde nicht gefunden.")
         return src_p
 
-    def add_from_folder(self, src: str) -> Dict[str, Any]:
+    def add_from_folder(self, src: str, progress: Optional[ProgressFn] = None,
+                        cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
         src_p = _canonical(src)
         # ➜ Payload-Root finden (springt in den einzigen Unterordner oder sucht die Logs)
         src_p = self._find_macro_payload_root(src_p)
+        return self._import(plan_folder(src_p, self._files), progress, cancel)
 
+    def _import(self, plan: ImportPlan, progress: Optional[ProgressFn],
+                cancel: Optional[threading.Event]) -> Dict[str, Any]:
+        """
+        Kopiert den Plan in einen neuen Macro-Ordner und schreibt zuletzt die meta.json; erst
+        mit ihr gilt der Ordner als Macro (MetaCache/Index). Bei Abbruch oder Fehler wird der
+        Ordner wieder entfernt.
+        """
         mid = str(uuid.uuid4())
         dst = _canonical(self.root / mid)
         dst.mkdir(parents=True, exist_ok=True)
-
-        def _resolve_case(p: Path, name: str) -> Optional[Path]:
-            want = name.lower()
-            try:
-                for f in p.iterdir():
-                    if f.name.lower() == want:
-                        return f
-            except Exception:
-                pass
-            return None
-
-        for log in (self._files.ACTIONS, self._files.MOVES):
-            src_log = _resolve_case(src_p, log)
-            if not src_log:
-                raise FileNotFoundError(f"{log} wurde nicht gefunden.")
-            shutil.copy2(src_log, dst / log)
-
-        if (src_p / self._files.ACTIONS_FIXED).exists():
-            shutil.copy2(src_p / self._files.ACTIONS_FIXED, dst / self._files.ACTIONS_FIXED)
-        for opt in (self._files.SCREENSHOTS, self._files.RESULTS):
-            s = src_p / opt
-            if s.is_dir():
-                shutil.copytree(s, dst / opt, dirs_exist_ok=True)
-
-        counts = {
-            self._files.ACTIONS: self._safe_count_lines(dst / self._files.ACTIONS),
-            self._files.MOVES: self._safe_count_lines(dst / self._files.MOVES),
-        }
-
-        # Name priorisieren: meta.json im Source > Ordnername
-        src_meta = self._try_load_src_meta(src_p) or {}
-        src_name = (src_meta.get("name") or "").strip()
-        default_name = src_name or (src_p.name or dst.name)
-
-        meta = {
-            "id": mid,
-            "name": default_name,
-            "author": src_meta.get("author", ""),
-            "category": src_meta.get("category", "Utilities"),
-            "created_at": src_meta.get("created_at", _now_iso()),
-            "downloaded_at": _now_iso(),
-            "hotkey": None,
-            "version": 2,
-            "files": [fn for fn in (self._files.ACTIONS, self._files.MOVES) if (dst / fn).exists()],
-            "counts": counts,
-            "description": src_meta.get("description", ""),
-            "extra": src_meta.get("extra", {}),
-        }
-        (dst / self._files.META).write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
-        self._add_to_index(meta)
+        try:
+            lines = stream_members(plan, dst, progress, cancel,
+                                   count_lines=(self._files.ACTIONS, self._files.MOVES))
+            counts = {
+                self._files.ACTIONS: lines.get(self._files.ACTIONS, 0),
+                self._files.MOVES: lines.get(self._files.MOVES, 0),
+            }
+
+            # Name priorisieren: meta.json im Source > Ordnername
+            src_meta = plan.src_meta
+            src_name = (src_meta.get("name") or "").strip()
+            default_name = src_name or (plan.name or dst.name)
+
+            meta = {
+                "id": mid,
+                "name": default_name,
+                "author": src_meta.get("author", ""),
+                "category": src_meta.get("category", "Utilities"),
+                "created_at": src_meta.get("created_at", _now_iso()),
+                "downloaded_at": _now_iso(),
+                "hotkey": None,
+                "version": 2,
+                "files": [fn for fn in (self._files.ACTIONS, self._files.MOVES) if (dst / fn).exists()],
+                "counts": counts,
+                "description": src_meta.get("description", ""),
+                "extra": src_meta.get("extra", {}),
+            }
+            tmp = dst / (self._files.META + ".tmp")
+            tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp, dst / self._files.META)
+        except BaseException:
+            shutil.rmtree(dst, ignore_errors=True)
+            raise
+        self._index_dir(dst)
         return meta
 
     # ----------------- Utils -----------------
@@ -483,20 +413,6 @@ class MacroStore:
         except Exception:
             return 0
 
-    def _add_to_index(self, meta: Dict[str, Any]) -> None:
-        rows = self._read_index()
-        entry = {
-            "id": meta.get("id"),
-            "name": meta.get("name"),
-            "author": meta.get("author", ""),
-            "category": meta.get("category", "Utilities"),
-            "downloaded_at": meta.get("downloaded_at"),
-            "hotkey": meta.get("hotkey"),
-            "description": meta.get("description", ""),
-        }
-        rows = [entry] + [r for r in rows if r.get("id") != entry["id"]]
-        self._write_index(rows)
-
     def update_meta_fields(self, macro_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
         d = self._guess_dir_for(macro_id)
         if not d:
@@ -524,23 +440,7 @@ class MacroStore:
 
         meta.update(update)
         meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
-
-        rows = self._read_index()
-        for i, r in enumerate(rows):
-            if r.get("id") == macro_id:
-                rows[i] = {
-                    **r,
-                    "name": meta.get("name", r.get("name")),
-                    "author": meta.get("author", r.get("author", "")),
-                    "category": meta.get("category", r.get("category", "Utilities")),
-                    "downloaded_at": meta.get("downloaded_at", r.get("downloaded_at")),
-                    "hotkey": meta.get("hotkey", r.get("hotkey")),
-                    "description": meta.get("description", r.get("description", "")),
-                }
-                self._write_index(rows)
-                break
-        else:
-            self._add_to_index(meta)
+        self._index_dir(d)
 
         return meta
 
@@ -553,14 +453,12 @@ class MacroStore:
             d = self._guess_dir_for(macro_id)
             if d and d.exists():
                 shutil.rmtree(d, ignore_errors=True)
+                self._meta_cache.drop(d)
                 removed = True
         except Exception:
             pass
         try:
-            rows = self._read_index()
-            new_rows = [r for r in rows if r.get("id") != macro_id]
-            if len(new_rows) != len(rows):
-                self._write_index(new_rows)
+            if self._index.delete(macro_id):
                 removed = True
         except Exception:
             pass
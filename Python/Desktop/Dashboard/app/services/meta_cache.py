@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (mtime_ns, size) der meta.json
+Stamp = Tuple[int, int]
+
+
+class MetaEntry:
+    __slots__ = ("dir", "stamp", "meta")
+
+    def __init__(self, d: str, stamp: Stamp, meta: Dict[str, Any]) -> None:
+        self.dir = d
+        self.stamp = stamp
+        self.meta = meta
+
+
+def meta_stamp(meta_path: str | Path) -> Optional[Stamp]:
+    try:
+        st = os.stat(meta_path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class MetaCache:
+    """
+    Prozessweiter Cache der meta.json-Inhalte, Schlüssel ist der Macro-Ordner.
+
+    Ein Eintrag gilt, solange (mtime_ns, Größe) der meta.json gleich sind; die Prüfung
+    kostet ein stat statt Lesen und JSON-Parsen. Die id->Ordner-Zuordnung macht Suchen
+    nach id O(1) (je Root, ein kopierter Root hat dieselben ids); bei mehreren Ordnern
+    mit gleicher id im selben Root bleibt der zuerst bekannte maßgeblich.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._by_dir: Dict[str, MetaEntry] = {}
+        # (Root, id) -> Ordner
+        self._by_id: Dict[Tuple[str, str], str] = {}
+
+    # ---------------- Einzelzugriff ----------------
+
+    def get(self, d: str | Path, meta_name: str,
+            load: Callable[[Path], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Meta des Ordners (Kopie); liest die Datei nur, wenn sie sich seit dem letzten Mal geändert hat."""
+        key = os.path.abspath(str(d))
+        stamp = meta_stamp(os.path.join(key, meta_name))
+        if stamp is None:
+            self.drop(key)
+            return None
+        with self._lock:
+            entry = self._by_dir.get(key)
+            if entry is not None and entry.stamp == stamp:
+                return dict(entry.meta)
+        meta = load(Path(key))
+        if not meta:
+            self.drop(key)
+            return None
+        self.put(key, meta, stamp)
+        return dict(meta)
+
+    def put(self, d: str | Path, meta: Dict[str, Any], stamp: Stamp) -> None:
+        key = os.path.abspath(str(d))
+        with self._lock:
+            old = self._by_dir.get(key)
+            if old is not None and old.meta.get("id") != meta.get("id"):
+                self._unmap(old)
+            self._by_dir[key] = MetaEntry(key, stamp, dict(meta))
+            mid = meta.get("id")
+            if mid:
+                owner = self._by_id.get((os.path.dirname(key), mid))
+                if owner is None or owner not in self._by_dir:
+                    self._by_id[(os.path.dirname(key), mid)] = key
+
+    def drop(self, d: str | Path) -> None:
+        key = os.path.abspath(str(d))
+        with self._lock:
+            entry = self._by_dir.pop(key, None)
+            if entry is not None:
+                self._unmap(entry)
+
+    def _unmap(self, entry: MetaEntry) -> None:
+        id_key = (os.path.dirname(entry.dir), entry.meta.get("id"))
+        if id_key[1] and self._by_id.get(id_key) == entry.dir:
+            del self._by_id[id_key]
+            # eine Kopie mit gleicher id übernimmt
+            for other in self._by_dir.values():
+                if other is not entry and (os.path.dirname(other.dir), other.meta.get("id")) == id_key:
+                    self._by_id[id_key] = other.dir
+                    break
+
+    def dir_for(self, root: str | Path, macro_id: str) -> Optional[str]:
+        with self._lock:
+            return self._by_id.get((os.path.abspath(str(root)), macro_id))
+
+    def owns(self, entry: MetaEntry) -> bool:
+        """True, wenn der Ordner der maßgebliche für seine id ist (keine Kopie)."""
+        with self._lock:
+            return self._by_id.get((os.path.dirname(entry.dir), entry.meta.get("id"))) == entry.dir
+
+    # ---------------- Abgleich ----------------
+
+    def refresh(self, root: str | Path, meta_name: str, load: Callable[[Path], Optional[Dict[str, Any]]],
+                seed: Optional[Callable[[], Dict[str, Tuple[Stamp, Dict[str, Any]]]]] = None
+                ) -> Tuple[List[MetaEntry], List[str], List[str]]:
+        """
+        Gleicht alle Macro-Ordner unter root ab (ein stat pro meta.json) und liest nur
+        geänderte meta.json neu. seed liefert bei leerem Cache bekannte Stände (z.B. aus
+        dem SQLite-Index), damit ein Neustart nicht alle Dateien lesen muss.
+        Rückgabe: (aktuelle Einträge, neu gelesene Ordner, entfernte Ordner).
+        """
+        root_key = os.path.abspath(str(root))
+        seeded: Optional[Dict[str, Tuple[Stamp, Dict[str, Any]]]] = None
+        present: List[Tuple[str, Stamp]] = []
+        try:
+            scan = list(os.scandir(root_key))
+        except OSError:
+            scan = []
+        for entry in scan:
+            try:
+                if not entry.is_dir():
+                    continue
+            except OSError:
+                continue
+            stamp = meta_stamp(os.path.join(entry.path, meta_name))
+            if stamp is not None:
+                present.append((os.path.abspath(entry.path), stamp))
+
+        changed: List[str] = []
+        for d, stamp in present:
+            with self._lock:
+                entry = self._by_dir.get(d)
+            if entry is not None and entry.stamp == stamp:
+                continue
+            if entry is None and seed is not None:
+                if seeded is None:
+                    seeded = seed()
+                known = seeded.get(d)
+                if known is not None and known[0] == stamp and known[1]:
+                    self.put(d, known[1], stamp)
+                    continue
+            meta = load(Path(d))
+            if meta:
+                self.put(d, meta, stamp)
+                changed.append(d)
+            else:
+                self.drop(d)
+
+        keep = {d for d, _ in present}
+        with self._lock:
+            removed = [d for d in self._by_dir if os.path.dirname(d) == root_key and d not in keep]
+        for d in removed:
+            self.drop(d)
+        with self._lock:
+            entries = [self._by_dir[d] for d, _ in present if d in self._by_dir]
+        return entries, changed, removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_dir.clear()
+            self._by_id.clear()
+
+
+# ein Cache für alle MacroStore-Instanzen des Prozesses (Hauptfenster, Einstellungen, Recorder)
+META_CACHE = MetaCache()
@@ -31,12 +31,19 @@ def _parse_name(fname: str) -> Optional[Tuple[int, int, int]]:
 class ReplayService:
     """
     Startet optional zuerst ein 'startup_program' aus meta.json und erst DANN den Macro-Client.
+
+    Steuerung des laufenden Replays über stdin des Replay-Prozesses (eine Zeile pro Befehl):
+      pause / resume / step (bis zum nächsten Klick) / abort (gibt gehaltene Tasten/Buttons frei)
     """
 
     def __init__(self, store: MacroStore, client_dir: Optional[Path] = None) -> None:
         self.store = store
         self._proc: Optional[subprocess.Popen] = None
         self._running_id: Optional[str] = None
+        self._paused = False
+        # laufendes Beenden: "abort" (Steuerkanal) -> "terminate" -> "kill", je mit Frist
+        self._stop_stage: Optional[str] = None
+        self._stop_deadline: Optional[float] = None
         self.on_started: Optional[Callable[[str], None]] = None
         self.on_finished: Optional[Callable[[str, Optional[str]], None]] = None
 
@@ -63,22 +70,30 @@ class ReplayService:
             raise ReplayError(f"Benötigt: {actions.name} + {moves.name} in {macro_dir}")
 
         # Ordner sicherstellen
+        results = macro_dir / "results"
         (macro_dir / "screenshots").mkdir(parents=True, exist_ok=True)
-        (macro_dir / "results").mkdir(parents=True, exist_ok=True)
+        results.mkdir(parents=True, exist_ok=True)
 
         # ---- NEU: Startup-Programm VOR dem Macro öffnen ----
         self._maybe_start_startup_program(macro_dir)
 
-        # Actions-Datei normalisieren (Icons)
-        fixed_actions = self._prepare_actions_file(macro_dir, actions)
+        # Actions-Datei normalisieren (Icons) – nur wenn Log oder Screenshots neuer sind
+        fixed_actions = macro_dir / "actions.fixed.log"
+        if not self._fixed_actions_current(macro_dir, actions, fixed_actions):
+            fixed_actions = self._prepare_actions_file(macro_dir, actions)
 
-        # Inline-Runner für macro_replay.py
+        # Inline-Runner für macro_replay.py (asyncio-Engine, Streams als Tasks)
         inline = (
             "import sys\n"
+            "import asyncio\n"
             f"sys.path.insert(0, r'{self.client_dir.as_posix()}')\n"
             "from macro_replay import MacroReplayManager\n"
-            f"m = MacroReplayManager(mouse_log=r'{moves.as_posix()}', actions_log=r'{fixed_actions.as_posix()}')\n"
-            "m.replay_all()\n"
+            "from async_replay import AsyncReplayEngine\n"
+            f"m = MacroReplayManager.from_plan_cache(mouse_log=r'{moves.as_posix()}', actions_log=r'{fixed_actions.as_posix()}', "
+            f"screenshots_dir=r'{(macro_dir / 'screenshots').as_posix()}', cache_path=r'{(macro_dir / 'replay.plan').as_posix()}', "
+            f"results_dir=r'{results.as_posix()}', macro_dir=r'{macro_dir.as_posix()}')\n"
+            "m.control.listen(sys.stdin)\n"
+            "asyncio.run(AsyncReplayEngine(m).run(m.plan))\n"
         )
 
         creation_flags = 0
@@ -89,9 +104,14 @@ class ReplayService:
             self._proc = subprocess.Popen(
                 [sys.executable, "-c", inline],
                 cwd=str(macro_dir),
+                stdin=subprocess.PIPE,
+                text=True,
                 creationflags=creation_flags,
             )
             self._running_id = macro_id
+            self._paused = False
+            self._stop_stage = None
+            self._stop_deadline = None
             if self.on_started:
                 try:
                     self.on_started(macro_id)
@@ -107,15 +127,21 @@ class ReplayService:
             return None
         code = self._proc.poll()
         if code is None:
+            self._check_stop_deadline()
             return None
 
         err: Optional[str] = None
-        if code != 0:
+        # ein angeforderter Stop ist kein Fehler, auch wenn der Prozess hart beendet wurde
+        if code != 0 and self._stop_stage in (None, "abort"):
             err = f"Replay-Prozess endete mit Code {code}."
 
         rid = self._running_id or ""
+        self._close_channel(self._proc)
         self._proc = None
         self._running_id = None
+        self._paused = False
+        self._stop_stage = None
+        self._stop_deadline = None
         if self.on_finished:
             try:
                 self.on_finished(rid, err)
@@ -123,47 +149,123 @@ class ReplayService:
                 pass
         return err
 
-    def stop_replay(self) -> None:
+    def is_paused(self) -> bool:
+        return self.is_running() and self._paused
+
+    def pause_replay(self) -> bool:
+        ok = self._send_command("pause")
+        if ok:
+            self._paused = True
+        return ok
+
+    def resume_replay(self) -> bool:
+        ok = self._send_command("resume")
+        if ok:
+            self._paused = False
+        return ok
+
+    def toggle_pause(self) -> bool:
+        """Pausiert bzw. setzt fort. Rückgabe: True = jetzt pausiert."""
+        if self._paused:
+            self.resume_replay()
+        else:
+            self.pause_replay()
+        return self._paused
+
+    def step_replay(self) -> bool:
+        """
+        Läuft bis einschließlich des nächsten Klicks weiter und pausiert dann wieder.
+        Gilt danach als pausiert: der nächste toggle_pause setzt fort.
+        """
+        ok = self._send_command("step")
+        if ok:
+            self._paused = True
+        return ok
+
+    def abort_replay(self, timeout: float = 2.0) -> None:
+        """
+        Bricht über den Steuerkanal ab: der Replay-Prozess lässt gehaltene Tasten/Buttons los
+        und beendet sich selbst. Blockiert nicht: das Ende meldet poll_finish (UI-Timer), der
+        den Prozess hart beendet, falls er nach timeout Sekunden noch läuft.
+        """
         if not self.is_running():
             return
+        if self._stop_stage is None and self._send_command("abort"):
+            self._stop_stage = "abort"
+            self._stop_deadline = time.monotonic() + timeout
+            return
+        self.stop_replay(timeout)
 
+    def stop_replay(self, timeout: float = 2.0) -> None:
+        """
+        Hartes Beenden (Fallback, falls abort nicht greift): terminate bzw. CTRL_BREAK, nach
+        timeout Sekunden kill. Blockiert ebenfalls nicht, das Ende meldet poll_finish.
+        """
         proc = self._proc
-        self._proc = None
-        rid = self._running_id or ""
-        self._running_id = None
-        if proc is None:
+        if proc is None or proc.poll() is not None:
+            return
+        if self._stop_stage == "terminate":
+            self._kill(proc)
+            self._stop_stage = "kill"
+            self._stop_deadline = None
+            return
+        if self._stop_stage == "kill":
             return
 
+        self._close_channel(proc)
         try:
             if sys.platform.startswith("win"):
-                try:
-                    proc.send_signal(signal.CTRL_BREAK_EVENT)  # type: ignore[attr-defined]
-                    proc.wait(timeout=2)
-                except Exception:
-                    pass
-                try:
-                    subprocess.run(
-                        ["taskkill", "/PID", str(proc.pid), "/T", "/F"],
-                        capture_output=True,
-                        text=True,
-                    )
-                except Exception:
-                    pass
+                proc.send_signal(signal.CTRL_BREAK_EVENT)  # type: ignore[attr-defined]
             else:
                 proc.terminate()
-                try:
-                    proc.wait(timeout=2)
-                except Exception:
-                    proc.kill()
-        finally:
-            if self.on_finished:
-                try:
-                    self.on_finished(rid, None)
-                except Exception:
-                    pass
+        except Exception:
+            pass
+        self._stop_stage = "terminate"
+        self._stop_deadline = time.monotonic() + timeout
 
     # ---------------- helpers ----------------
 
+    def _check_stop_deadline(self) -> None:
+        """Aufruf aus poll_finish: läuft der Prozess nach Ablauf der Frist noch -> nächste Stufe."""
+        if self._stop_deadline is not None and time.monotonic() >= self._stop_deadline:
+            self.stop_replay()
+
+    @staticmethod
+    def _kill(proc: subprocess.Popen) -> None:
+        try:
+            if sys.platform.startswith("win"):
+                # taskkill nicht abwarten, poll_finish sieht das Prozessende
+                subprocess.Popen(
+                    ["taskkill", "/PID", str(proc.pid), "/T", "/F"],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+            else:
+                proc.kill()
+        except Exception:
+            pass
+
+    def _send_command(self, cmd: str) -> bool:
+        proc = self._proc
+        if proc is None or proc.poll() is not None or proc.stdin is None:
+            return False
+        try:
+            proc.stdin.write(cmd + "\n")
+            proc.stdin.flush()
+            return True
+        except (OSError, ValueError) as e:
+            print(f"[ReplayService] Steuerbefehl '{cmd}' fehlgeschlagen: {e}", flush=True)
+            return False
+
+    @staticmethod
+    def _close_channel(proc: Optional[subprocess.Popen]) -> None:
+        if proc is None or proc.stdin is None:
+            return
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+
     def _maybe_start_startup_program(self, macro_dir: Path) -> None:
         """
         Liest meta.json und startet 'extra.startup_program' (z.B. "Word") VOR dem Replay.
@@ -207,6 +309,22 @@ class ReplayService:
 
     # -------- actions.log -> actions.fixed.log mit Pfad-Resolver --------
 
+    def _fixed_actions_current(self, macro_dir: Path, actions_path: Path, fixed_path: Path) -> bool:
+        """
+        actions.fixed.log ist aktuell, wenn sie neuer ist als actions.log und als der
+        screenshots-Ordner (dessen mtime ändert sich beim Hinzufügen/Entfernen von Bildern).
+        """
+        try:
+            fixed_mtime = fixed_path.stat().st_mtime_ns
+            if actions_path.stat().st_mtime_ns > fixed_mtime:
+                return False
+            shots = macro_dir / "screenshots"
+            if shots.exists() and shots.stat().st_mtime_ns > fixed_mtime:
+                return False
+            return True
+        except OSError:
+            return False
+
     def _prepare_actions_file(self, macro_dir: Path, actions_path: Path) -> Path:
         fixed_path = macro_dir / "actions.fixed.log"
         screenshots_dir = macro_dir / "screenshots"
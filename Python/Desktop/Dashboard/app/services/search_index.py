@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import bisect
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Sortierungen des Hauptfensters: Name -> (Schlüssel je Record, absteigend?)
+SORTS: Dict[str, Tuple[Callable[["SearchRecord"], Any], bool]] = {
+    "Newest": (lambda r: r.sort_time, True),
+    "Oldest": (lambda r: r.sort_time, False),
+    "Most actions": (lambda r: r.actions, True),
+    "Fewest actions": (lambda r: r.actions, False),
+    "Name A–Z": (lambda r: r.name, False),
+    "Name Z–A": (lambda r: r.name, True),
+    "Hotkey first": (lambda r: (0 if r.hotkey else 1, r.name), False),
+}
+
+_DAY = 86400.0
+
+
+def _parse_time(value: Any) -> Tuple[Optional[float], float]:
+    """(Zeitstempel für den Zeitfilter, Zeitstempel zum Sortieren) aus einem ISO-Datum."""
+    try:
+        dt = datetime.fromisoformat((value or "").replace("Z", "+00:00"))
+    except Exception:
+        return None, 0.0
+    if dt.tzinfo is None:
+        # ohne Zeitzone nicht mit "jetzt" (UTC) vergleichbar: fällt wie bisher aus dem Zeitfilter
+        try:
+            return None, dt.timestamp()
+        except (OverflowError, OSError, ValueError):
+            return None, 0.0
+    ts = dt.timestamp()
+    return ts, ts
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchRecord:
+    """Einmal aufbereitete Suchdaten einer Macro-Zeile (kleingeschriebene Felder, Zeiten, Zähler)."""
+
+    __slots__ = ("id", "name", "desc", "author", "category", "hotkey", "downloaded", "sort_time", "actions", "grams")
+
+    def __init__(self, row: Dict[str, Any]) -> None:
+        self.id: str = row["id"]
+        self.name = (row.get("name") or "").lower()
+        self.desc = (row.get("description") or (row.get("extra") or {}).get("description") or "").lower()
+        self.author = (row.get("author", "") or "").lower()
+        self.category = row.get("category")
+        self.hotkey = bool(row.get("hotkey"))
+        self.downloaded, self.sort_time = _parse_time(row.get("downloaded_at", ""))
+        self.actions = (row.get("counts") or {}).get("actions.log", 0)
+        # Trigramme von Name und Beschreibung getrennt: keine Treffer über die Feldgrenze
+        self.grams = _grams(self.name) | _grams(self.desc)
+
+
+class SearchIndex:
+    """
+    Such- und Filterindex über die Zeilen des Hauptfensters.
+
+    Jede Zeile wird beim Einfügen einmal aufbereitet (SearchRecord); Filter sind danach
+    Mengenoperationen: Kategorie, Hotkey und Autor über Mengen je Wert, der Zeitfilter über
+    eine nach Zeit sortierte Liste (bisect), die Volltextsuche über einen Trigramm-Index auf
+    Name und Beschreibung mit anschließender Teilstring-Prüfung der Kandidaten. Sortierungen
+    werden je Art einmal berechnet und gelten bis zur nächsten Datenänderung. Die Ergebnisse
+    entsprechen der bisherigen Zeilen-für-Zeilen-Prüfung (Teilstring, stabile Sortierung).
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()) -> None:
+        self._records: Dict[str, SearchRecord] = {}
+        # Reihenfolge der Zeilen (wie self._data); Basis der stabilen Sortierungen
+        self._seq: List[str] = []
+        self._by_gram: Dict[str, Set[str]] = {}
+        self._by_category: Dict[Any, Set[str]] = {}
+        self._by_author: Dict[str, Set[str]] = {}
+        self._with_hotkey: Set[str] = set()
+        self._orders: Dict[str, List[str]] = {}
+        self._ranks: Dict[str, Dict[str, int]] = {}
+        self._by_time: Optional[Tuple[List[float], List[str]]] = None
+        # letzte Textsuche: beim Weitertippen wird nur in deren Treffern gesucht
+        self._last_text: Optional[Tuple[str, Set[str]]] = None
+        self.build(rows)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # ---------------- Pflege ----------------
+
+    def build(self, rows: Iterable[Dict[str, Any]]) -> None:
+        self._records.clear()
+        self._seq = []
+        self._by_gram.clear()
+        self._by_category.clear()
+        self._by_author.clear()
+        self._with_hotkey.clear()
+        for row in rows:
+            mid = row.get("id")
+            if mid and mid not in self._records:
+                self._seq.append(mid)
+                self._add(SearchRecord(row))
+        self._changed()
+
+    def update(self, row: Dict[str, Any], at: Optional[int] = None) -> None:
+        """Nimmt eine neue/geänderte Zeile auf; neue Zeilen an Position at (Standard: Ende)."""
+        mid = row.get("id")
+        if not mid:
+            return
+        if mid in self._records:
+            self._discard(self._records[mid])
+        else:
+            self._seq.insert(len(self._seq) if at is None else max(0, min(at, len(self._seq))), mid)
+        self._add(SearchRecord(row))
+        self._changed()
+
+    def remove(self, macro_id: str) -> bool:
+        rec = self._records.get(macro_id)
+        if rec is None:
+            return False
+        self._discard(rec)
+        self._seq.remove(macro_id)
+        self._changed()
+        return True
+
+    def _add(self, rec: SearchRecord) -> None:
+        self._records[rec.id] = rec
+        for g in rec.grams:
+            self._by_gram.setdefault(g, set()).add(rec.id)
+        self._by_category.setdefault(rec.category, set()).add(rec.id)
+        self._by_author.setdefault(rec.author, set()).add(rec.id)
+        if rec.hotkey:
+            self._with_hotkey.add(rec.id)
+
+    def _discard(self, rec: SearchRecord) -> None:
+        del self._records[rec.id]
+        for g in rec.grams:
+            _discard_from(self._by_gram, g, rec.id)
+        _discard_from(self._by_category, rec.category, rec.id)
+        _discard_from(self._by_author, rec.author, rec.id)
+        self._with_hotkey.discard(rec.id)
+
+    def _changed(self) -> None:
+        self._orders.clear()
+        self._ranks.clear()
+        self._by_time = None
+        self._last_text = None
+
+    # ---------------- Abfragen ----------------
+
+    def query(self, category: Optional[str] = None, author: str = "", days: Optional[int] = None,
+              hotkey: Optional[bool] = None, text: str = "", now: Optional[float] = None) -> Optional[Set[str]]:
+        """
+        ids der Zeilen, die alle Filter erfüllen; None, wenn kein Filter aktiv ist (alle Zeilen).
+        days: höchstens so viele ganze Tage alt (downloaded_at); hotkey: mit (True)/ohne (False).
+        """
+        sets: List[Set[str]] = []
+        if category is not None:
+            sets.append(self._by_category.get(category, set()))
+        if hotkey is not None:
+            sets.append(self._with_hotkey if hotkey else set(self._records) - self._with_hotkey)
+        a = author.strip().lower()
+        if a:
+            sets.append(set().union(*(ids for name, ids in self._by_author.items() if a in name)))
+        if days is not None:
+            sets.append(self._newer_than((time.time() if now is None else now) - (days + 1) * _DAY))
+        if not sets and not text.strip():
+            return None
+        sets.sort(key=len)
+        result: Optional[Set[str]] = set(sets[0]) if sets else None
+        for s in sets[1:]:
+            result &= s
+        q = text.strip().lower()
+        if q and (result is None or result):
+            hits = self._search(q)
+            result = hits if result is None else result & hits
+        return result
+
+    def ordered(self, sort: str, ids: Optional[Set[str]] = None) -> List[str]:
+        """ids (None: alle) in der Reihenfolge der Sortierung sort; unbekannte Sortierung: Zeilenfolge."""
+        order = self._orders.get(sort)
+        if order is None:
+            spec = SORTS.get(sort)
+            if spec is None:
+                order = self._seq
+            else:
+                key, descending = spec
+                order = sorted(self._seq, key=lambda mid: key(self._records[mid]), reverse=descending)
+            self._orders[sort] = order
+        if ids is None:
+            return list(order)
+        if len(ids) * 8 < len(order):
+            # wenige Treffer: eigene Sortierung über den Rang ist billiger als die ganze Liste zu filtern
+            rank = self._ranks.get(sort)
+            if rank is None:
+                rank = self._ranks[sort] = {mid: i for i, mid in enumerate(order)}
+            return sorted(ids, key=rank.__getitem__)
+        return [mid for mid in order if mid in ids]
+
+    def _newer_than(self, cutoff: float) -> Set[str]:
+        if self._by_time is None:
+            timed = sorted((rec.downloaded, rec.id) for rec in self._records.values() if rec.downloaded is not None)
+            self._by_time = ([t for t, _ in timed], [mid for _, mid in timed])
+        times, ids = self._by_time
+        return set(ids[bisect.bisect_right(times, cutoff):])
+
+    def _search(self, q: str) -> Set[str]:
+        last = self._last_text
+        # Weitertippen: jeder neue Treffer enthält auch die alte Eingabe
+        candidates: Optional[Set[str]] = last[1] if last is not None and last[0] in q else None
+        if len(q) >= 3:
+            postings = sorted((self._by_gram.get(g, set()) for g in _grams(q)), key=len)
+            if candidates is not None:
+                postings.insert(0, candidates)
+                postings.sort(key=len)
+            candidates = set(postings[0])
+            for ids in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= ids
+        recs = self._records.values() if candidates is None else map(self._records.__getitem__, candidates)
+        hits = {rec.id for rec in recs if q in rec.name or q in rec.desc}
+        self._last_text = (q, hits)
+        return hits
+
+
+def _discard_from(index: Dict[Any, Set[str]], key: Any, mid: str) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(mid)
+        if not ids:
+            del index[key]
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import (
+    Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex, QEvent, QObject, QRect, QSize, Signal
+)
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QIcon, QPainter
+from PySide6.QtWidgets import (
+    QAbstractItemView, QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+)
+
+ROW_HEIGHT = 68
+COLUMNS = ["Macro", "Action", "Actions", "Hotkey"]
+
+# Farben wie die QPushButton-Styles des Hauptfensters
+BUTTON_BG = "#FFB238"
+BUTTON_HOVER = "#ffc24d"
+BUTTON_PRESSED = "#e5a831"
+BUTTON_TEXT = "#111"
+
+# Aktion -> (Fallback-Icon des Styles, Theme-Icon, Text ohne Icon)
+_ICON_ACTIONS: Dict[str, Tuple[QStyle.StandardPixmap, str, str]] = {
+    "edit": (QStyle.SP_FileDialogDetailedView, "document-properties", "Edit"),
+    "export": (QStyle.SP_DriveFDIcon, "document-save-as", "Export"),
+    "folder": (QStyle.SP_DirOpenIcon, "folder-open", "Folder"),
+    "delete": (QStyle.SP_TrashIcon, "edit-delete", "Delete"),
+}
+
+_ICON_CACHE: Dict[Tuple[str, str], QIcon] = {}
+
+
+def colorize_icon(icon: QIcon, color: QColor) -> QIcon:
+    pixmap = icon.pixmap(64, 64)
+    painter = QPainter(pixmap)
+    painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+    painter.fillRect(pixmap.rect(), color)
+    painter.end()
+    return QIcon(pixmap)
+
+
+def action_icon(action: str, color: str = "black", style: Optional[QStyle] = None) -> QIcon:
+    """Theme-Icon einer Zeilenaktion, einmal eingefärbt und danach aus dem Cache."""
+    key = (action, color)
+    icon = _ICON_CACHE.get(key)
+    if icon is None:
+        fallback, theme_name, _ = _ICON_ACTIONS[action]
+        icon = QIcon.fromTheme(theme_name)
+        if icon.isNull():
+            icon = (style or QApplication.style()).standardIcon(fallback)
+        if not icon.isNull():
+            icon = colorize_icon(icon, QColor(color))
+        _ICON_CACHE[key] = icon
+    return icon
+
+
+class MacroTableModel(QAbstractTableModel):
+    """
+    Macro-Zeilen (meta-Dicts) als Tabellenmodell. Buttons und Hotkey-Pille zeichnet der
+    MacroRowDelegate; pro Zeile entstehen keine Widgets, gezeichnet werden nur sichtbare Zeilen.
+    """
+
+    RowRole = Qt.UserRole + 1
+    IdRole = Qt.UserRole + 2
+
+    def __init__(self, hotkey_text: Callable[[Optional[str]], str], parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._hotkey_text = hotkey_text
+        self._rows: List[Dict[str, Any]] = []
+        self._pos: Dict[str, int] = {}
+        self._name_font = QFont(); self._name_font.setPointSize(15); self._name_font.setWeight(QFont.Medium)
+
+    # ---------------- Qt-Schnittstelle ----------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(COLUMNS):
+            return COLUMNS[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        return Qt.ItemIsEnabled if index.isValid() else Qt.NoItemFlags
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return row.get("name") or "Unnamed"
+            if col == 3:
+                return self._hotkey_text(row.get("hotkey"))
+            return None
+        if role == Qt.FontRole and col == 0:
+            return self._name_font
+        if role == Qt.TextAlignmentRole and col == 0:
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        if role == self.RowRole:
+            return row
+        if role == self.IdRole:
+            return row.get("id")
+        return None
+
+    # ---------------- Zeilen ----------------
+
+    def row_at(self, r: int) -> Dict[str, Any]:
+        return self._rows[r]
+
+    def position(self, macro_id: str) -> Optional[int]:
+        return self._pos.get(macro_id)
+
+    def set_rows(self, rows: List[Dict[str, Any]]) -> None:
+        self.beginResetModel()
+        self._rows = [row for row in rows if row.get("id")]
+        self._reindex()
+        self.endResetModel()
+
+    def upsert(self, row: Dict[str, Any], at: Optional[int] = None) -> None:
+        """Ersetzt die Zeile mit gleicher id oder fügt sie an Position at (Standard: Ende) ein."""
+        mid = row.get("id")
+        if not mid:
+            return
+        r = self._pos.get(mid)
+        if r is not None:
+            self._rows[r] = row
+            self.dataChanged.emit(self.index(r, 0), self.index(r, len(COLUMNS) - 1))
+            return
+        r = len(self._rows) if at is None else max(0, min(at, len(self._rows)))
+        self.beginInsertRows(QModelIndex(), r, r)
+        self._rows.insert(r, row)
+        self._reindex(r)
+        self.endInsertRows()
+
+    def remove(self, macro_id: str) -> bool:
+        r = self._pos.get(macro_id)
+        if r is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), r, r)
+        del self._rows[r]
+        del self._pos[macro_id]
+        self._reindex(r)
+        self.endRemoveRows()
+        return True
+
+    def _reindex(self, start: int = 0) -> None:
+        if start == 0:
+            self._pos = {}
+        for r in range(start, len(self._rows)):
+            self._pos[self._rows[r]["id"]] = r
+
+
+class MacroFilterProxy(QAbstractProxyModel):
+    """
+    Zeigt die Zeilen des MacroTableModel in der Reihenfolge, die select() liefert (sichtbare
+    ids, bereits gefiltert und sortiert, z.B. aus dem SearchIndex). Pro Filter- oder
+    Datenänderung wird die Zuordnung einmal neu aufgebaut; anders als beim
+    QSortFilterProxyModel gibt es keinen Python-Aufruf je Zeile und Vergleich.
+    """
+
+    def __init__(self, select: Callable[[], List[str]], parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._select = select
+        # Proxy-Zeile -> Quellzeile und umgekehrt
+        self._rows: List[int] = []
+        self._proxy_rows: Dict[int, int] = {}
+
+    def setSourceModel(self, model: MacroTableModel) -> None:
+        self.beginResetModel()
+        super().setSourceModel(model)
+        for signal in (model.modelAboutToBeReset, model.rowsAboutToBeInserted, model.rowsAboutToBeRemoved,
+                       model.layoutAboutToBeChanged):
+            signal.connect(self._source_about_to_change)
+        for signal in (model.modelReset, model.rowsInserted, model.rowsRemoved, model.layoutChanged):
+            signal.connect(self._source_changed)
+        # eine ersetzte Zeile kann Filter und Reihenfolge ändern
+        model.dataChanged.connect(self.refilter)
+        self._remap()
+        self.endResetModel()
+
+    def refilter(self, *_) -> None:
+        self.beginResetModel()
+        self._remap()
+        self.endResetModel()
+
+    def _source_about_to_change(self, *_) -> None:
+        self.beginResetModel()
+
+    def _source_changed(self, *_) -> None:
+        self._remap()
+        self.endResetModel()
+
+    def _remap(self) -> None:
+        model = self.sourceModel()
+        if model is None:
+            self._rows, self._proxy_rows = [], {}
+            return
+        positions = (model.position(mid) for mid in self._select())
+        self._rows = [r for r in positions if r is not None]
+        self._proxy_rows = {r: i for i, r in enumerate(self._rows)}
+
+    # ---------------- Qt-Schnittstelle ----------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        model = self.sourceModel()
+        return 0 if parent.isValid() or model is None else model.columnCount()
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if parent.isValid() or not (0 <= row < len(self._rows)) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        return self.sourceModel().index(self._rows[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        r = self._proxy_rows.get(source_index.row()) if source_index.isValid() else None
+        return QModelIndex() if r is None else self.index(r, source_index.column())
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        # Spaltenköpfe auch ohne sichtbare Zeilen (die Basisklasse geht über index(0, section))
+        model = self.sourceModel()
+        if orientation == Qt.Horizontal and model is not None:
+            return model.headerData(section, orientation, role)
+        return super().headerData(section, orientation, role)
+
+
+class MacroRowDelegate(QStyledItemDelegate):
+    """
+    Zeichnet Play-Button, Aktions-Icons und Hotkey-Pille direkt in die Zellen und löst
+    Klicks per Trefferprüfung auf. actionTriggered(macro_id, aktion) mit aktion aus
+    "play", "edit", "export", "folder", "delete", "hotkey".
+    """
+
+    actionTriggered = Signal(str, str)
+
+    def __init__(self, view: QAbstractItemView):
+        super().__init__(view)
+        self._view = view
+        # (Zeile, Spalte, Aktion) in View-Koordinaten
+        self._hover: Optional[Tuple[int, int, str]] = None
+        self._pressed: Optional[Tuple[int, int, str]] = None
+        view.setMouseTracking(True)
+        view.viewport().installEventFilter(self)
+
+    # ---------------- Layout ----------------
+
+    def _font(self, weight: QFont.Weight) -> QFont:
+        f = QFont(self._view.font())
+        f.setWeight(weight)
+        return f
+
+    def _buttons(self, index: QModelIndex, rect: QRect) -> List[Tuple[str, QRect, str, Optional[QIcon]]]:
+        """(Aktion, Rechteck, Text, Icon) der Buttons einer Zelle."""
+        col = index.column()
+        if col == 1:
+            return [("play", _centered(rect, 110, 36), "Play", None)]
+        if col == 2:
+            w, h, gap = 42, 36, 10
+            names = ("edit", "export", "folder", "delete")
+            total = len(names) * w + (len(names) - 1) * gap
+            x = rect.left() + (rect.width() - total) // 2
+            y = rect.top() + (rect.height() - h) // 2
+            out = []
+            for i, action in enumerate(names):
+                icon = action_icon(action, style=self._view.style())
+                out.append((action, QRect(x + i * (w + gap), y, w, h), _ICON_ACTIONS[action][2],
+                            None if icon.isNull() else icon))
+            return out
+        if col == 3:
+            text = index.data(Qt.DisplayRole) or ""
+            w = max(140, QFontMetrics(self._font(QFont.Bold)).horizontalAdvance(text) + 24)
+            return [("hotkey", _centered(rect, w, 32), text, None)]
+        return []
+
+    def _hit(self, index: QModelIndex, pos) -> Optional[str]:
+        if not index.isValid():
+            return None
+        for action, rect, _, _ in self._buttons(index, self._view.visualRect(index)):
+            if rect.contains(pos):
+                return action
+        return None
+
+    # ---------------- Zeichnen ----------------
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        size = super().sizeHint(option, index)
+        return QSize(size.width(), ROW_HEIGHT)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        if index.column() == 0:
+            super().paint(painter, option, index)
+            return
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget is not None else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, opt, painter, opt.widget)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        for action, rect, text, icon in self._buttons(index, option.rect):
+            key = (index.row(), index.column(), action)
+            bg = BUTTON_PRESSED if key == self._pressed else BUTTON_HOVER if key == self._hover else BUTTON_BG
+            radius = rect.height() / 2 if action == "hotkey" else 10
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(bg))
+            painter.drawRoundedRect(rect, radius, radius)
+            if icon is not None:
+                icon.paint(painter, _centered(rect, 16, 16))
+            else:
+                painter.setPen(QColor(BUTTON_TEXT))
+                painter.setFont(self._font(QFont.Bold if action == "hotkey" else QFont.DemiBold))
+                painter.drawText(rect, Qt.AlignCenter, text)
+        painter.restore()
+
+    # ---------------- Maus ----------------
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        t = event.type()
+        if t == QEvent.Leave:
+            self._set_hover(None)
+            return False
+        if t not in (QEvent.MouseMove, QEvent.MouseButtonPress, QEvent.MouseButtonDblClick, QEvent.MouseButtonRelease):
+            return False
+        pos = event.position().toPoint()
+        index = self._view.indexAt(pos)
+        action = self._hit(index, pos)
+        key = (index.row(), index.column(), action) if action else None
+        if t == QEvent.MouseMove:
+            self._set_hover(key)
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+        if t == QEvent.MouseButtonRelease:
+            pressed, self._pressed = self._pressed, None
+            if pressed is None:
+                return False
+            self._update(pressed)
+            if key == pressed:
+                mid = index.data(MacroTableModel.IdRole)
+                if mid:
+                    self.actionTriggered.emit(str(mid), action)
+            return True
+        if key is None:
+            return False
+        # Doppelklick zählt wie ein zweiter Klick (wie bei QPushButton)
+        self._pressed = key
+        self._update(key)
+        return True
+
+    def _set_hover(self, key: Optional[Tuple[int, int, str]]) -> None:
+        if key == self._hover:
+            return
+        old, self._hover = self._hover, key
+        for k in (old, key):
+            if k is not None:
+                self._update(k)
+        if key is not None:
+            self._view.viewport().setCursor(Qt.PointingHandCursor)
+        else:
+            self._view.viewport().unsetCursor()
+
+    def _update(self, key: Tuple[int, int, str]) -> None:
+        index = self._view.model().index(key[0], key[1])
+        if index.isValid():
+            self._view.viewport().update(self._view.visualRect(index))
+
+
+def _centered(rect: QRect, w: int, h: int) -> QRect:
+    return QRect(rect.left() + (rect.width() - w) // 2, rect.top() + (rect.height() - h) // 2, w, h)
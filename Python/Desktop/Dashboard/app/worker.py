@@ -1,23 +1,62 @@
-from PySide6.QtCore import QObject, Signal
-import time
+from __future__ import annotations
 
-class Worker(QObject):
-    progressed = Signal(int)
-    finished = Signal()
+import threading
+
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+from .services.macro_import import ImportCanceled
+
+
+class ImportWorker(QObject):
+    """
+    Macro-Import (ZIP oder Ordner) außerhalb des UI-Threads.
+    progressed(kopiert, gesamt) in Bytes; am Ende genau eines von finished(meta), failed(text), canceled.
+    """
+    progressed = Signal(object, object)
+    finished = Signal(object)
+    failed = Signal(str)
     canceled = Signal()
 
-    def __init__(self):
+    def __init__(self, store, path: str, kind: str):
         super().__init__()
-        self._cancel = False
+        self.store = store
+        self.path = path
+        self.kind = kind
+        self._cancel = threading.Event()
 
     def cancel(self):
-        self._cancel = True
+        # direkt aus dem UI-Thread aufrufen: der Worker-Thread ist im Import und bearbeitet keine Slots
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
 
+    @Slot()
     def run(self):
-        for i in range(101):
-            if self._cancel:
-                self.canceled.emit()
-                return
-            self.progressed.emit(i)
-            time.sleep(0.03)
-        self.finished.emit()
+        try:
+            if self.kind == "zip":
+                meta = self.store.add_from_zip(self.path, progress=self.progressed.emit, cancel=self._cancel)
+            elif self.kind == "folder":
+                meta = self.store.add_from_folder(self.path, progress=self.progressed.emit, cancel=self._cancel)
+            else:
+                raise ValueError("Only ZIP or folder are supported.")
+        except ImportCanceled:
+            self.canceled.emit()
+            return
+        except Exception as ex:
+            self.failed.emit(str(ex))
+            return
+        self.finished.emit(meta)
+
+    def start(self, parent: QObject | None = None) -> QThread:
+        """Startet run() in einem eigenen QThread, der sich nach dem Ende selbst aufräumt."""
+        thread = QThread(parent)
+        self.moveToThread(thread)
+        thread.started.connect(self.run)
+        for signal in (self.finished, self.failed, self.canceled):
+            signal.connect(thread.quit)
+        thread.finished.connect(self.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.start()
+        return thread
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import ANCHORS_FILE
+
+
+def anchor_key(screenshot: str) -> str:
+    """
+    File name of the screenshot. Names are unique within a macro's screenshots folder, and
+    unlike the full path they survive moving or copying the macro folder.
+    """
+    return os.path.basename(screenshot.replace("\\", "/"))
+
+
+class AnchorStore:
+    """
+    Last known match of every click template of a macro (position, offset to the
+    recorded click, scale), kept in the macro's ANCHORS_FILE. Replays search there
+    first, so a moved window is found with the cheap region search instead of a
+    full-screen search on every click.
+    """
+
+    def __init__(self, path: Optional[str] = ANCHORS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._anchors: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        # offset of the latest successful match in this run, a hint for clicks without anchor
+        self.session_offset: Optional[Tuple[int, int]] = None
+        # search stage that found each click in this run (anchor / offset / region / full)
+        self.stages: Counter = Counter()
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._anchors)
+
+    def get(self, screenshot: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            anchor = self._anchors.get(anchor_key(screenshot))
+            return dict(anchor) if anchor is not None else None
+
+    def hints(self, screenshot: Optional[str], click_x: int, click_y: int) -> List[Tuple[str, Tuple[int, int]]]:
+        """Search positions to try before the recorded click position, most specific first."""
+        out: List[Tuple[str, Tuple[int, int]]] = []
+        anchor = self.get(screenshot) if screenshot else None
+        if anchor is not None:
+            out.append(("anchor", (int(anchor["x"]), int(anchor["y"]))))
+        if self.session_offset is not None and self.session_offset != (0, 0):
+            out.append(("offset", (click_x + self.session_offset[0], click_y + self.session_offset[1])))
+        seen = {(click_x, click_y)}
+        unique = []
+        for stage, pos in out:
+            if pos not in seen:
+                seen.add(pos)
+                unique.append((stage, pos))
+        return unique
+
+    def update(self, screenshot: str, x: int, y: int, click_x: int, click_y: int,
+               scale: Optional[float] = None, confidence: Optional[float] = None,
+               stage: Optional[str] = None) -> None:
+        offset = (int(x) - int(click_x), int(y) - int(click_y))
+        with self._lock:
+            key = anchor_key(screenshot)
+            previous = self._anchors.get(key, {})
+            self._anchors[key] = {
+                "x": int(x),
+                "y": int(y),
+                "offset": list(offset),
+                "scale": round(float(scale), 4) if scale is not None else previous.get("scale"),
+                "confidence": round(float(confidence), 4) if confidence is not None else None,
+                "hits": int(previous.get("hits", 0)) + 1,
+                "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self.session_offset = offset
+            self._dirty = True
+            if stage:
+                self.stages[stage] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        found = sum(self.stages.values())
+        return {
+            "anchors": len(self._anchors),
+            "stages": dict(self.stages),
+            "anchor_hit_rate": round(self.stages["anchor"] / found, 3) if found else None,
+        }
+
+    # ---------------- persistence ----------------
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        anchors = data.get("anchors") if isinstance(data, dict) else None
+        if not isinstance(anchors, dict):
+            return
+        for key, anchor in anchors.items():
+            if isinstance(anchor, dict) and isinstance(anchor.get("x"), int) and isinstance(anchor.get("y"), int):
+                # version 1 files are keyed by full path: keep the newest anchor per file name
+                key = anchor_key(key)
+                previous = self._anchors.get(key)
+                if previous is None or str(anchor.get("updated", "")) >= str(previous.get("updated", "")):
+                    self._anchors[key] = anchor
+                if key not in anchors:
+                    self._dirty = True
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 2, "anchors": dict(self._anchors)}
+            self._dirty = False
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save anchors: {e}")
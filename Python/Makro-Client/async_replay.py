@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from config import STREAM_CHUNK
+from macro_replay import KeyParser, MacroReplayManager
+from replay_plan import ReplayPlan
+
+
+class AsyncReplayEngine:
+    """
+    asyncio replay of a macro. Mouse and keyboard stream run as tasks on one event loop;
+    screen capture and image search run in a single-worker executor, so the mouse stream
+    keeps its timing while a click is being located. Every wait is an awaitable deadline
+    on the replay timeline that pause/resume/step/abort (ReplayControl) wake immediately.
+
+    Backend, control, telemetry and the stream parsers are the manager's, so plans, logs,
+    results and anchors are the same as with MacroReplayManager.replay_all. The offset of
+    a click found away from its recorded position is engine state instead of a global.
+    """
+
+    def __init__(self, manager: MacroReplayManager, executor: Optional[Executor] = None):
+        self.manager = manager
+        self.control = manager.control
+        self.executor = executor
+        # offset of the held button, applied to moves until its release
+        self.offset: Tuple[int, int] = (0, 0)
+        self._changed: Optional[asyncio.Event] = None
+
+    async def run(self, plan: Optional[ReplayPlan] = None, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Replays plan (default: the manager's plan, or its parsed/streamed logs) and returns
+        the telemetry summary. After timeout seconds the replay is aborted. Cancelling the
+        awaiting task aborts as well, which releases held keys and buttons.
+        """
+        mouse_events, keyboard_events, first_event_time = self._events(plan)
+        if first_event_time is None:
+            print("No events to replay.")
+            return self.manager.telemetry.close()
+
+        loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(self._changed.set)
+
+        self.control.add_listener(wake)
+        executor = self.executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="replay-finder")
+        start_time = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._mouse_stream(mouse_events, start_time, first_event_time), name="replay-mouse"),
+            asyncio.create_task(self._keyboard_stream(keyboard_events, start_time, first_event_time, executor),
+                                name="replay-keyboard"),
+        ]
+        mouse_count = len(mouse_events) if isinstance(mouse_events, list) else "streamed"
+        print(f"Replaying {mouse_count} mouse events and {len(keyboard_events)} keyboard events...")
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), timeout)
+        except asyncio.TimeoutError:
+            print(f"Replay timed out after {timeout}s.")
+            self.manager.telemetry.set_extra("timed_out", True)
+            self.control.abort()
+        except BaseException:
+            # cancelled or a stream failed: stop the other stream and release held input
+            self.control.abort()
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.control.remove_listener(wake)
+            if self.executor is None:
+                # a running search finishes in the background; abort already ended its retry waits
+                executor.shutdown(wait=False, cancel_futures=True)
+            summary = self.manager.finish_replay()
+        return summary
+
+    def _events(self, plan: Optional[ReplayPlan]) -> Tuple[Iterable[Dict[str, Any]], List[Dict[str, Any]], Optional[float]]:
+        if plan is not None:
+            return (plan.mouse_events(),
+                    plan.keyboard_events(KeyParser.parse_key, KeyParser.parse_mouse_button),
+                    plan.first_event_time)
+        manager = self.manager
+        return manager.mouse_replay.event_source(), manager.keyboard_replay.events, manager.first_event_time()
+
+    # ---------------- waiting ----------------
+
+    async def wait_until(self, start_time: float, target_time: float) -> bool:
+        """Awaits replay time target_time (seconds after start_time). False if the replay was aborted."""
+        while True:
+            # cleared before the state is read, so a change after the read still wakes us
+            self._changed.clear()
+            if self.control.aborted:
+                return False
+            remaining = self.control.time_left(start_time, target_time)
+            if remaining is not None and remaining <= 0:
+                # overdue: still yield, so a stream that fell behind can't starve the other one
+                await asyncio.sleep(0)
+                return True
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    # ---------------- streams ----------------
+
+    async def _iterate(self, events: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Lists are walked directly; lazy log iterators are parsed in chunks off the loop, one chunk ahead."""
+        if isinstance(events, list):
+            for event in events:
+                yield event
+            return
+        loop = asyncio.get_running_loop()
+        it = iter(events)
+
+        def read_chunk() -> List[Dict[str, Any]]:
+            return list(itertools.islice(it, STREAM_CHUNK))
+
+        pending = loop.run_in_executor(None, read_chunk)
+        while True:
+            chunk = await pending
+            if not chunk:
+                return
+            pending = loop.run_in_executor(None, read_chunk)
+            for event in chunk:
+                yield event
+
+    async def _mouse_stream(self, events: Iterable[Dict[str, Any]], start_time: float, first_event_time: float) -> None:
+        mouse = self.manager.mouse_replay
+        telemetry = self.manager.telemetry
+        async for event in self._iterate(events):
+            target_time = event['time'] - first_event_time
+            if not await self.wait_until(start_time, target_time):
+                return
+            mouse.apply_event(event, self.offset)
+            telemetry.record_event('mouse', event, target_time, self.control.elapsed(start_time))
+
+    async def _keyboard_stream(self, events: List[Dict[str, Any]], start_time: float, first_event_time: float,
+                               executor: Executor) -> None:
+        keyboard = self.manager.keyboard_replay
+        telemetry = self.manager.telemetry
+        loop = asyncio.get_running_loop()
+        for event in events:
+            target_time = event['time'] - first_event_time
+            if keyboard.needs_location(event) and event.get('screenshot'):
+                # look-ahead: decode the icon while waiting for the click's deadline
+                preload = loop.run_in_executor(executor, keyboard.finder.load_template, event['screenshot'])
+                preload.add_done_callback(_ignore_result)
+            if not await self.wait_until(start_time, target_time):
+                return
+            located = None
+            if keyboard.needs_location(event):
+                located = await loop.run_in_executor(executor, keyboard.locate_click, event)
+            self.offset, click = keyboard.apply_event(event, self.offset, located)
+            telemetry.record_event('keyboard', event, target_time, self.control.elapsed(start_time), click=click)
+
+
+def _ignore_result(future: "asyncio.Future") -> None:
+    # a missing icon is reported by the search itself
+    if not future.cancelled():
+        future.exception()
@@ -1,15 +1,45 @@
+import os
 import cv2
 ACTIONS_LOG = "actions.log"
 MOUSE_LOG = "mouse_moves.log"
+SCREENSHOTS_DIR = "screenshots"
+
+#ReplayPlan
+PLAN_CACHE = "replay.plan"
+
+#Streaming loaders
+STREAM_THRESHOLD_BYTES = 16 * 1024 * 1024  # mouse logs above this are streamed instead of loaded
+STREAM_READ_AHEAD = 4096  # max. parsed events buffered ahead of the replay
+STREAM_CHUNK = 256
+
+#SessionScaleTracker
+SCALE_TRACKING = True
+SCALE_PROFILE = "scale_profile.json"  # per macro, keyed by machine and screen size
+SCALE_LOCK_HITS = 3  # agreeing matches before the scale is locked
+SCALE_CONFIDENCE_ALPHA = 0.3  # weight of the newest observation
+SCALE_UNLOCK_CONFIDENCE = 0.5
+SCALE_NARROW_ACCEPT = 0.9  # weaker matches at the locked scale are re-checked with the full sweep
+
+#AnchorStore
+ANCHORS = True
+ANCHORS_FILE = "anchors.json"  # per macro, last match position/offset/scale per click screenshot
 
 #MouseScreenshotFinder
 CONFIDENCE_THRESHOLD = 0.8
 MAX_ATTEMPTS = 3
 RETRY_DELAY = 2.0
 SEARCH_REGION_SIZE = 100
+INCREMENTAL_RETRY = True  # retries re-capture the screen and only search around the tiles that changed
+
+#ReplayTelemetry
+RESULTS_DIR = "results"
+TELEMETRY_ENABLED = True
+TELEMETRY_PERCENTILES = (50, 95, 99)
 
 #ImageFinderClient
 METHOD_TEMPLATE = "TEMPLATE"
+METHOD_PYRAMID = "PYRAMID"
+METHOD_ORB = "ORB"
 DEFAULT_METHOD = METHOD_TEMPLATE
 
 DEFAULT_THRESHOLD = 0.6
@@ -24,3 +54,68 @@ FONT_THICKNESS = 2
 TEXT_COLOR = (0, 255, 0)
 RECT_THICKNESS = 2
 MIN_TEMPLATE_SIZE = 10
+# Scale/method grid runs on a shared thread pool (cv2.matchTemplate releases the GIL)
+MATCH_WORKERS = min(8, os.cpu_count() or 1)
+EARLY_EXIT_CONFIDENCE = 0.98  # stop the grid as soon as a match reaches this
+TEMPLATE_CACHE_SIZE = 64  # preloaded icons kept per ImageFinderClient
+# Grid cells run best-first by their past scores (match_schedule.py), so the early exit
+# fires sooner, and cells whose score bound can't beat the best so far are skipped;
+# False runs the plain grid order
+SCHEDULE_ADAPTIVE = True
+SCHEDULE_ALPHA = 0.3  # weight of the newest score per cell
+# Results keyed by template pixels + a hash of the searched pixels; unchanged screen content returns instantly
+MATCH_CACHE_SIZE = 256  # 0 disables
+MATCH_CACHE_DOWNSAMPLE = 2  # search area is hashed at 1/n resolution (1 hashes every pixel)
+
+# Coarse-to-fine search (METHOD_PYRAMID)
+PYRAMID_DOWNSCALE = 0.25  # coarse level size relative to the screenshot
+PYRAMID_MIN_TEMPLATE = 12  # coarse template side never drops below this (raises the coarse scale instead)
+PYRAMID_TOP_K = 5  # candidate peaks refined at full resolution
+PYRAMID_REFINE_MARGIN = 12  # full-res pixels searched around each candidate
+PYRAMID_ACCEPT_CONFIDENCE = 0.9  # weaker refined matches are re-checked with the full sweep (0 disables)
+
+# Correlation backend: "spatial" (cv2.matchTemplate), "fft" (fft_matcher) or "auto" (cost model per grid).
+# "auto" picked the faster backend in all 18 bench_fft_match.py --check cells (one core): FFT for 64 px
+# templates in a 100 px region and 256 px templates at 540p/1080p, cv2.matchTemplate everywhere else
+MATCH_BACKEND = "auto"
+# cost model, seconds, fitted to OpenCV 5 / numpy timings on one core
+# (calibrate and check with Client-Tests/Benchmark-Client/bench_fft_match.py --check)
+SPATIAL_COST_PER_POINT = 1.95e-8  # cv2.matchTemplate, per search pixel and method (block DFT, nearly template independent)
+SPATIAL_LARGE_TEMPLATE = 128  # template side above this (or above half the search side) takes the slower path
+SPATIAL_LARGE_TEMPLATE_FACTOR = 1.5
+FFT_COST_PER_CALL = 7.0e-5  # per template: normalisation and peak search overhead
+FFT_COST_PER_POINT = 1.27e-9  # per template: padded point * log2(points), forward + inverse transform
+FFT_FRAME_COST_PER_POINT = 1.1e-9  # per frame: search spectrum + integral images, shared by all templates
+
+# Feature-based search (METHOD_ORB), located by ORB and verified by template matching
+ORB_TEMPLATE_FEATURES = 500
+ORB_FRAME_FEATURES = 10000  # detected once per screenshot and shared by all templates
+ORB_PATCH_SIZE = 15  # small patch so 24-48 px icons still yield keypoints
+ORB_FAST_THRESHOLD = 10
+ORB_RATIO = 0.8  # Lowe ratio test
+ORB_MIN_INLIERS = 4
+ORB_RANSAC_REPROJ = 5.0
+ORB_SCALE_RANGE = (0.5, 2.0)  # estimated scales outside this are rejected
+ORB_ACCEPT_CONFIDENCE = 0.85  # verification below this falls back to the pyramid search
+
+# Pre-rejection of flat tiles from integral images (prefilter.py). Only tiles whose windows are
+# exactly constant are skipped, no score bound on textured windows: about 2x faster on screens with
+# large solid areas (60% of positions pruned), 5% slower on textured ones (9% pruned), measured with
+# Client-Tests/Benchmark-Client/bench_prefilter.py. Off by default; it also keeps float64 sum and
+# squared-sum integral images (16 bytes per pixel) per search area.
+PREFILTER = False
+PREFILTER_TILE = 32  # match positions per tile side
+PREFILTER_FLAT_STD = 0.0  # span std treated as flat; 0 keeps results exact
+PREFILTER_MIN_PRUNED = 0.35  # below this pruned fraction the area is correlated in one call
+
+# Incremental search of successive captures (incremental_match.py)
+DIRTY_TILE_SIZE = 32  # diff granularity in px
+DIRTY_THRESHOLD = 0  # grey level difference above which a pixel counts as changed
+INCREMENTAL_MAX_DIRTY = 0.5  # above this fraction of changed tiles (or area to re-search) the whole area is searched
+INCREMENTAL_STATES = 8  # template/region pairs whose last capture is kept
+
+# Tiled full-screen search in worker processes (tiled_search.py)
+FULL_SEARCH_MODE = "auto"  # "single", "tiled" or "auto" (tiled from TILE_MIN_PIXELS on, if there is more than one core)
+TILE_SIZE = 1024  # tile core edge in px; tiles overlap by the template size
+TILE_WORKERS = min(8, os.cpu_count() or 1)
+TILE_MIN_PIXELS = 3840 * 2160
@@ -0,0 +1,177 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from config import (MATCH_BACKEND, SPATIAL_COST_PER_POINT, SPATIAL_LARGE_TEMPLATE, SPATIAL_LARGE_TEMPLATE_FACTOR,
+                    FFT_COST_PER_CALL, FFT_COST_PER_POINT, FFT_FRAME_COST_PER_POINT)
+
+BACKEND_AUTO = "auto"
+BACKEND_SPATIAL = "spatial"
+BACKEND_FFT = "fft"
+
+
+def _padded_shape(h: int, w: int) -> Tuple[int, int]:
+    return cv2.getOptimalDFTSize(h), cv2.getOptimalDFTSize(w)
+
+
+def _padded_log_points(search_shape: Tuple[int, int]) -> float:
+    ph, pw = _padded_shape(*search_shape[:2])
+    points = ph * pw
+    return points * float(np.log2(points))
+
+
+def spatial_cost(search_shape: Tuple[int, int], templ_shape: Tuple[int, int]) -> float:
+    """
+    One cv2.matchTemplate call. OpenCV correlates block-wise in the frequency domain, so the
+    cost follows the search area; templates beyond the block size take a measurably slower path.
+    """
+    (H, W), (h, w) = search_shape[:2], templ_shape[:2]
+    cost = H * W * SPATIAL_COST_PER_POINT
+    if max(h, w) > min(SPATIAL_LARGE_TEMPLATE, min(H, W) // 2):
+        cost *= SPATIAL_LARGE_TEMPLATE_FACTOR
+    return cost
+
+
+def fft_cost(search_shape: Tuple[int, int], templ_shape: Tuple[int, int]) -> float:
+    """One template on the FFT backend: its forward transform, the inverse transform and normalisation."""
+    return FFT_COST_PER_CALL + 2 * _padded_log_points(search_shape) * FFT_COST_PER_POINT
+
+
+def fft_frame_cost(search_shape: Tuple[int, int]) -> float:
+    """Search spectrum and integral images, paid once per search area."""
+    return _padded_log_points(search_shape) * FFT_FRAME_COST_PER_POINT
+
+
+def choose_backend(search_shape: Tuple[int, int], templ_shapes: Sequence[Tuple[int, int]], backend: str = MATCH_BACKEND,
+                   methods: int = 1) -> str:
+    """
+    One backend for all templates (scales) matched against the same search area, so the
+    FFT frame spectrum is paid once. methods: correlation methods run per template; the
+    FFT backend shares one correlation between them.
+    """
+    if backend != BACKEND_AUTO:
+        return backend
+    if not templ_shapes:
+        return BACKEND_SPATIAL
+    spatial = methods * sum(spatial_cost(search_shape, shape) for shape in templ_shapes)
+    fft = fft_frame_cost(search_shape) + sum(fft_cost(search_shape, shape) for shape in templ_shapes)
+    return BACKEND_FFT if fft < spatial else BACKEND_SPATIAL
+
+
+# correlations / window sums kept per frame; a grid cell needs both methods at one template size
+_FRAME_CACHE_ENTRIES = 4
+
+
+class FrameSpectra:
+    """
+    Lazily computed FFT data of one search area, shared by every template matched against it:
+    the real spectrum per padded shape, the sum/squared-sum integral images used to
+    normalise the correlation, and the last few raw correlations and window norms.
+    """
+
+    def __init__(self, image: np.ndarray):
+        self.image = image
+        self._lock = threading.Lock()
+        self._spectra: Dict[Tuple[int, int], np.ndarray] = {}
+        self._integrals = None
+        self._windows: "OrderedDict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]]" = OrderedDict()
+        # id(templ) -> (templ, correlation); holding templ keeps the id from being reused
+        self._correlations: "OrderedDict[int, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+    def spectrum(self, shape: Tuple[int, int]) -> np.ndarray:
+        with self._lock:
+            spec = self._spectra.get(shape)
+            if spec is None:
+                spec = self._spectra[shape] = np.fft.rfft2(self.image.astype(np.float32), s=shape)
+            return spec
+
+    def integrals(self) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            if self._integrals is None:
+                self._integrals = cv2.integral2(self.image, sdepth=cv2.CV_64F)
+            return self._integrals
+
+    def normalisers(self, h: int, w: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per window size: window sums and the inverse window norms of both methods
+        (1/sqrt(sum I^2 - (sum I)^2/n) and 1/sqrt(sum I^2)), as float32 and 0 for flat windows.
+        Computed in float64 from the integral images, then cached.
+        """
+        with self._lock:
+            cached = self._windows.get((h, w))
+            if cached is not None:
+                self._windows.move_to_end((h, w))
+                return cached
+        s, sq = self.integrals()
+        win = s[h:, w:] - s[:-h, w:] - s[h:, :-w] + s[:-h, :-w]
+        win_sq = sq[h:, w:] - sq[:-h, w:] - sq[h:, :-w] + sq[:-h, :-w]
+        cached = (win.astype(np.float32), _inv_sqrt(win_sq - win * win / float(h * w)), _inv_sqrt(win_sq))
+        with self._lock:
+            self._windows[(h, w)] = cached
+            while len(self._windows) > _FRAME_CACHE_ENTRIES:
+                self._windows.popitem(last=False)
+        return cached
+
+    def clear_template_cache(self) -> None:
+        """Drops per-template correlations and window norms, keeps the frame spectrum and integrals."""
+        with self._lock:
+            self._windows.clear()
+            self._correlations.clear()
+
+    def correlation(self, templ: np.ndarray) -> np.ndarray:
+        """Raw cross-correlation sum(T * I) over the valid region."""
+        key = id(templ)
+        with self._lock:
+            cached = self._correlations.get(key)
+            if cached is not None and cached[0] is templ:
+                self._correlations.move_to_end(key)
+                return cached[1]
+        H, W = self.image.shape[:2]
+        h, w = templ.shape[:2]
+        shape = _padded_shape(H, W)
+        # template is tiny compared to the padded frame: transform its h rows first, then pad the columns
+        rows = np.fft.rfft(templ.astype(np.float32), n=shape[1], axis=1)
+        t_spec = np.fft.fft(rows, n=shape[0], axis=0)
+        # circular correlation is exact on the valid region because shape >= image shape
+        corr = np.fft.irfft2(self.spectrum(shape) * np.conj(t_spec), s=shape)[:H - h + 1, :W - w + 1]
+        with self._lock:
+            self._correlations[key] = (templ, corr)
+            while len(self._correlations) > _FRAME_CACHE_ENTRIES:
+                self._correlations.popitem(last=False)
+        return corr
+
+
+def _inv_sqrt(energy: np.ndarray) -> np.ndarray:
+    out = np.zeros(energy.shape, dtype=np.float32)
+    # window energy below ~1 grey level of variance is treated as flat
+    np.divide(1.0, np.sqrt(energy), out=out, where=energy > 1e-3, casting="unsafe")
+    return out
+
+
+def match_template_fft(spectra: FrameSpectra, templ: np.ndarray, method: int) -> np.ndarray:
+    """
+    Drop-in replacement for cv2.matchTemplate(image, templ, method) computed in the
+    frequency domain. Supports TM_CCOEFF_NORMED and TM_CCORR_NORMED; both methods
+    share one correlation and one set of window norms per template size.
+    """
+    h, w = templ.shape[:2]
+    t = templ.astype(np.float64)
+    corr = spectra.correlation(templ)
+    win, inv_ccoeff, inv_ccorr = spectra.normalisers(h, w)
+    if method == cv2.TM_CCOEFF_NORMED:
+        t_mean = t.mean()
+        t_energy = float(((t - t_mean) ** 2).sum())
+        # sum(T') == 0, so the window mean only has to be removed from the template side
+        out = corr - np.float32(t_mean) * win
+        out *= inv_ccoeff
+    elif method == cv2.TM_CCORR_NORMED:
+        t_energy = float((t * t).sum())
+        out = corr * inv_ccorr
+    else:
+        raise ValueError(f"Unsupported method for FFT backend: {method}")
+    out *= np.float32(1.0 / np.sqrt(t_energy)) if t_energy > 1e-6 else np.float32(0.0)
+    np.clip(out, -1.0, 1.0, out=out)
+    return out
@@ -1,11 +1,34 @@
+import os
 import cv2
 import numpy as np
 import time
-from typing import Optional, Tuple, List
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, List, Union
+from fft_matcher import FrameSpectra, choose_backend, match_template_fft, BACKEND_FFT
+import tiled_search
+from match_schedule import MatchSchedule, cell_bound
+from incremental_match import IncrementalMatcher
+from prefilter import TilePrefilter
 from config import METHOD_TEMPLATE, DEFAULT_METHOD, DEFAULT_THRESHOLD, SCALE_FACTORS, MATCHING_METHODS, MATCH_COLOR, FONT_SCALE, FONT_THICKNESS, TEXT_COLOR, RECT_THICKNESS, MIN_TEMPLATE_SIZE
+from config import MATCH_WORKERS, EARLY_EXIT_CONFIDENCE, TEMPLATE_CACHE_SIZE, SCHEDULE_ADAPTIVE
+from config import MATCH_CACHE_SIZE, MATCH_CACHE_DOWNSAMPLE, PREFILTER
+from config import MATCH_BACKEND
+from config import FULL_SEARCH_MODE, TILE_WORKERS, TILE_MIN_PIXELS
+from config import METHOD_ORB, ORB_TEMPLATE_FEATURES, ORB_FRAME_FEATURES, ORB_PATCH_SIZE, ORB_FAST_THRESHOLD, ORB_RATIO, ORB_MIN_INLIERS, ORB_RANSAC_REPROJ, ORB_SCALE_RANGE, ORB_ACCEPT_CONFIDENCE
+from config import METHOD_PYRAMID, PYRAMID_DOWNSCALE, PYRAMID_MIN_TEMPLATE, PYRAMID_TOP_K, PYRAMID_REFINE_MARGIN, PYRAMID_ACCEPT_CONFIDENCE
+
+try:
+    import xxhash
+except Exception:
+    xxhash = None
 
 class ImageFinderConfig:
     METHOD_TEMPLATE = METHOD_TEMPLATE
+    METHOD_PYRAMID = METHOD_PYRAMID
+    METHOD_ORB = METHOD_ORB
     DEFAULT_METHOD = DEFAULT_METHOD
     DEFAULT_THRESHOLD = DEFAULT_THRESHOLD
     SCALE_FACTORS = SCALE_FACTORS
@@ -16,57 +39,656 @@ class ImageFinderConfig:
     TEXT_COLOR = TEXT_COLOR
     RECT_THICKNESS = RECT_THICKNESS
     MIN_TEMPLATE_SIZE = MIN_TEMPLATE_SIZE
+    MATCH_WORKERS = MATCH_WORKERS
+    EARLY_EXIT_CONFIDENCE = EARLY_EXIT_CONFIDENCE
+    TEMPLATE_CACHE_SIZE = TEMPLATE_CACHE_SIZE
+    SCHEDULE_ADAPTIVE = SCHEDULE_ADAPTIVE
+    MATCH_CACHE_SIZE = MATCH_CACHE_SIZE
+    MATCH_CACHE_DOWNSAMPLE = MATCH_CACHE_DOWNSAMPLE
+    PREFILTER = PREFILTER
+    MATCH_BACKEND = MATCH_BACKEND
+    FULL_SEARCH_MODE = FULL_SEARCH_MODE
+    TILE_WORKERS = TILE_WORKERS
+    TILE_MIN_PIXELS = TILE_MIN_PIXELS
+    ORB_TEMPLATE_FEATURES = ORB_TEMPLATE_FEATURES
+    ORB_FRAME_FEATURES = ORB_FRAME_FEATURES
+    ORB_PATCH_SIZE = ORB_PATCH_SIZE
+    ORB_FAST_THRESHOLD = ORB_FAST_THRESHOLD
+    ORB_RATIO = ORB_RATIO
+    ORB_MIN_INLIERS = ORB_MIN_INLIERS
+    ORB_RANSAC_REPROJ = ORB_RANSAC_REPROJ
+    ORB_SCALE_RANGE = ORB_SCALE_RANGE
+    ORB_ACCEPT_CONFIDENCE = ORB_ACCEPT_CONFIDENCE
+    PYRAMID_DOWNSCALE = PYRAMID_DOWNSCALE
+    PYRAMID_MIN_TEMPLATE = PYRAMID_MIN_TEMPLATE
+    PYRAMID_TOP_K = PYRAMID_TOP_K
+    PYRAMID_REFINE_MARGIN = PYRAMID_REFINE_MARGIN
+    PYRAMID_ACCEPT_CONFIDENCE = PYRAMID_ACCEPT_CONFIDENCE
+
+# One pool per worker count, shared by all finder instances of the process
+_POOLS: Dict[int, ThreadPoolExecutor] = {}
+_POOLS_LOCK = threading.Lock()
+
+def _shared_pool(workers: int) -> ThreadPoolExecutor:
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            pool = _POOLS[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="match")
+        return pool
+
+def _top_k_peaks(response: np.ndarray, k: int, suppress_w: int, suppress_h: int) -> List[Tuple[int, int]]:
+    """k highest response positions, each suppressing a template-sized neighbourhood (non-maximum suppression)."""
+    response = response.copy()
+    peaks = []
+    for _ in range(k):
+        _, max_val, _, (px, py) = cv2.minMaxLoc(response)
+        if max_val <= -1.0:
+            break
+        peaks.append((px, py))
+        x0, y0 = max(0, px - suppress_w // 2), max(0, py - suppress_h // 2)
+        response[y0:py + suppress_h // 2 + 1, x0:px + suppress_w // 2 + 1] = -1.0
+    return peaks
+
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def _read_image(path: str) -> np.ndarray:
+    image = cv2.imread(path)
+    if image is None:
+        raise ValueError(f"Could not load image {path}")
+    return image
+
+def _pixel_digest(image: np.ndarray) -> bytes:
+    """Fast content hash of an image (xxhash if installed, blake2b otherwise), shape included."""
+    data = np.ascontiguousarray(image)
+    shape = repr(data.shape).encode()
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data) + shape
+    return hashlib.blake2b(data, digest_size=16).digest() + shape
+
+class Template:
+    """
+    Preloaded click template. The grayscale version is built once, resized
+    variants (per scale and per pyramid factor) are cached on first use.
+    """
+
+    def __init__(self, image: np.ndarray, key: Optional[str] = None):
+        self.image = image
+        self.gray = _to_gray(image)
+        self.key = key if key is not None else f"array:{id(self)}"
+        self._scaled: Dict[float, np.ndarray] = {}
+        self._coarse: Dict[float, np.ndarray] = {}
+        self._features: Dict[Any, Any] = {}
+        self._digest: Optional[bytes] = None
+
+    @classmethod
+    def from_path(cls, path: str) -> "Template":
+        return cls(_read_image(path), key=path)
+
+    @property
+    def width(self) -> int:
+        return self.gray.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.gray.shape[0]
+
+    @property
+    def digest(self) -> bytes:
+        """Content hash of the grayscale icon; identical icons share match cache entries."""
+        if self._digest is None:
+            self._digest = _pixel_digest(self.gray)
+        return self._digest
+
+    def scaled(self, scale: float) -> np.ndarray:
+        img = self._scaled.get(scale)
+        if img is None:
+            if scale == 1.0:
+                img = self.gray
+            else:
+                img = cv2.resize(self.gray, (int(self.width * scale), int(self.height * scale)))
+            self._scaled[scale] = img
+        return img
+
+    def features(self, key: Any, compute: Callable[[np.ndarray], Any]) -> Any:
+        """Per-template cache for derived data such as keypoints; compute gets the grayscale icon."""
+        value = self._features.get(key)
+        if value is None:
+            value = self._features.setdefault(key, compute(self.gray))
+        return value
+
+    def coarse(self, factor: float) -> np.ndarray:
+        img = self._coarse.get(factor)
+        if img is None:
+            size = (max(1, int(self.width * factor)), max(1, int(self.height * factor)))
+            img = self._coarse[factor] = cv2.resize(self.gray, size, interpolation=cv2.INTER_AREA)
+        return img
+
+class ScreenFrame:
+    """
+    One captured screen. Grayscale conversion and downscaled pyramid levels are
+    computed once and shared by every template searched in this frame.
+    """
+
+    def __init__(self, image: np.ndarray, key: Optional[str] = None):
+        self.image = image
+        self.gray = _to_gray(image)
+        self.key = key
+        self._levels: Dict[float, np.ndarray] = {}
+        self._spectra: Dict[Optional[Tuple[int, int, int, int]], FrameSpectra] = {}
+        self._features: Dict[Any, Any] = {}
+        self._digests: Dict[Tuple[Optional[Tuple[int, int, int, int]], int], bytes] = {}
+
+    @classmethod
+    def from_path(cls, path: str) -> "ScreenFrame":
+        return cls(_read_image(path), key=path)
+
+    @property
+    def width(self) -> int:
+        return self.gray.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.gray.shape[0]
+
+    def level(self, factor: float) -> np.ndarray:
+        img = self._levels.get(factor)
+        if img is None:
+            size = (max(1, int(self.width * factor)), max(1, int(self.height * factor)))
+            img = self._levels[factor] = cv2.resize(self.gray, size, interpolation=cv2.INTER_AREA)
+        return img
+
+    def features(self, key: Any, compute: Callable[[np.ndarray], Any],
+                 region: Optional[Tuple[int, int, int, int]] = None) -> Any:
+        """Per-frame cache for derived data such as keypoints; compute gets the grayscale search area."""
+        value = self._features.get((key, region))
+        if value is None:
+            value = self._features.setdefault((key, region), compute(self.area(region)[0]))
+        return value
+
+    def spectra(self, region: Optional[Tuple[int, int, int, int]] = None) -> FrameSpectra:
+        """FFT data of the search area, computed on first use by the frequency-domain backend."""
+        spectra = self._spectra.get(region)
+        if spectra is None:
+            spectra = self._spectra.setdefault(region, FrameSpectra(self.area(region)[0]))
+        return spectra
+
+    def digest(self, region: Optional[Tuple[int, int, int, int]] = None, downsample: int = 1) -> bytes:
+        """Content hash of the search area, hashed at 1/downsample resolution."""
+        key = (region, downsample)
+        value = self._digests.get(key)
+        if value is None:
+            area = self.area(region)[0]
+            if downsample > 1 and area.shape[0] >= downsample and area.shape[1] >= downsample:
+                size = (area.shape[1] // downsample, area.shape[0] // downsample)
+                area = cv2.resize(area, size, interpolation=cv2.INTER_AREA)
+            value = self._digests.setdefault(key, _pixel_digest(area))
+        return value
+
+    def area(self, region: Optional[Tuple[int, int, int, int]] = None) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """Grayscale search area (view, no copy) and its offset in frame coordinates."""
+        if region is None:
+            return self.gray, (0, 0)
+        x, y, w, h = region
+        return self.gray[y:y+h, x:x+w], (x, y)
+
+def as_template(icon: Union[Template, np.ndarray, str]) -> Template:
+    if isinstance(icon, Template):
+        return icon
+    if isinstance(icon, str):
+        return Template.from_path(icon)
+    return Template(icon)
+
+def as_frame(screenshot: Union[ScreenFrame, np.ndarray, str]) -> ScreenFrame:
+    if isinstance(screenshot, ScreenFrame):
+        return screenshot
+    if isinstance(screenshot, str):
+        return ScreenFrame.from_path(screenshot)
+    return ScreenFrame(screenshot)
+
+def _orb_detector(features: int):
+    # detectors are not shared between threads, creating one is cheap
+    return cv2.ORB_create(nfeatures=features,
+                          edgeThreshold=ImageFinderConfig.ORB_PATCH_SIZE,
+                          patchSize=ImageFinderConfig.ORB_PATCH_SIZE,
+                          fastThreshold=ImageFinderConfig.ORB_FAST_THRESHOLD)
+
+def _orb_template_features(gray: np.ndarray):
+    """Keypoint positions (N x 2, icon coordinates) and descriptors of a template."""
+    # pad so corners close to the icon border still get a full descriptor patch
+    pad = ImageFinderConfig.ORB_PATCH_SIZE
+    padded = cv2.copyMakeBorder(gray, pad, pad, pad, pad, cv2.BORDER_REPLICATE)
+    keypoints, descriptors = _orb_detector(ImageFinderConfig.ORB_TEMPLATE_FEATURES).detectAndCompute(padded, None)
+    points = np.float32([kp.pt for kp in keypoints]).reshape(-1, 2) - pad
+    return points, descriptors
+
+def _orb_frame_features(gray: np.ndarray):
+    """Keypoint positions (N x 2) and descriptors of a screenshot or search area."""
+    keypoints, descriptors = _orb_detector(ImageFinderConfig.ORB_FRAME_FEATURES).detectAndCompute(gray, None)
+    return np.float32([kp.pt for kp in keypoints]).reshape(-1, 2), descriptors
+
+def _orb_locate(t_points: np.ndarray, t_des: Optional[np.ndarray], f_points: np.ndarray, f_des: Optional[np.ndarray],
+                width: int, height: int) -> Optional[Tuple[float, float, float]]:
+    """Template centre (x, y) in frame coordinates and scale, or None if the features don't agree."""
+    if t_des is None or f_des is None or len(t_des) < 2 or len(f_des) < 2:
+        return None
+    pairs = cv2.BFMatcher(cv2.NORM_HAMMING).knnMatch(t_des, f_des, k=2)
+    good = [p[0] for p in pairs if len(p) == 2 and p[0].distance < ImageFinderConfig.ORB_RATIO * p[1].distance]
+    if len(good) < ImageFinderConfig.ORB_MIN_INLIERS:
+        return None
+    src = t_points[[m.queryIdx for m in good]]
+    dst = f_points[[m.trainIdx for m in good]]
+    transform, inliers = cv2.estimateAffinePartial2D(src, dst, method=cv2.RANSAC,
+                                                     ransacReprojThreshold=ImageFinderConfig.ORB_RANSAC_REPROJ)
+    if transform is None or inliers is None or int(inliers.sum()) < ImageFinderConfig.ORB_MIN_INLIERS:
+        return None
+    scale = float(np.hypot(transform[0, 0], transform[1, 0]))
+    low, high = ImageFinderConfig.ORB_SCALE_RANGE
+    if not low <= scale <= high:
+        return None
+    cx, cy = transform @ np.array([width / 2.0, height / 2.0, 1.0])
+    return float(cx), float(cy), scale
 
 class ImageFinderClient:
-    def __init__(self, threshold: Optional[float] = None, method: Optional[str] = None):
+    def __init__(self, threshold: Optional[float] = None, method: Optional[str] = None,
+                 workers: Optional[int] = None, early_exit: Optional[float] = None, backend: Optional[str] = None,
+                 full_search: Optional[str] = None, tile_workers: Optional[int] = None,
+                 adaptive: Optional[bool] = None, cache_size: Optional[int] = None,
+                 prefilter: Optional[bool] = None):
         self.threshold = threshold if threshold is not None else ImageFinderConfig.DEFAULT_THRESHOLD
         self.method = method if method is not None else ImageFinderConfig.DEFAULT_METHOD
+        self.workers = workers if workers is not None else ImageFinderConfig.MATCH_WORKERS
+        self.early_exit = early_exit if early_exit is not None else ImageFinderConfig.EARLY_EXIT_CONFIDENCE
+        self.backend = backend if backend is not None else ImageFinderConfig.MATCH_BACKEND
+        self.full_search = full_search if full_search is not None else ImageFinderConfig.FULL_SEARCH_MODE
+        self.tile_workers = tile_workers if tile_workers is not None else ImageFinderConfig.TILE_WORKERS
+        self.adaptive = adaptive if adaptive is not None else ImageFinderConfig.SCHEDULE_ADAPTIVE
+        self.cache_size = cache_size if cache_size is not None else ImageFinderConfig.MATCH_CACHE_SIZE
+        self.prefilter = TilePrefilter() if (prefilter if prefilter is not None else ImageFinderConfig.PREFILTER) else None
+        # learned grid order and matchTemplate call counters, kept for the finder's lifetime
+        self.schedule = MatchSchedule()
+        # (method, template digest, region, area digest, scales) -> raw best match, least recently used first
+        self._results: "OrderedDict[Tuple, Optional[Tuple[int, int, int, int, float]]]" = OrderedDict()
+        self._results_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # last capture per template/region kept between retries for find_incremental
+        self.incremental = IncrementalMatcher()
+        # icon path -> ((mtime_ns, size), Template), least recently used first
+        self._templates: "OrderedDict[str, Tuple[Tuple[int, int], Template]]" = OrderedDict()
+        self._templates_lock = threading.Lock()
 
     def find(self, icon_path: str, screenshot_path: str, region: Optional[Tuple[int, int, int, int]] = None):
+        try:
+            template = self.load_template(icon_path)
+            frame = ScreenFrame.from_path(screenshot_path)
+        except (OSError, ValueError):
+            raise ValueError("Could not load one or both images")
+        return self.find_array(template, frame, region)
+
+    def find_array(self, icon: Union[Template, np.ndarray], screenshot: Union[ScreenFrame, np.ndarray],
+                   region: Optional[Tuple[int, int, int, int]] = None,
+                   scales: Optional[List[float]] = None) -> Optional[Tuple[int, int, int, int, float]]:
+        """
+        Same as find() but on in-memory images: BGR/BGRA/gray arrays or preloaded
+        Template/ScreenFrame objects. scales narrows SCALE_FACTORS (e.g. to a learned
+        session scale). Returns (center_x, center_y, w, h, confidence) or None.
+        """
+        template = as_template(icon)
+        frame = as_frame(screenshot)
+        cache_key = None
+        if self.cache_size > 0:
+            cache_key = (self.method, template.digest, region,
+                         frame.digest(region, ImageFinderConfig.MATCH_CACHE_DOWNSAMPLE),
+                         tuple(scales) if scales is not None else None)
+            with self._results_lock:
+                if cache_key in self._results:
+                    self._results.move_to_end(cache_key)
+                    self.cache_hits += 1
+                    best_match = self._results[cache_key]
+                    return best_match if best_match is not None and best_match[-1] >= self.threshold else None
+                self.cache_misses += 1
         if self.method == ImageFinderConfig.METHOD_TEMPLATE:
-            return self._find_template(icon_path, screenshot_path, region)
+            search_area, offset = frame.area(region)
+            best_match = self._match_gray(search_area, template, offset, scales, spectra=frame.spectra(region))
+        elif self.method == ImageFinderConfig.METHOD_PYRAMID:
+            best_match = self._match_pyramid(frame, template, region, scales)
+        elif self.method == ImageFinderConfig.METHOD_ORB:
+            best_match = self._match_orb(frame, template, region, scales)
         else:
             raise ValueError("Unknown finder method")
+        if cache_key is not None:
+            with self._results_lock:
+                self._results[cache_key] = best_match
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        if best_match is None or best_match[-1] < self.threshold:
+            return None
+        return best_match
 
-    def _find_template(self, icon_path: str, screenshot_path: str, region: Optional[Tuple[int, int, int, int]] = None):
-        screenshot = cv2.imread(screenshot_path)
-        icon = cv2.imread(icon_path)
-        if screenshot is None or icon is None:
-            raise ValueError("Could not load one or both images")
-        screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-        icon_gray = cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY)
-        if region is not None:
-            x, y, w, h = region
-            search_area = screenshot_gray[y:y+h, x:x+w]
+    def find_incremental(self, icon: Union[Template, np.ndarray], screenshot: Union[ScreenFrame, np.ndarray],
+                         region: Optional[Tuple[int, int, int, int]] = None,
+                         scales: Optional[List[float]] = None, accept: Optional[float] = None,
+                         search: Optional[Callable[[Optional[Tuple[int, int, int, int]]], Optional[Tuple[int, int, int, int, float]]]] = None
+                         ) -> Optional[Tuple[int, int, int, int, float]]:
+        """
+        Like find_array, for polling the same template/region on successive captures: the
+        first call searches normally, calls after a miss (confidence below accept, default
+        threshold) only search around the tiles that changed since the previous capture.
+        search(region) replaces find_array for the actual searches, e.g. to add scale
+        narrowing. TEMPLATE method only, other methods always search the whole area.
+        """
+        template = as_template(icon)
+        frame = as_frame(screenshot)
+        if search is None:
+            search = lambda r: self.find_array(template, frame, r, scales)
+        if self.method != ImageFinderConfig.METHOD_TEMPLATE:
+            return search(region)
+        search_area, offset = frame.area(region)
+        key = (template.digest, region, tuple(scales) if scales is not None else None)
+        largest = max(scales if scales is not None else ImageFinderConfig.SCALE_FACTORS)
+        parts = self.incremental.changed_regions(
+            key, search_area, (int(template.height * largest), int(template.width * largest)))
+        if parts is None:
+            match = search(region)
         else:
-            x, y, w, h = 0, 0, screenshot_gray.shape[1], screenshot_gray.shape[0]
-            search_area = screenshot_gray
-        icon_height, icon_width = icon.shape[:2]
-        best_match = None
-        best_confidence = -1
-        for scale in ImageFinderConfig.SCALE_FACTORS:
-            new_width = int(icon_width * scale)
-            new_height = int(icon_height * scale)
+            match = None
+            for x, y, w, h in parts:
+                found = search((offset[0] + x, offset[1] + y, w, h))
+                if found is not None and (match is None or found[-1] > match[-1]):
+                    match = found
+        threshold = self.threshold if accept is None else accept
+        self.incremental.record(key, search_area, missed=match is None or match[-1] < threshold)
+        return match
+
+    def find_many(self, icons: Sequence[Union[Template, np.ndarray]], screenshot: Union[ScreenFrame, np.ndarray],
+                  region: Optional[Tuple[int, int, int, int]] = None,
+                  scales: Optional[List[float]] = None) -> List[Optional[Tuple[int, int, int, int, float]]]:
+        """Searches every template in one screenshot; the frame is converted and downscaled only once."""
+        frame = as_frame(screenshot)
+        return [self.find_array(icon, frame, region, scales) for icon in icons]
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for telemetry: matchTemplate calls made/avoided, result cache, incremental and prefilter counts."""
+        out = self.schedule.stats()
+        with self._results_lock:
+            out["cache_hits"] = self.cache_hits
+            out["cache_misses"] = self.cache_misses
+        out.update(self.incremental.stats())
+        if self.prefilter is not None:
+            out.update(self.prefilter.stats())
+        return out
+
+    def load_template(self, icon_path: str) -> Template:
+        """Template for icon_path, cached until the file changes."""
+        st = os.stat(icon_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._templates_lock:
+            cached = self._templates.get(icon_path)
+            if cached is not None and cached[0] == stamp:
+                self._templates.move_to_end(icon_path)
+                return cached[1]
+        template = Template.from_path(icon_path)
+        with self._templates_lock:
+            self._templates[icon_path] = (stamp, template)
+            self._templates.move_to_end(icon_path)
+            while len(self._templates) > ImageFinderConfig.TEMPLATE_CACHE_SIZE:
+                self._templates.popitem(last=False)
+        return template
+
+    def _grid_tasks(self, template: Template, shape: Tuple[int, ...],
+                    scales: Optional[List[float]] = None) -> Tuple[List[Tuple[np.ndarray, int, float]], List[Tuple[float, int]]]:
+        """Scale x method grid as (scaled icon, method, weight) tasks and their (scale, method) cells."""
+        h, w = shape[:2]
+        tasks = []
+        cells = []
+        for scale in (scales if scales is not None else ImageFinderConfig.SCALE_FACTORS):
+            new_width = int(template.width * scale)
+            new_height = int(template.height * scale)
             if (new_width < ImageFinderConfig.MIN_TEMPLATE_SIZE or
                 new_height < ImageFinderConfig.MIN_TEMPLATE_SIZE or
                 new_width > w or new_height > h):
                 continue
-            scaled_icon = cv2.resize(icon_gray, (new_width, new_height))
+            scaled_icon = template.scaled(scale)
             for method, weight in ImageFinderConfig.MATCHING_METHODS:
-                result = cv2.matchTemplate(search_area, scaled_icon, method)
-                _, max_val, _, max_loc = cv2.minMaxLoc(result)
-                confidence = max_val * weight
-                if confidence > best_confidence:
-                    best_confidence = confidence
-                    rect_x = max_loc[0] + x
-                    rect_y = max_loc[1] + y
-                    center_x = rect_x + new_width // 2
-                    center_y = rect_y + new_height // 2
-                    best_match = (center_x, center_y, new_width, new_height, confidence)
-        if best_confidence < self.threshold:
+                tasks.append((scaled_icon, method, weight))
+                cells.append((scale, method))
+        return tasks, cells
+
+    def _match_gray(self, search_area: np.ndarray, icon: Union[Template, np.ndarray], offset: Tuple[int, int] = (0, 0),
+                    scales: Optional[List[float]] = None, spectra: Optional[FrameSpectra] = None) -> Optional[Tuple[int, int, int, int, float]]:
+        """
+        Runs the scale x method grid over search_area and returns the best match
+        (center_x, center_y, w, h, confidence) in screenshot coordinates.
+        The grid picks spatial or FFT correlation once from the cost model; spectra of
+        search_area can be passed in to share them across templates.
+        """
+        template = as_template(icon)
+        tasks, cells = self._grid_tasks(template, search_area.shape, scales)
+        if not tasks:
             return None
+        schedule = self.schedule
+        if self._use_tiles(search_area):
+            best = tiled_search.tiled_match(search_area, tasks, self.tile_workers, early_exit=self.early_exit)
+            if best is None:
+                return None
+            confidence, i, loc_x, loc_y, tw, th = best
+            schedule.observe(cells[i], confidence)
+            rect_x = loc_x + offset[0]
+            rect_y = loc_y + offset[1]
+            return (rect_x + tw // 2, rect_y + th // 2, tw, th, confidence)
+        if spectra is None:
+            spectra = FrameSpectra(search_area)
+        # one backend for the whole grid: the FFT frame spectrum is shared by all scales
+        icon_shapes = list(dict.fromkeys(task[0].shape[:2] for task in tasks))
+        use_fft = choose_backend(search_area.shape, icon_shapes, self.backend,
+                                 methods=len(ImageFinderConfig.MATCHING_METHODS)) == BACKEND_FFT
+        # tile plans per template size, shared by both methods of a scale
+        plans: Dict[Tuple[int, int], Any] = {}
+
+        def plan_for(scaled_icon):
+            shape = scaled_icon.shape[:2]
+            if shape not in plans:
+                plans[shape] = self.prefilter.plan(spectra.integrals(), search_area.shape, *shape)
+            return plans[shape]
+
+        # raw TM_CCOEFF_NORMED maximum per scale, bounds the TM_CCORR_NORMED cell of that scale
+        ccoeff_max: Dict[float, float] = {}
+        lock = threading.Lock()
+
+        def run(task):
+            scaled_icon, method, weight = task
+            plan = plan_for(scaled_icon) if self.prefilter is not None else None
+            if plan is not None:
+                max_val, max_loc = self.prefilter.match(search_area, scaled_icon, method, plan)
+            else:
+                if use_fft:
+                    result = match_template_fft(spectra, scaled_icon, method)
+                else:
+                    result = cv2.matchTemplate(search_area, scaled_icon, method)
+                _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            return max_val * weight, max_loc, scaled_icon.shape[1], scaled_icon.shape[0]
+
+        def note(i, confidence):
+            scaled_icon, method, weight = tasks[i]
+            if method == cv2.TM_CCOEFF_NORMED:
+                with lock:
+                    ccoeff_max[cells[i][0]] = confidence / weight
+
+        def bound(i):
+            scaled_icon, method, weight = tasks[i]
+            with lock:
+                known = ccoeff_max.get(cells[i][0])
+            return weight * cell_bound(scaled_icon, method, known)
+
+        weights = [task[2] for task in tasks]
+        order = schedule.order(cells, weights, self.early_exit) if self.adaptive else list(range(len(tasks)))
+        # best = (confidence, -task index, loc, w, h); ties go to the earlier grid entry. Both paths
+        # return the best of all cells up to the first one in `order` that reaches early_exit, so the
+        # result depends only on `order` (the schedule's state), not on which worker finishes first.
+        # The adaptive schedule also skips cells whose bound can't beat the best of the cells before
+        # them in `order`: such a cell can neither win nor be the first to reach early_exit
+        best = None
+        if self.workers <= 1 or len(tasks) == 1:
+            for n, i in enumerate(order):
+                if self.adaptive and best is not None and (bound(i), -i) < best[:2]:
+                    schedule.prune()
+                    continue
+                confidence, loc, tw, th = run(tasks[i])
+                schedule.observe(cells[i], confidence)
+                note(i, confidence)
+                if best is None or (confidence, -i) > best[:2]:
+                    best = (confidence, -i, loc, tw, th)
+                if confidence >= self.early_exit:
+                    schedule.skip(len(order) - n - 1)
+                    break
+        else:
+            pool = _shared_pool(self.workers)
+            position = {i: n for n, i in enumerate(order)}
+            # confidence per finished cell, filled by the workers for the bound test
+            finished: Dict[int, float] = {}
+
+            def run_cell(i):
+                if self.adaptive:
+                    with lock:
+                        floor = max(((c, -j) for j, c in finished.items() if position[j] < position[i]), default=None)
+                    if floor is not None and (bound(i), -i) < floor:
+                        return None
+                result = run(tasks[i])
+                note(i, result[0])
+                with lock:
+                    finished[i] = result[0]
+                return result
+
+            def settle(j, result):
+                if result is None:
+                    schedule.prune()
+                else:
+                    schedule.observe(cells[j], result[0])
+
+            futures = {pool.submit(run_cell, i): i for i in order}
+            results: Dict[int, Optional[Tuple[float, Any, int, int]]] = {}
+            # position in order of the first cell known to reach early_exit
+            stop = len(order)
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                i = futures[future]
+                results[i] = future.result()
+                settle(i, results[i])
+                if results[i] is not None and results[i][0] >= self.early_exit and position[i] < stop:
+                    stop = position[i]
+                    # good enough: drop the queued cells behind it, earlier ones still have to report
+                    for f, j in futures.items():
+                        if position[j] > stop and not f.done() and f.cancel():
+                            schedule.skip()
+                if stop < len(order) and all(j in results for j in order[:stop + 1]):
+                    # running cells finish in the background, their scores still feed the schedule
+                    for f, j in futures.items():
+                        if not f.done():
+                            f.add_done_callback(lambda f, j=j: f.cancelled() or settle(j, f.result()))
+                    break
+            for i in order[:stop + 1]:
+                if results[i] is None:
+                    continue
+                confidence, loc, tw, th = results[i]
+                if best is None or (confidence, -i) > best[:2]:
+                    best = (confidence, -i, loc, tw, th)
+
+        confidence, _, (loc_x, loc_y), tw, th = best
+        rect_x = loc_x + offset[0]
+        rect_y = loc_y + offset[1]
+        return (rect_x + tw // 2, rect_y + th // 2, tw, th, confidence)
+
+    def _use_tiles(self, search_area: np.ndarray) -> bool:
+        if self.full_search == "tiled":
+            return True
+        if self.full_search != "auto":
+            return False
+        return (self.tile_workers > 1 and
+                search_area.shape[0] * search_area.shape[1] >= ImageFinderConfig.TILE_MIN_PIXELS)
+
+    def _match_pyramid(self, frame: ScreenFrame, template: Template, region: Optional[Tuple[int, int, int, int]] = None,
+                       scales: Optional[List[float]] = None) -> Optional[Tuple[int, int, int, int, float]]:
+        """
+        Coarse-to-fine search: the downscaled template is matched against the frame's
+        downscaled level, the PYRAMID_TOP_K best peaks are then refined with the full scale x method
+        grid in a small window at full resolution.
+        """
+        search_area, offset = frame.area(region)
+        h, w = search_area.shape[:2]
+        factor = max(ImageFinderConfig.PYRAMID_DOWNSCALE, ImageFinderConfig.PYRAMID_MIN_TEMPLATE / min(template.height, template.width))
+        if factor >= 0.75:
+            # template too small for a useful coarse level
+            return self._match_gray(search_area, template, offset, scales)
+        # region of the shared coarse level, rounded outwards
+        cx0, cy0 = int(offset[0] * factor), int(offset[1] * factor)
+        cx1, cy1 = int(np.ceil((offset[0] + w) * factor)), int(np.ceil((offset[1] + h) * factor))
+        coarse_area = frame.level(factor)[cy0:cy1, cx0:cx1]
+        coarse_icon = template.coarse(factor)
+        if coarse_icon.shape[0] > coarse_area.shape[0] or coarse_icon.shape[1] > coarse_area.shape[1]:
+            return self._match_gray(search_area, template, offset, scales)
+
+        response = cv2.matchTemplate(coarse_area, coarse_icon, cv2.TM_CCOEFF_NORMED)
+        peaks = _top_k_peaks(response, ImageFinderConfig.PYRAMID_TOP_K, coarse_icon.shape[1], coarse_icon.shape[0])
+
+        max_scale = max(scales if scales is not None else ImageFinderConfig.SCALE_FACTORS)
+        margin = ImageFinderConfig.PYRAMID_REFINE_MARGIN + int(round(1.0 / factor))
+        win_w = int(template.width * max_scale) + 2 * margin
+        win_h = int(template.height * max_scale) + 2 * margin
+        best_match = None
+        for peak_x, peak_y in peaks:
+            # candidate centre in search_area coordinates, window centred on it
+            cx = int((peak_x + cx0) / factor) - offset[0] + template.width // 2
+            cy = int((peak_y + cy0) / factor) - offset[1] + template.height // 2
+            x0 = min(max(0, cx - win_w // 2), max(0, w - win_w))
+            y0 = min(max(0, cy - win_h // 2), max(0, h - win_h))
+            window = search_area[y0:y0 + win_h, x0:x0 + win_w]
+            match = self._match_gray(window, template, (offset[0] + x0, offset[1] + y0), scales)
+            if match is not None and (best_match is None or match[-1] > best_match[-1]):
+                best_match = match
+            if best_match is not None and best_match[-1] >= self.early_exit:
+                break
+        if best_match is None or best_match[-1] < ImageFinderConfig.PYRAMID_ACCEPT_CONFIDENCE:
+            # coarse level can miss small or low-contrast icons; verify weak results with the full sweep
+            return self._match_gray(search_area, template, offset, scales)
         return best_match
 
+    def _match_orb(self, frame: ScreenFrame, template: Template, region: Optional[Tuple[int, int, int, int]] = None,
+                   scales: Optional[List[float]] = None) -> Optional[Tuple[int, int, int, int, float]]:
+        """
+        Feature-based search: ORB keypoints of the template (cached on the Template) are
+        matched against the keypoints of the frame (detected once per frame and region),
+        a similarity transform is fitted with RANSAC, and the predicted location is
+        verified by template matching at the estimated scale. Icons without usable
+        features fall back to the pyramid search.
+        """
+        search_area, offset = frame.area(region)
+        t_kp, t_des = template.features("orb", _orb_template_features)
+        f_kp, f_des = frame.features("orb", _orb_frame_features, region)
+        located = _orb_locate(t_kp, t_des, f_kp, f_des, template.width, template.height)
+        if located is None:
+            return self._match_pyramid(frame, template, region, scales)
+        cx, cy, scale = located
+        # round so Template.scaled() caches a bounded set of sizes
+        scale = round(scale, 2)
+        verify_scales = sorted({round(scale * f, 2) for f in (0.98, 1.0, 1.02)})
+        margin = ImageFinderConfig.PYRAMID_REFINE_MARGIN
+        win_w = int(template.width * verify_scales[-1]) + 2 * margin
+        win_h = int(template.height * verify_scales[-1]) + 2 * margin
+        h, w = search_area.shape[:2]
+        x0 = min(max(0, int(cx) - win_w // 2), max(0, w - win_w))
+        y0 = min(max(0, int(cy) - win_h // 2), max(0, h - win_h))
+        window = search_area[y0:y0 + win_h, x0:x0 + win_w]
+        match = self._match_gray(window, template, (offset[0] + x0, offset[1] + y0), verify_scales)
+        if match is None or match[-1] < ImageFinderConfig.ORB_ACCEPT_CONFIDENCE:
+            return self._match_pyramid(frame, template, region, scales)
+        return match
+
     @staticmethod
     def draw_match(screenshot_path: str, match: Optional[Tuple[int, int, int, int, float]], output_path: Optional[str] = None):
         if match is None:
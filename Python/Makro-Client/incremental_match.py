@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import DIRTY_TILE_SIZE, DIRTY_THRESHOLD, INCREMENTAL_MAX_DIRTY, INCREMENTAL_STATES
+
+# (x, y, w, h) inside the search area
+Region = Tuple[int, int, int, int]
+
+
+class _State:
+    """Last search area of a template/region pair and whether its search missed."""
+
+    def __init__(self, gray: np.ndarray, missed: bool):
+        self.gray = gray
+        self.missed = missed
+
+
+class IncrementalMatcher:
+    """
+    Polling of one template/region on successive captures. After a miss no match window of
+    the previous capture reached the acceptance threshold. Normalised correlation at a
+    position depends only on its own window, so windows lying in unchanged DIRTY_TILE_SIZE
+    tiles score exactly as before and still can't be accepted: only the windows touching a
+    changed tile (changed tiles grown by the template size) have to be searched again.
+
+    Keeps just the last search area per key, no response maps, so the first capture runs
+    the normal (pruned, early-exit, cached) search and seeds the state for free.
+    """
+
+    def __init__(self, tile_size: int = DIRTY_TILE_SIZE, threshold: int = DIRTY_THRESHOLD,
+                 max_dirty: float = INCREMENTAL_MAX_DIRTY, max_states: int = INCREMENTAL_STATES):
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self.max_dirty = max_dirty
+        self.max_states = max_states
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[Hashable, _State]" = OrderedDict()
+        self.tiles = 0
+        self.dirty_tiles = 0
+        self.full_searches = 0
+
+    def dirty_rects(self, previous: np.ndarray, current: np.ndarray) -> Tuple[List[Tuple[int, int, int, int]], int, int]:
+        """Pixel rects (x0, y0, x1, y1) covering the changed tiles, dirty tile count, tile count."""
+        h, w = current.shape[:2]
+        t = self.tile_size
+        ty, tx = -(-h // t), -(-w // t)
+        changed = np.zeros((ty * t, tx * t), dtype=bool)
+        changed[:h, :w] = cv2.absdiff(previous, current) > self.threshold
+        tiles = changed.reshape(ty, t, tx, t).any(axis=(1, 3))
+        dirty = int(tiles.sum())
+        if dirty == 0:
+            return [], 0, ty * tx
+        # neighbouring dirty tiles are searched as one block
+        count, _, stats, _ = cv2.connectedComponentsWithStats(tiles.astype(np.uint8), connectivity=8)
+        rects = []
+        for x, y, bw, bh, _ in stats[1:count]:
+            rects.append((x * t, y * t, min(w, (x + bw) * t), min(h, (y + bh) * t)))
+        return rects, dirty, ty * tx
+
+    def changed_regions(self, key: Hashable, search_area: np.ndarray,
+                        templ_size: Tuple[int, int]) -> Optional[List[Region]]:
+        """
+        Parts of search_area that must be searched again, as (x, y, w, h) regions grown by
+        templ_size (largest scaled template, h x w); [] if nothing changed since the last miss.
+        None: search the whole area (no earlier miss on an area of this shape, or too much changed).
+        """
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+        if state is None or not state.missed or state.gray.shape != search_area.shape:
+            return self._full()
+        rects, dirty, total = self.dirty_rects(state.gray, search_area)
+        with self._lock:
+            self.tiles += total
+            self.dirty_tiles += dirty
+        if dirty > self.max_dirty * total:
+            return self._full()
+        h, w = search_area.shape[:2]
+        th, tw = templ_size
+        regions = []
+        for x0, y0, x1, y1 in rects:
+            # every window that overlaps the rect: template-sized margin on all sides
+            rx0, ry0 = max(0, x0 - tw + 1), max(0, y0 - th + 1)
+            rx1, ry1 = min(w, x1 + tw - 1), min(h, y1 + th - 1)
+            regions.append((rx0, ry0, rx1 - rx0, ry1 - ry0))
+        if sum(rw * rh for _, _, rw, rh in regions) > self.max_dirty * w * h:
+            return self._full()
+        return regions
+
+    def record(self, key: Hashable, search_area: np.ndarray, missed: bool) -> None:
+        """Remembers the searched capture; only a miss lets the next capture skip unchanged tiles."""
+        with self._lock:
+            self._states[key] = _State(search_area.copy(), missed)
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_states:
+                self._states.popitem(last=False)
+
+    def _full(self) -> None:
+        with self._lock:
+            self.full_searches += 1
+        return None
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops all kept captures."""
+        with self._lock:
+            self._states.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "incremental_tiles": self.tiles,
+                "incremental_dirty_tiles": self.dirty_tiles,
+                "incremental_full": self.full_searches,
+            }
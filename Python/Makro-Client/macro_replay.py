@@ -1,15 +1,20 @@
 import os
 import time
 import json
+import queue
 import threading
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
-import pyautogui
-from pynput.mouse import Controller as MouseController, Button
-from pynput.keyboard import Controller as KeyboardController, Key
-from image_finder_client import ImageFinderClient
-import cv2
-from config import ACTIONS_LOG, MOUSE_LOG, CONFIDENCE_THRESHOLD, MAX_ATTEMPTS, RETRY_DELAY, SEARCH_REGION_SIZE
+from image_finder_client import ImageFinderClient, ScreenFrame, Template
+from replay_backends import InputBackend, ScreenSource, TrackingInputBackend, Button, Key, default_input_backend, default_screen_source
+from replay_control import ReplayControl
+from replay_telemetry import ReplayTelemetry
+from replay_plan import ReplayPlan
+from scale_tracker import SessionScaleTracker, machine_key
+from anchor_store import AnchorStore
+from config import ACTIONS_LOG, MOUSE_LOG, CONFIDENCE_THRESHOLD, MAX_ATTEMPTS, RETRY_DELAY, SEARCH_REGION_SIZE, RESULTS_DIR, SCREENSHOTS_DIR, PLAN_CACHE
+from config import STREAM_THRESHOLD_BYTES, STREAM_READ_AHEAD, STREAM_CHUNK
+from config import SCALE_TRACKING, SCALE_PROFILE, SCALE_NARROW_ACCEPT, ANCHORS, ANCHORS_FILE, INCREMENTAL_RETRY
 
 
 ACTIONS_LOG = "actions.log"
@@ -39,10 +44,76 @@ class FileUtils:
         with open(filepath, "r") as f:
             return [json.loads(line) for line in f if line.strip()]
 
+    @staticmethod
+    def iter_json_lines(filepath: str) -> Iterator[Dict[str, Any]]:
+        """Like read_json_lines, but parses lazily one line at a time."""
+        if not os.path.exists(filepath):
+            print(f"File {filepath} does not exist.")
+            return
+        with open(filepath, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+class ReadAhead:
+    """
+    Consumes `source` in a background thread and keeps at most `limit` items
+    buffered, so the consumer can start with the first parsed items while memory stays bounded.
+    """
+    _END = object()
+
+    def __init__(self, source: Iterable[Any], limit: int = STREAM_READ_AHEAD, chunk: int = STREAM_CHUNK):
+        self._chunk = max(1, chunk)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, limit // self._chunk))
+        self._closed = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._fill, args=(iter(source),), daemon=True)
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self, it: Iterator[Any]) -> None:
+        try:
+            batch: List[Any] = []
+            for item in it:
+                batch.append(item)
+                if len(batch) >= self._chunk:
+                    if not self._put(batch):
+                        return
+                    batch = []
+            if batch:
+                self._put(batch)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._put(self._END)
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            batch = self._queue.get()
+            if batch is self._END:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield from batch
+
+    def close(self) -> None:
+        """Stops the reader thread early (e.g. when the replay is aborted)."""
+        self._closed.set()
+
 class KeyParser:
     @staticmethod
     def parse_key(key_str: str):
         if key_str.startswith('Key.'):
+            if Key is None:
+                return key_str
             key_name = key_str.split('.', 1)[1]
             return getattr(Key, key_name, key_str)
         if key_str.startswith("'") and key_str.endswith("'"):
@@ -53,61 +124,99 @@ class KeyParser:
     def parse_mouse_button(key_str: str):
         if key_str.startswith('mouse_Button.'):
             btn = key_str.split('.', 1)[1]
+            if Button is None:
+                return btn
             return getattr(Button, btn, Button.left)
         return None
 
 class MouseReplay:
-    def __init__(self, mouse_log: str = MOUSE_LOG):
+    def __init__(self, mouse_log: str = MOUSE_LOG, telemetry: Optional[ReplayTelemetry] = None,
+                 backend: Optional[InputBackend] = None, events: Optional[List[Dict[str, Any]]] = None,
+                 streaming: bool = False, control: Optional[ReplayControl] = None):
         self.mouse_log = mouse_log
-        self.mouse = MouseController()
-        self.events = self._load_events()
+        self.backend = backend if backend is not None else default_input_backend()
+        self.telemetry = telemetry
+        self.control = control if control is not None else ReplayControl()
+        self.streaming = streaming and events is None
+        # In streaming mode events stay None and are parsed during replay
+        self.events = events if events is not None or self.streaming else self._load_events()
 
-    def _load_events(self) -> List[Dict[str, Any]]:
-        events = []
-        for entry in FileUtils.read_json_lines(self.mouse_log):
+    def _iter_events(self) -> Iterator[Dict[str, Any]]:
+        for entry in FileUtils.iter_json_lines(self.mouse_log):
             if entry.get('type') == 'move':
-                events.append({
+                yield {
                     'type': 'move',
                     'x': entry['x'],
                     'y': entry['y'],
                     'time': entry['time']
-                })
+                }
             elif entry.get('type') == 'scroll':
-                events.append({
+                yield {
                     'type': 'scroll',
                     'x': entry['x'],
                     'y': entry['y'],
                     'dx': entry.get('dx', 0),
                     'dy': entry.get('dy', 0),
                     'time': entry['time']
-                })
-        return events
+                }
+
+    def _load_events(self) -> List[Dict[str, Any]]:
+        return list(self._iter_events())
+
+    def first_event_time(self) -> Optional[float]:
+        if self.events is not None:
+            return self.events[0]['time'] if self.events else None
+        # mouse_moves.log is written chronologically: the first event is the earliest
+        return next((e['time'] for e in self._iter_events()), None)
+
+    def event_source(self) -> Iterable[Dict[str, Any]]:
+        """Parsed events, or a lazy iterator over the log in streaming mode."""
+        return self.events if self.events is not None else self._iter_events()
+
+    def apply_event(self, event: Dict[str, Any], offset: Tuple[int, int]) -> None:
+        """Injects one move/scroll; moves are shifted by the offset of the held button."""
+        if event['type'] == 'move':
+            event['x'] += offset[0]
+            event['y'] += offset[1]
+            print("offset", offset)
+            print(f"Moving mouse to ({event['x']}, {event['y']})")
+            self.backend.move(event['x'], event['y'])
+        elif event['type'] == 'scroll':
+            self.backend.scroll(event['x'], event['y'], event['dx'], event['dy'])
 
     def replay(self, start_time: float, first_event_time: float):
-        global mouseEventOffset
-        for event in self.events:
+        source = ReadAhead(self._iter_events()) if self.events is None else self.events
+        try:
+            self._replay_events(source, start_time, first_event_time)
+        finally:
+            if isinstance(source, ReadAhead):
+                source.close()
+
+    def _replay_events(self, source: Iterable[Dict[str, Any]], start_time: float, first_event_time: float):
+        for event in source:
             target_time = event['time'] - first_event_time
-            now = time.perf_counter() - start_time
-            sleep_time = max(0, target_time - now)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            if event['type'] == 'move':
-                offset = get_mouse_event_offset()
-                event['x'] += offset[0]
-                event['y'] += offset[1]
-                print("offset", offset)
-                print(f"Moving mouse to ({event['x']}, {event['y']})")
-                self.mouse.position = (event['x'], event['y'])
-            elif event['type'] == 'scroll':
-                self.mouse.position = (event['x'], event['y'])
-                self.mouse.scroll(event['dx'], event['dy'])
+            if not self.control.wait_until(start_time, target_time):
+                return
+            self.apply_event(event, get_mouse_event_offset())
+            if self.telemetry is not None:
+                self.telemetry.record_event('mouse', event, target_time, self.control.elapsed(start_time))
 
 class KeyboardReplay:
-    def __init__(self, actions_log: str = ACTIONS_LOG):
+    def __init__(self, actions_log: str = ACTIONS_LOG, telemetry: Optional[ReplayTelemetry] = None,
+                 backend: Optional[InputBackend] = None, screen: Optional[ScreenSource] = None,
+                 finder: Optional[ImageFinderClient] = None, events: Optional[List[Dict[str, Any]]] = None,
+                 control: Optional[ReplayControl] = None, scale_tracker: Optional[SessionScaleTracker] = None,
+                 anchors: Optional[AnchorStore] = None):
         self.actions_log = actions_log
-        self.keyboard = KeyboardController()
-        self.mouse = MouseController()
-        self.events = self._load_events()
+        self.backend = backend if backend is not None else default_input_backend()
+        self.screen = screen if screen is not None else default_screen_source()
+        # one finder for the whole run keeps its template cache warm between clicks
+        self.finder = finder if finder is not None else ImageFinderClient()
+        self.scale_tracker = scale_tracker
+        self.anchors = anchors
+        self.telemetry = telemetry
+        self.control = control if control is not None else ReplayControl()
+        self.events = events if events is not None else self._load_events()
 
     def _load_events(self) -> List[Dict[str, Any]]:
         events = []
@@ -139,112 +248,334 @@ class KeyboardReplay:
     
     def _take_screenshot(self):
         filename = os.path.join("screenshots", f"screenshot_.png")
-        screenshot = pyautogui.screenshot()
-        screenshot.save(filename)
-        return filename
+        return self.screen.capture(filename)
     
+    @staticmethod
+    def is_click(event: Dict[str, Any]) -> bool:
+        return 'btn' in event and event['btn'] is not None and event['x'] is not None and event['y'] is not None
+
+    def apply_key(self, event: Dict[str, Any]) -> None:
+        if event['type'] == 'press':
+            self.backend.key_press(event['key'])
+        elif event['type'] == 'release':
+            self.backend.key_release(event['key'])
+
+    def locate_click(self, event: Dict[str, Any]) -> Tuple[Optional[Tuple[int, int, int, int, float]], Dict[str, Any]]:
+        """
+        Captures the screen and searches the icon of a recorded press.
+        Blocking (capture, image search, retry delays); returns the match and its click stats.
+        """
+        mouseScreenshotFinder = MouseScreenshotFinder(self.finder, control=self.control,
+                                                      scale_tracker=self.scale_tracker, screen=self.screen)
+        capture_start = time.perf_counter()
+        screenshot_path = self._take_screenshot()
+        capture_ms = (time.perf_counter() - capture_start) * 1000.0
+        hints = (self.anchors.hints(event.get('screenshot'), event['x'], event['y'])
+                 if self.anchors is not None else None)
+        match = mouseScreenshotFinder.find_click_position(
+            icon_path=event.get('screenshot', ''),
+            screenshot_path=screenshot_path,
+            click_x=event['x'],
+            click_y=event['y'],
+            hints=hints
+        )
+        click = dict(mouseScreenshotFinder.last_stats)
+        click['capture_ms'] = round(capture_ms, 3)
+        click['offset'] = None
+        return match, click
+
+    def press_click(self, event: Dict[str, Any], match: Optional[Tuple[int, int, int, int, float]],
+                    click: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        """
+        Presses the button at the located position. Returns the offset to the recorded
+        position (applied to moves until the release), None if nothing was pressed.
+        Either way the click counts as done for step mode.
+        """
+        if match is None:
+            print(f"Could not find click position for {event.get('screenshot')} at ({event['x']}, {event['y']})")
+            # a missed click still ends a step
+            self.control.click_done()
+            return None
+        offset = (match[0] - event['x'], match[1] - event['y'])
+        click['offset'] = list(offset)
+        if self.anchors is not None and event.get('screenshot'):
+            self.anchors.update(event['screenshot'], match[0], match[1], event['x'], event['y'],
+                                scale=click.get('scale'), confidence=match[-1],
+                                stage=click.get('stage'))
+        if offset != (0, 0):
+            print(f"Click position adjusted from ({event['x']}, {event['y']}) to {match[0]}, {match[1]}")
+        print(f"Click position found: {match}")
+        self.backend.move(match[0], match[1])
+        self.backend.mouse_press(event['btn'])
+        self.control.click_done()
+        return offset
+
+    def release_click(self, event: Dict[str, Any], offset: Tuple[int, int]) -> None:
+        event['x'] += offset[0]
+        event['y'] += offset[1]
+        print("offset", offset)
+        print(f"Releasing mouse button at ({event['x']}, {event['y']})")
+        self.backend.mouse_release(event['btn'])
+
+    def needs_location(self, event: Dict[str, Any]) -> bool:
+        """True for a recorded button press: its locate_click result is passed to apply_event."""
+        return event['type'] == 'press' and self.is_click(event)
+
+    def apply_event(self, event: Dict[str, Any], offset: Tuple[int, int],
+                    located: Optional[Tuple[Optional[Tuple[int, int, int, int, float]], Dict[str, Any]]] = None
+                    ) -> Tuple[Tuple[int, int], Optional[Dict[str, Any]]]:
+        """
+        Replays one keyboard/button event, shared by replay() and the asyncio engine.
+        offset: offset of the held button. located: (match, click stats) of a press, see
+        needs_location. Returns the new offset and the click stats for telemetry.
+        """
+        click = None
+        if event['type'] in ('press', 'release'):
+            print(f"Replaying event: {event}")
+            #For keyboard events
+            if 'key' in event:
+                self.apply_key(event)
+            #For mouse button events
+            elif self.is_click(event):
+                if event['type'] == 'press':
+                    match, click = located
+                    # an abort ends the search early, nothing is pressed then
+                    if not self.control.aborted:
+                        pressed = self.press_click(event, match, click)
+                        if pressed is not None and pressed != (0, 0):
+                            offset = pressed
+                elif event['type'] == 'release':
+                    self.release_click(event, offset)
+                    offset = (0, 0)
+        return offset, click
+
     def replay(self, start_time: float, first_event_time: float):
-        global mouseEventOffset
         for event in self.events:
             target_time = event['time'] - first_event_time
-            now = time.perf_counter() - start_time
-            sleep_time = max(0, target_time - now)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            if event['type'] in ('press', 'release'):
-                print(f"Replaying event: {event}")
-                #For keyboard events
-                if 'key' in event: 
-                    if event['type'] == 'press':
-                        self.keyboard.press(event['key'])
-                    elif event['type'] == 'release':
-                        self.keyboard.release(event['key'])
-                #For mouse button events
-                elif 'btn' in event and event['btn'] is not None and event['x'] is not None and event['y'] is not None:
-                    mouseScreenshotFinder = MouseScreenshotFinder()
-                    if event['type'] == 'press':
-                        match = mouseScreenshotFinder.find_click_position(
-                            icon_path=event.get('screenshot', ''),
-                            screenshot_path=self._take_screenshot(),
-                            click_x=event['x'],
-                            click_y=event['y']
-                        )
-                        if match is not None:
-                            if match[0] != event['x'] or match[1] != event['y']:
-                                print(f"Click position adjusted from ({event['x']}, {event['y']}) to {match[0]}, {match[1]}")
-                                set_mouse_event_offset((match[0] - event['x'], match[1] - event['y']))
-                            print(f"Click position found: {match}")
-                            self.mouse.position = (match[0], match[1])
-                            self.mouse.press(event['btn'])
-                        else:
-                            ValueError(f"Could not find click position for {event['screenshot']} at ({event['x']}, {event['y']})")
-                    elif event['type'] == 'release':
-                        offset = get_mouse_event_offset()
-                        event['x'] += offset[0]
-                        event['y'] += offset[1]
-                        print("offset", offset)
-                        print(f"Releasing mouse button at ({event['x']}, {event['y']})")
-                        self.mouse.release(event['btn'])
-                        set_mouse_event_offset((0, 0))
+            if not self.control.wait_until(start_time, target_time):
+                return
+            located = self.locate_click(event) if self.needs_location(event) else None
+            offset, click = self.apply_event(event, get_mouse_event_offset(), located)
+            set_mouse_event_offset(offset)
+            if self.telemetry is not None:
+                self.telemetry.record_event('keyboard', event, target_time,
+                                            self.control.elapsed(start_time), click=click)
 
 class MouseScreenshotFinder:
     CONFIDENCE_THRESHOLD = CONFIDENCE_THRESHOLD
     MAX_ATTEMPTS = MAX_ATTEMPTS
     RETRY_DELAY = RETRY_DELAY # seconds
     SEARCH_REGION_SIZE = SEARCH_REGION_SIZE  # pixels (width/height of region around click)
+    INCREMENTAL_RETRY = INCREMENTAL_RETRY
 
-    def __init__(self, finder: Optional[ImageFinderClient] = None):
+    def __init__(self, finder: Optional[ImageFinderClient] = None, control: Optional[ReplayControl] = None,
+                 scale_tracker: Optional[SessionScaleTracker] = None, screen: Optional[ScreenSource] = None):
         self.finder = finder if finder is not None else ImageFinderClient()
+        self.control = control
+        self.scale_tracker = scale_tracker
+        # retries re-capture from here; without a screen they search the first screenshot again
+        self.screen = screen
+        # Outcome of the last find_click_position call (stage, attempts, match_ms, confidence)
+        self.last_stats: Dict[str, Any] = {}
+        self._calls_before: Dict[str, int] = {}
 
-    def find_click_position(self, icon_path: str, screenshot_path: str, click_x: int, click_y: int) -> Optional[Tuple[int, int, int, int, float]]:
+    def find_click_position(self, icon_path: str, screenshot_path: str, click_x: int, click_y: int,
+                            hints: Optional[List[Tuple[str, Tuple[int, int]]]] = None) -> Optional[Tuple[int, int, int, int, float]]:
+        """
+        hints: (stage name, position) pairs searched before the region around the recorded
+        click, e.g. the last known match position from the macro's AnchorStore.
+        """
         attempt = 0
-        screenshot = cv2.imread(screenshot_path)
-        if screenshot is None:
+        match_ms = 0.0
+        self.last_stats = {'stage': None, 'attempts': 0, 'match_ms': 0.0, 'confidence': None}
+        self._calls_before = self.finder.stats()
+        # load both images once, region and full search share the frame's grayscale conversion
+        try:
+            frame = ScreenFrame.from_path(screenshot_path)
+            template = self.finder.load_template(icon_path)
+        except (OSError, ValueError):
             print("Could not load screenshot.")
             return None
-        h, w = screenshot.shape[:2]
-        # Define region around click
-        region_x = max(0, click_x - self.SEARCH_REGION_SIZE // 2)
-        region_y = max(0, click_y - self.SEARCH_REGION_SIZE // 2)
-        region_w = min(self.SEARCH_REGION_SIZE, w - region_x)
-        region_h = min(self.SEARCH_REGION_SIZE, h - region_y)
-        region = (region_x, region_y, region_w, region_h)
+        regions = [(stage, self._region_around(x, y, frame.width, frame.height)) for stage, (x, y) in (hints or [])]
+        regions.append(('region', self._region_around(click_x, click_y, frame.width, frame.height)))
 
+        match = None
+        # retries re-capture the screen and only search where it changed since the missed attempt
+        incremental = self.INCREMENTAL_RETRY and self.screen is not None
+        search = self._search_incremental if incremental else self._search
         while attempt < self.MAX_ATTEMPTS:
-            # 1. Try small region
-            print(icon_path, screenshot_path, region)
-            match = self.finder.run(icon_path, screenshot_path, region=region, output_path="" )
-            if match is not None and match[-1] >= self.CONFIDENCE_THRESHOLD:
-                print(f"Found match in region on attempt {attempt+1} with confidence {match[-1]:.2f}")
-                print(f"Match details: {match}")
-                return match
+            if attempt > 0 and self.screen is not None:
+                # the screen may have changed while waiting
+                frame = ScreenFrame(self.screen.grab())
+            # 1. Try small regions, known positions first
+            for stage, region in regions:
+                print(icon_path, screenshot_path, stage, region)
+                search_start = time.perf_counter()
+                match = search(template, frame, region)
+                match_ms += (time.perf_counter() - search_start) * 1000.0
+                if match is not None and match[-1] >= self.CONFIDENCE_THRESHOLD:
+                    print(f"Found match in {stage} region on attempt {attempt+1} with confidence {match[-1]:.2f}")
+                    print(f"Match details: {match}")
+                    self._set_stats(stage, attempt + 1, match_ms, match, template)
+                    self._finish(incremental)
+                    return match
             # 2. Try whole screenshot
-            match = self.finder.run(icon_path, screenshot_path, region=None,  output_path="")
+            search_start = time.perf_counter()
+            match = search(template, frame, None)
+            match_ms += (time.perf_counter() - search_start) * 1000.0
             if match is not None and match[-1] >= self.CONFIDENCE_THRESHOLD:
                 print(f"Found match in full screenshot on attempt {attempt+1} with confidence {match[-1]:.2f}")
                 print(f"Match details: {match}")
+                self._set_stats('full', attempt + 1, match_ms, match, template)
+                self._finish(incremental)
                 return match
             # 3. Wait and retry
             print(f"No confident match found on attempt {attempt+1}. Retrying in {self.RETRY_DELAY}s...")
             attempt += 1
-            time.sleep(self.RETRY_DELAY)
+            if self.control is not None:
+                if not self.control.sleep(self.RETRY_DELAY):
+                    break
+            else:
+                time.sleep(self.RETRY_DELAY)
         print("Aborted: No match found after maximum attempts.")
+        self._set_stats(None, attempt, match_ms, match, template)
+        self._finish(incremental)
         return None
 
+    def _finish(self, incremental: bool) -> None:
+        if incremental:
+            # kept captures are only useful while polling for this click
+            self.finder.incremental.clear()
+
+    def _region_around(self, x: int, y: int, width: int, height: int) -> Tuple[int, int, int, int]:
+        region_x = min(max(0, x - self.SEARCH_REGION_SIZE // 2), max(0, width - 1))
+        region_y = min(max(0, y - self.SEARCH_REGION_SIZE // 2), max(0, height - 1))
+        return (region_x, region_y, min(self.SEARCH_REGION_SIZE, width - region_x),
+                min(self.SEARCH_REGION_SIZE, height - region_y))
+
+    def _search(self, template: Template, frame: ScreenFrame,
+                region: Optional[Tuple[int, int, int, int]]) -> Optional[Tuple[int, int, int, int, float]]:
+        """Tries the learned session scale and its neighbours first, then the full scale sweep."""
+        tracker = self.scale_tracker
+        scales = tracker.candidate_scales() if tracker is not None else None
+        narrowed = None
+        if scales is not None:
+            narrowed = self.finder.find_array(template, frame, region=region, scales=scales)
+            if narrowed is not None and narrowed[-1] >= SCALE_NARROW_ACCEPT:
+                tracker.observe(narrowed[2] / template.width)
+                return narrowed
+        match = self.finder.find_array(template, frame, region=region)
+        if narrowed is not None and (match is None or narrowed[-1] >= match[-1]):
+            match = narrowed
+        if tracker is not None and match is not None and match[-1] >= self.CONFIDENCE_THRESHOLD:
+            if scales is not None and match is not narrowed:
+                # the best match is not at the locked scale
+                tracker.miss()
+            tracker.observe(match[2] / template.width)
+        return match
+
+    def _search_incremental(self, template: Template, frame: ScreenFrame,
+                            region: Optional[Tuple[int, int, int, int]]) -> Optional[Tuple[int, int, int, int, float]]:
+        """_search on the first capture; after a miss only around the tiles that changed since."""
+        return self.finder.find_incremental(template, frame, region=region, accept=self.CONFIDENCE_THRESHOLD,
+                                            search=lambda r: self._search(template, frame, r))
+
+    def _set_stats(self, stage: Optional[str], attempts: int, match_ms: float,
+                   match: Optional[Tuple[int, int, int, int, float]], template: Optional[Template] = None) -> None:
+        self.last_stats = {
+            'stage': stage,
+            'attempts': attempts,
+            'match_ms': round(match_ms, 3),
+            'confidence': round(float(match[-1]), 4) if match is not None else None,
+        }
+        if stage is not None and match is not None and template is not None:
+            self.last_stats['scale'] = round(match[2] / template.width, 4)
+        # matchTemplate calls and result cache hits of this click
+        for name, count in self.finder.stats().items():
+            self.last_stats[name] = count - self._calls_before.get(name, 0)
+        if self.scale_tracker is not None:
+            self.last_stats['scale_locked'] = self.scale_tracker.scale
+
 class MacroReplayManager:
-    def __init__(self, mouse_log: str = MOUSE_LOG, actions_log: str = ACTIONS_LOG):
-        self.mouse_replay = MouseReplay(mouse_log)
-        self.keyboard_replay = KeyboardReplay(actions_log)
-        
-    def replay_all(self):
-        all_events = sorted(
-            self.mouse_replay.events + self.keyboard_replay.events,
-            key=lambda e: e['time']
+    def __init__(self, mouse_log: str = MOUSE_LOG, actions_log: str = ACTIONS_LOG, results_dir: Optional[str] = RESULTS_DIR,
+                 backend: Optional[InputBackend] = None, screen: Optional[ScreenSource] = None,
+                 finder: Optional[ImageFinderClient] = None, plan: Optional[ReplayPlan] = None,
+                 streaming: Optional[bool] = None, control: Optional[ReplayControl] = None,
+                 macro_dir: Optional[str] = None):
+        # One backend for both streams so injected calls share one timeline;
+        # the tracking wrapper lets an abort release whatever is still held.
+        self.backend = TrackingInputBackend(backend if backend is not None else default_input_backend())
+        self.control = control if control is not None else ReplayControl()
+        self.control.on_abort(self.backend.release_all)
+        self.telemetry = ReplayTelemetry(results_dir)
+        self.plan = plan
+        if streaming is None:
+            streaming = plan is None and self.is_large_log(mouse_log)
+        mouse_events = plan.mouse_events() if plan is not None else None
+        keyboard_events = (plan.keyboard_events(KeyParser.parse_key, KeyParser.parse_mouse_button)
+                           if plan is not None else None)
+        self.mouse_replay = MouseReplay(mouse_log, telemetry=self.telemetry, backend=self.backend,
+                                        events=mouse_events, streaming=streaming, control=self.control)
+        screen = screen if screen is not None else default_screen_source()
+        self.scale_tracker = self._create_scale_tracker(screen, macro_dir) if SCALE_TRACKING else None
+        self.anchors = AnchorStore(os.path.join(macro_dir, ANCHORS_FILE) if macro_dir else None) if ANCHORS else None
+        self.keyboard_replay = KeyboardReplay(actions_log, telemetry=self.telemetry, backend=self.backend,
+                                              screen=screen, finder=finder, events=keyboard_events,
+                                              control=self.control, scale_tracker=self.scale_tracker,
+                                              anchors=self.anchors)
+
+    @classmethod
+    def from_plan_cache(cls, mouse_log: str = MOUSE_LOG, actions_log: str = ACTIONS_LOG,
+                        screenshots_dir: str = SCREENSHOTS_DIR, cache_path: Optional[str] = PLAN_CACHE,
+                        **kwargs) -> "MacroReplayManager":
+        """
+        Replays from the compiled plan, recompiling only when logs or screenshots changed.
+        Huge mouse logs skip the plan and are streamed instead.
+        """
+        if cls.is_large_log(mouse_log):
+            print(f"{mouse_log} is large, streaming events instead of compiling a plan.")
+            return cls(mouse_log, actions_log, streaming=True, **kwargs)
+        plan = ReplayPlan.load_or_compile(mouse_log, actions_log, screenshots_dir, cache_path)
+        return cls(mouse_log, actions_log, plan=plan, **kwargs)
+
+    @staticmethod
+    def _create_scale_tracker(screen: ScreenSource, macro_dir: Optional[str]) -> SessionScaleTracker:
+        """Session scale tracker, persisted in the macro dir per machine and screen size."""
+        try:
+            key = machine_key(screen.size())
+        except Exception:
+            key = machine_key()
+        profile = os.path.join(macro_dir, SCALE_PROFILE) if macro_dir else None
+        return SessionScaleTracker(profile, key=key)
+
+    @staticmethod
+    def is_large_log(path: str) -> bool:
+        try:
+            return os.path.getsize(path) >= STREAM_THRESHOLD_BYTES
+        except OSError:
+            return False
+
+    def first_event_time(self) -> Optional[float]:
+        if self.plan is not None:
+            # plan is already merged and sorted
+            return self.plan.first_event_time
+        if self.mouse_replay.streaming:
+            # both logs are chronological, so the first lines are enough
+            candidates = [t for t in (self.mouse_replay.first_event_time(),
+                                      self.keyboard_replay.events[0]['time'] if self.keyboard_replay.events else None)
+                          if t is not None]
+            return min(candidates) if candidates else None
+        return min(
+            (e['time'] for e in self.mouse_replay.events + self.keyboard_replay.events),
+            default=None
         )
-        if not all_events:
+
+    def replay_all(self):
+        first_event_time = self.first_event_time()
+        if first_event_time is None:
             print("No events to replay.")
+            self.telemetry.close()
             return
-        first_event_time = all_events[0]['time']
         start_time = time.perf_counter()
 
         mouse_thread = threading.Thread(
@@ -254,7 +585,32 @@ class MacroReplayManager:
             target=self.keyboard_replay.replay, args=(start_time, first_event_time)
         )
 
-        print(f"Replaying {len(self.mouse_replay.events)} mouse events and {len(self.keyboard_replay.events)} keyboard events...")
+        if self.mouse_replay.streaming:
+            print(f"Replaying streamed mouse events and {len(self.keyboard_replay.events)} keyboard events...")
+        else:
+            print(f"Replaying {len(self.mouse_replay.events)} mouse events and {len(self.keyboard_replay.events)} keyboard events...")
         mouse_thread.start()
         keyboard_thread.start()
+        mouse_thread.join()
+        keyboard_thread.join()
+        self.finish_replay()
+
+    def finish_replay(self) -> Optional[Dict[str, Any]]:
+        """Releases leftovers of an abort, persists learned state and writes the telemetry."""
+        if self.control.aborted:
+            # a stream may have pressed something while the abort was being handled
+            self.backend.release_all()
+            self.telemetry.set_extra("aborted", True)
+        if self.scale_tracker is not None:
+            self.scale_tracker.save()
+            self.telemetry.set_extra("display_scale", self.scale_tracker.stats())
+        finder_stats = self.keyboard_replay.finder.stats()
+        lookups = finder_stats["cache_hits"] + finder_stats["cache_misses"]
+        finder_stats["cache_hit_rate"] = round(finder_stats["cache_hits"] / lookups, 3) if lookups else None
+        self.telemetry.set_extra("finder", finder_stats)
+        if self.anchors is not None:
+            self.anchors.save()
+            self.telemetry.set_extra("anchors", self.anchors.stats())
+        summary = self.telemetry.close()
         print("Replay finished.")
+        return summary
@@ -0,0 +1,89 @@
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from config import SCHEDULE_ALPHA
+
+# one grid cell: (scale, cv2 method)
+Cell = Tuple[float, int]
+
+# float rounding of OpenCV's scores (near-flat windows score 0 in TM_CCOEFF_NORMED)
+_BOUND_SLACK = 1e-3
+
+
+def cell_bound(templ: np.ndarray, method: int, ccoeff_max: Optional[float]) -> float:
+    """
+    Upper bound of the raw score of a grid cell. A TM_CCORR_NORMED window score is
+    (r |T'| |I'| + n mean(T) mean(I)) / (|T| |I|), r its TM_CCOEFF_NORMED score and T', I'
+    the mean-free template and window; by Cauchy-Schwarz it is at most
+    sqrt(r^2 |T'|^2 + n mean(T)^2) / |T|. So ccoeff_max, the TM_CCOEFF_NORMED maximum of the
+    same template over the same area, bounds the whole cell. Without it the bound is 1.
+    """
+    if method != cv2.TM_CCORR_NORMED or ccoeff_max is None:
+        return 1.0
+    t = templ.astype(np.float64)
+    mean = t.mean()
+    norm = float((t * t).sum())
+    if norm <= 0:
+        return 0.0
+    centred = float(((t - mean) ** 2).sum())
+    r = max(ccoeff_max, 0.0)
+    return min(1.0, float(np.sqrt((r * r * centred + t.size * mean * mean) / norm)) + _BOUND_SLACK)
+
+
+class MatchSchedule:
+    """
+    Order of the scale x method grid, learned from the scores each cell reached in
+    earlier searches (exponential moving average). Unseen cells are ranked by their
+    method weight and distance to scale 1.0, so an unscaled screen is tried first.
+
+    The finder runs cells best-first, so the early exit usually fires after the first
+    call, and skips cells whose upper bound (method weight x cell_bound) can't beat the
+    best score so far. Counters report the matchTemplate calls made, avoided by the early
+    exit and avoided by the bound.
+    """
+
+    def __init__(self, alpha: float = SCHEDULE_ALPHA):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._scores: Dict[Cell, float] = {}
+        self.calls = 0
+        self.avoided = 0
+        self.bounded = 0
+
+    def expected(self, cell: Cell, weight: float) -> float:
+        score = self._scores.get(cell)
+        if score is None:
+            return weight * (1.0 - abs(cell[0] - 1.0))
+        return score
+
+    def order(self, cells: Sequence[Cell], weights: Sequence[float], early_exit: Optional[float] = None) -> List[int]:
+        """
+        Indices into cells, most promising first; ties keep the grid order. Cells whose weight
+        is below early_exit can't stop the search, they go last: by then their bound is known
+        from the other method at the same scale and the best score is as high as it gets.
+        """
+        with self._lock:
+            keys = [self.expected(cell, weight) for cell, weight in zip(cells, weights)]
+        late = [early_exit is not None and weight < early_exit for weight in weights]
+        return sorted(range(len(cells)), key=lambda i: (late[i], -keys[i], i))
+
+    def observe(self, cell: Cell, confidence: float) -> None:
+        with self._lock:
+            previous = self._scores.get(cell)
+            self._scores[cell] = confidence if previous is None else previous + self.alpha * (confidence - previous)
+            self.calls += 1
+
+    def skip(self, count: int = 1) -> None:
+        with self._lock:
+            self.avoided += count
+
+    def prune(self, count: int = 1) -> None:
+        with self._lock:
+            self.bounded += count
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"match_calls": self.calls, "match_calls_avoided": self.avoided, "match_calls_bounded": self.bounded}
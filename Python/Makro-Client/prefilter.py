@@ -0,0 +1,165 @@
+import threading
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import PREFILTER_TILE, PREFILTER_FLAT_STD, PREFILTER_MIN_PRUNED
+
+# rect of match positions (x0, y0, x1, y1), top-left corners of template windows
+Rect = Tuple[int, int, int, int]
+
+
+class TilePlan:
+    """
+    Which match positions of one template size still need matchTemplate. Positions are
+    grouped in tiles; a tile whose windows only cover flat pixels has known scores.
+    """
+
+    def __init__(self, positions: int, pruned: int, live: List[Rect], flat_loc: Optional[Tuple[int, int]],
+                 lit_loc: Optional[Tuple[int, int]]):
+        self.positions = positions
+        self.pruned = pruned
+        self.live = live
+        # first flat position in raster order, and the first one that is not black
+        self.flat_loc = flat_loc
+        self.lit_loc = lit_loc
+
+    @property
+    def pruned_fraction(self) -> float:
+        return self.pruned / self.positions if self.positions else 0.0
+
+
+def flat_score(templ: np.ndarray, method: int) -> float:
+    """
+    Exact score of templ against a constant, non-black window: TM_CCOEFF_NORMED is 0
+    (OpenCV's result for a zero-variance window), TM_CCORR_NORMED is sum(T) / (|T| sqrt(n)).
+    Both methods score 0 on black windows.
+    """
+    if method == cv2.TM_CCORR_NORMED:
+        t = templ.astype(np.float64)
+        norm = float(np.sqrt((t * t).sum()))
+        return float(t.sum()) / (norm * np.sqrt(t.size)) if norm > 0 else 0.0
+    return 0.0
+
+
+class TilePrefilter:
+    """
+    Statistical pre-rejection for the scale x method grid. From the search area's sum
+    and squared-sum integral images (computed once per screenshot region), the pixel span
+    covered by all windows of a tile of match positions is checked in O(1): centred
+    energy is monotone in the region, so a span with standard deviation at most
+    PREFILTER_FLAT_STD makes every window of the tile flat. For those windows the scores
+    are known without correlating (see flat_score), so only the remaining tiles, merged
+    into blocks, are passed to matchTemplate with a template-sized margin. A scale whose
+    tiles are all flat needs no matchTemplate call at all.
+
+    PREFILTER_FLAT_STD = 0 prunes exactly constant spans only and leaves results unchanged;
+    larger values also treat near-flat windows as non-matches. Textured windows are never
+    pruned, so the plan only pays on screens with large solid areas (off by default, see config).
+    """
+
+    def __init__(self, tile: int = PREFILTER_TILE, flat_std: float = PREFILTER_FLAT_STD,
+                 min_pruned: float = PREFILTER_MIN_PRUNED):
+        self.tile = tile
+        self.flat_std = flat_std
+        self.min_pruned = min_pruned
+        self._lock = threading.Lock()
+        self.positions = 0
+        self.pruned = 0
+
+    def plan(self, integrals: Tuple[np.ndarray, np.ndarray], shape: Tuple[int, int],
+             th: int, tw: int) -> Optional[TilePlan]:
+        """Tile plan for a th x tw template on a search area of shape, None if nothing worth pruning."""
+        h, w = shape[:2]
+        rh, rw = h - th + 1, w - tw + 1
+        if rh <= 0 or rw <= 0:
+            return None
+        s = self.tile
+        ys = np.arange(0, rh, s)
+        xs = np.arange(0, rw, s)
+        ye = np.minimum(ys + s, rh)
+        xe = np.minimum(xs + s, rw)
+        # pixel span of all windows starting in the tile
+        ya, yb = ys[:, None], (ye + th - 1)[:, None]
+        xa, xb = xs[None, :], (xe + tw - 1)[None, :]
+        total, squares = integrals
+        s1 = total[yb, xb] - total[ya, xb] - total[yb, xa] + total[ya, xa]
+        s2 = squares[yb, xb] - squares[ya, xb] - squares[yb, xa] + squares[ya, xa]
+        n = (yb - ya) * (xb - xa)
+        energy = s2 - s1 * s1 / n
+        # float64 sums of 8-bit pixels: allow rounding noise well below one grey level
+        flat = energy <= n * (self.flat_std ** 2) + 1e-6 * n
+        counts = (ye - ys)[:, None] * (xe - xs)[None, :]
+        positions = rh * rw
+        pruned = int(counts[flat].sum())
+        used = pruned >= self.min_pruned * positions
+        with self._lock:
+            self.positions += positions
+            self.pruned += pruned if used else 0
+        if not used:
+            return None
+        flat_loc = lit_loc = None
+        if pruned:
+            i, j = np.argwhere(flat)[0]
+            flat_loc = (int(xs[j]), int(ys[i]))
+            lit = np.argwhere(flat & (s1 > 0))
+            if len(lit):
+                i, j = lit[0]
+                lit_loc = (int(xs[j]), int(ys[i]))
+        live = [(int(xs[c0]), int(ys[r0]), int(xe[c1 - 1]), int(ye[r1 - 1]))
+                for r0, r1, c0, c1 in self._blocks(~flat, -(-tw // s))]
+        return TilePlan(positions, pruned, live, flat_loc, lit_loc)
+
+    @staticmethod
+    def _blocks(live: np.ndarray, bridge: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Live tiles as blocks (row0, row1, col0, col1) in tile units: runs per tile row, gaps
+        of fewer than bridge tiles closed (each block re-reads a template-sized margin),
+        then runs with the same columns in consecutive rows stacked into one block.
+        """
+        blocks: List[List[int]] = []
+        open_blocks = {}
+        for r, row in enumerate(live):
+            cols = np.flatnonzero(row)
+            runs = []
+            for c in cols:
+                if runs and c - runs[-1][1] <= bridge:
+                    runs[-1][1] = c + 1
+                else:
+                    runs.append([c, c + 1])
+            still_open = {}
+            for c0, c1 in runs:
+                block = open_blocks.get((c0, c1))
+                if block is not None and block[1] == r:
+                    block[1] = r + 1
+                else:
+                    block = [r, r + 1, c0, c1]
+                    blocks.append(block)
+                still_open[(c0, c1)] = block
+            open_blocks = still_open
+        return [tuple(b) for b in blocks]
+
+    @staticmethod
+    def match(search_area: np.ndarray, templ: np.ndarray, method: int,
+              plan: TilePlan) -> Tuple[float, Tuple[int, int]]:
+        """(max score, location) over the live blocks and the flat tiles, like minMaxLoc on the full response."""
+        th, tw = templ.shape[:2]
+        best = None
+        for x0, y0, x1, y1 in plan.live:
+            window = search_area[y0:y1 + th - 1, x0:x1 + tw - 1]
+            _, max_val, _, (lx, ly) = cv2.minMaxLoc(cv2.matchTemplate(window, templ, method))
+            candidate = (float(max_val), -(y0 + ly), -(x0 + lx))
+            if best is None or candidate > best:
+                best = candidate
+        # flat windows all score the same; ties keep the first position in raster order
+        for score, loc in ((0.0, plan.flat_loc), (flat_score(templ, method), plan.lit_loc)):
+            if loc is not None:
+                candidate = (score, -loc[1], -loc[0])
+                if best is None or candidate > best:
+                    best = candidate
+        return best[0], (-best[2], -best[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"prefilter_positions": self.positions, "prefilter_pruned": self.pruned}
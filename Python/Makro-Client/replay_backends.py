@@ -0,0 +1,260 @@
+import time
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    from pynput.mouse import Controller as MouseController, Button
+    from pynput.keyboard import Controller as KeyboardController, Key
+except Exception:
+    # headless/CI: without pynput, KeyParser returns the raw key strings
+    MouseController = KeyboardController = Button = Key = None
+
+try:
+    import pyautogui
+except Exception:
+    pyautogui = None
+
+
+class InputBackend:
+    """Interface for everything the replay injects into the OS."""
+
+    def move(self, x: int, y: int) -> None:
+        raise NotImplementedError
+
+    def scroll(self, x: int, y: int, dx: int, dy: int) -> None:
+        raise NotImplementedError
+
+    def mouse_press(self, button: Any) -> None:
+        raise NotImplementedError
+
+    def mouse_release(self, button: Any) -> None:
+        raise NotImplementedError
+
+    def key_press(self, key: Any) -> None:
+        raise NotImplementedError
+
+    def key_release(self, key: Any) -> None:
+        raise NotImplementedError
+
+
+class PynputInputBackend(InputBackend):
+    """Real input via pynput controllers."""
+
+    def __init__(self):
+        if MouseController is None or KeyboardController is None:
+            raise RuntimeError("pynput is not available (headless environment?)")
+        self.mouse = MouseController()
+        self.keyboard = KeyboardController()
+
+    def move(self, x: int, y: int) -> None:
+        self.mouse.position = (x, y)
+
+    def scroll(self, x: int, y: int, dx: int, dy: int) -> None:
+        self.mouse.position = (x, y)
+        self.mouse.scroll(dx, dy)
+
+    def mouse_press(self, button: Any) -> None:
+        self.mouse.press(button)
+
+    def mouse_release(self, button: Any) -> None:
+        self.mouse.release(button)
+
+    def key_press(self, key: Any) -> None:
+        self.keyboard.press(key)
+
+    def key_release(self, key: Any) -> None:
+        self.keyboard.release(key)
+
+
+class RecordingInputBackend(InputBackend):
+    """
+    Fake backend that only logs the injected calls.
+    calls: list of (perf_counter timestamp, call name, args)
+    """
+
+    def __init__(self):
+        self.calls: List[Tuple[float, str, Tuple[Any, ...]]] = []
+        self.position: Tuple[int, int] = (0, 0)
+
+    def _log(self, name: str, *args: Any) -> None:
+        self.calls.append((time.perf_counter(), name, args))
+
+    def move(self, x: int, y: int) -> None:
+        self.position = (x, y)
+        self._log('move', x, y)
+
+    def scroll(self, x: int, y: int, dx: int, dy: int) -> None:
+        self.position = (x, y)
+        self._log('scroll', x, y, dx, dy)
+
+    def mouse_press(self, button: Any) -> None:
+        self._log('mouse_press', button)
+
+    def mouse_release(self, button: Any) -> None:
+        self._log('mouse_release', button)
+
+    def key_press(self, key: Any) -> None:
+        self._log('key_press', key)
+
+    def key_release(self, key: Any) -> None:
+        self._log('key_release', key)
+
+
+class TrackingInputBackend(InputBackend):
+    """
+    Wraps another backend and remembers which keys and buttons are currently held,
+    so an aborted replay can release them instead of leaving them pressed.
+    """
+
+    def __init__(self, inner: InputBackend):
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._keys: List[Any] = []
+        self._buttons: List[Any] = []
+
+    def move(self, x: int, y: int) -> None:
+        self.inner.move(x, y)
+
+    def scroll(self, x: int, y: int, dx: int, dy: int) -> None:
+        self.inner.scroll(x, y, dx, dy)
+
+    def mouse_press(self, button: Any) -> None:
+        self.inner.mouse_press(button)
+        with self._lock:
+            self._buttons.append(button)
+
+    def mouse_release(self, button: Any) -> None:
+        self.inner.mouse_release(button)
+        with self._lock:
+            if button in self._buttons:
+                self._buttons.remove(button)
+
+    def key_press(self, key: Any) -> None:
+        self.inner.key_press(key)
+        with self._lock:
+            self._keys.append(key)
+
+    def key_release(self, key: Any) -> None:
+        self.inner.key_release(key)
+        with self._lock:
+            if key in self._keys:
+                self._keys.remove(key)
+
+    def release_all(self) -> None:
+        with self._lock:
+            keys, self._keys = self._keys, []
+            buttons, self._buttons = self._buttons, []
+        for key in reversed(keys):
+            try:
+                self.inner.key_release(key)
+            except Exception as e:
+                print(f"Could not release key {key}: {e}")
+        for button in reversed(buttons):
+            try:
+                self.inner.mouse_release(button)
+            except Exception as e:
+                print(f"Could not release button {button}: {e}")
+        if keys or buttons:
+            print(f"Released {len(keys)} held keys and {len(buttons)} held buttons.")
+
+
+class ScreenSource:
+    """Interface for screen capture used before every click search."""
+
+    def grab(self) -> np.ndarray:
+        """Current screen as BGR array."""
+        raise NotImplementedError
+
+    def capture(self, path: str) -> str:
+        """Write the current screen to path and return it."""
+        cv2.imwrite(path, self.grab())
+        return path
+
+    def size(self) -> Tuple[int, int]:
+        """Screen (width, height)."""
+        h, w = self.grab().shape[:2]
+        return w, h
+
+
+class PyAutoGuiScreenSource(ScreenSource):
+    def __init__(self):
+        if pyautogui is None:
+            raise RuntimeError("pyautogui is not available (headless environment?)")
+
+    def grab(self) -> np.ndarray:
+        return cv2.cvtColor(np.array(pyautogui.screenshot()), cv2.COLOR_RGB2BGR)
+
+    def capture(self, path: str) -> str:
+        pyautogui.screenshot().save(path)
+        return path
+
+    def size(self) -> Tuple[int, int]:
+        w, h = pyautogui.size()
+        return int(w), int(h)
+
+
+class SyntheticScreenSource(ScreenSource):
+    """
+    Deterministic fake desktop: flat "windows" on a noisy background with
+    templates pasted at known positions. placements: (bgr_template, x, y)
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080, seed: int = 0,
+                 placements: Optional[Sequence[Tuple[np.ndarray, int, int]]] = None):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.placements = list(placements or [])
+        self._frame: Optional[np.ndarray] = None
+
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def place(self, template: np.ndarray, x: int, y: int) -> None:
+        self.placements.append((template, x, y))
+        self._frame = None
+
+    def grab(self) -> np.ndarray:
+        if self._frame is None:
+            self._frame = self._render()
+        return self._frame.copy()
+
+    def _render(self) -> np.ndarray:
+        rng = np.random.default_rng(self.seed)
+        frame = rng.integers(0, 40, size=(self.height, self.width, 3), dtype=np.uint8)
+        for _ in range(12):
+            w = int(rng.integers(self.width // 8, self.width // 2))
+            h = int(rng.integers(self.height // 8, self.height // 2))
+            x = int(rng.integers(0, self.width - w))
+            y = int(rng.integers(0, self.height - h))
+            color = tuple(int(c) for c in rng.integers(60, 230, size=3))
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, -1)
+            cv2.rectangle(frame, (x, y), (x + w, y + 24), tuple(c // 2 for c in color), -1)
+        for template, x, y in self.placements:
+            th, tw = template.shape[:2]
+            frame[y:y + th, x:x + tw] = template
+        return frame
+
+    @staticmethod
+    def make_icon(size: int = 32, seed: int = 0) -> np.ndarray:
+        """Random high-contrast icon usable as click template."""
+        rng = np.random.default_rng(seed)
+        icon = np.full((size, size, 3), 245, dtype=np.uint8)
+        for _ in range(6):
+            p1 = tuple(int(v) for v in rng.integers(0, size, size=2))
+            p2 = tuple(int(v) for v in rng.integers(0, size, size=2))
+            color = tuple(int(c) for c in rng.integers(0, 200, size=3))
+            cv2.rectangle(icon, p1, p2, color, -1)
+        cv2.circle(icon, (size // 2, size // 2), size // 4, (20, 20, 220), 2)
+        return icon
+
+
+def default_input_backend() -> InputBackend:
+    return PynputInputBackend()
+
+
+def default_screen_source() -> ScreenSource:
+    return PyAutoGuiScreenSource()
@@ -0,0 +1,194 @@
+import time
+import threading
+from typing import Callable, List, Optional, TextIO
+
+# Commands understood on the control channel (one per line)
+CMD_PAUSE = "pause"
+CMD_RESUME = "resume"
+CMD_STEP = "step"
+CMD_ABORT = "abort"
+
+
+class ReplayControl:
+    """
+    Shared run state of the replay streams: pause, resume, step-to-next-click and abort.
+
+    Waits block on a condition variable, so every command wakes the streams immediately
+    instead of after the current sleep. Time spent paused is taken out of the timeline,
+    so a resumed replay continues where it stopped.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._paused = False
+        self._aborted = False
+        self._step_pending = False
+        self._paused_total = 0.0
+        self._paused_since: Optional[float] = None
+        self._on_abort: List[Callable[[], None]] = []
+        self._listeners: List[Callable[[], None]] = []
+
+    # ---------------- state ----------------
+
+    @property
+    def paused(self) -> bool:
+        with self._cond:
+            return self._paused
+
+    @property
+    def aborted(self) -> bool:
+        with self._cond:
+            return self._aborted
+
+    def on_abort(self, callback: Callable[[], None]) -> None:
+        """Callback runs on the thread that issued the abort (e.g. release held keys)."""
+        self._on_abort.append(callback)
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Callback runs after every state change (used to wake non-threading waiters)."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # ---------------- commands ----------------
+
+    def pause(self) -> None:
+        with self._cond:
+            if not self._paused and not self._aborted:
+                self._paused = True
+                self._paused_since = time.perf_counter()
+                self._cond.notify_all()
+        self._notify()
+
+    def resume(self) -> None:
+        with self._cond:
+            self._step_pending = False
+            self._resume_locked()
+        self._notify()
+
+    def step(self) -> None:
+        """Run until the next click has been performed, then pause again."""
+        with self._cond:
+            self._step_pending = True
+            self._resume_locked()
+        self._notify()
+
+    def abort(self) -> None:
+        with self._cond:
+            if self._aborted:
+                return
+            self._aborted = True
+            self._resume_locked()
+        print("Replay aborted.")
+        for cb in self._on_abort:
+            try:
+                cb()
+            except Exception as e:
+                print(f"Abort callback failed: {e}")
+        self._notify()
+
+    def click_done(self) -> None:
+        """Called by the keyboard stream after a mouse button press was replayed."""
+        with self._cond:
+            step = self._step_pending
+            self._step_pending = False
+        if step:
+            self.pause()
+
+    def handle_command(self, line: str) -> bool:
+        cmd = line.strip().lower()
+        handlers = {CMD_PAUSE: self.pause, CMD_RESUME: self.resume, CMD_STEP: self.step, CMD_ABORT: self.abort}
+        handler = handlers.get(cmd)
+        if handler is None:
+            if cmd:
+                print(f"Unknown control command: {cmd}")
+            return False
+        handler()
+        return True
+
+    def _resume_locked(self) -> None:
+        if self._paused and self._paused_since is not None:
+            self._paused_total += time.perf_counter() - self._paused_since
+        self._paused = False
+        self._paused_since = None
+        self._cond.notify_all()
+
+    def _notify(self) -> None:
+        for cb in self._listeners:
+            try:
+                cb()
+            except Exception:
+                pass
+
+    # ---------------- waiting ----------------
+
+    def elapsed(self, start_time: float) -> float:
+        """Replay time since start_time, excluding time spent paused."""
+        with self._cond:
+            paused = self._paused_total
+            if self._paused_since is not None:
+                paused += time.perf_counter() - self._paused_since
+        return time.perf_counter() - start_time - paused
+
+    def time_left(self, start_time: float, target_time: float) -> Optional[float]:
+        """
+        Seconds until replay time reaches target_time, None while paused (the deadline
+        moves with the pause). Lets non-threading waiters build their own deadlines.
+        """
+        with self._cond:
+            if self._paused:
+                return None
+            return start_time + self._paused_total + target_time - time.perf_counter()
+
+    def wait_until(self, start_time: float, target_time: float) -> bool:
+        """
+        Blocks until replay time reaches target_time (seconds after start_time).
+        Returns False if the replay was aborted.
+        """
+        with self._cond:
+            while True:
+                if self._aborted:
+                    return False
+                if self._paused:
+                    self._cond.wait()
+                    continue
+                remaining = start_time + self._paused_total + target_time - time.perf_counter()
+                if remaining <= 0:
+                    return True
+                self._cond.wait(remaining)
+
+    def sleep(self, seconds: float) -> bool:
+        """Plain delay that ends early on abort. Returns False if aborted."""
+        deadline = time.perf_counter() + seconds
+        with self._cond:
+            while not self._aborted:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return True
+                self._cond.wait(remaining)
+        return False
+
+    # ---------------- IPC ----------------
+
+    def listen(self, stream: TextIO, abort_on_eof: bool = True) -> threading.Thread:
+        """
+        Reads commands line by line from stream (stdin pipe of the replay process).
+        EOF means the controlling process is gone, which aborts the replay by default.
+        """
+        def _reader():
+            while True:
+                try:
+                    line = stream.readline()
+                except (OSError, ValueError):
+                    line = ""
+                if not line:
+                    if abort_on_eof:
+                        self.abort()
+                    return
+                self.handle_command(line)
+
+        thread = threading.Thread(target=_reader, daemon=True)
+        thread.start()
+        return thread
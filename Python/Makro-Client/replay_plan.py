@@ -0,0 +1,261 @@
+import os
+import json
+import struct
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import ACTIONS_LOG, MOUSE_LOG, PLAN_CACHE, SCREENSHOTS_DIR
+
+PLAN_MAGIC = b"EONPLAN"
+PLAN_VERSION = 1
+
+# kind codes of the packed event records
+KIND_MOVE = 0
+KIND_SCROLL = 1
+KIND_KEY_PRESS = 2
+KIND_KEY_RELEASE = 3
+KIND_BTN_PRESS = 4
+KIND_BTN_RELEASE = 5
+
+# header: magic, version, input hash, event count, string table length
+_HEADER = struct.Struct("<7sB32sII")
+# record: kind, time, x, y, dx, dy, ref (key/button string), shot (screenshot string)
+_RECORD = struct.Struct("<Bdiiiiii")
+_NO_VALUE = -(2 ** 31)
+
+
+def referenced_templates(actions_log: str) -> List[str]:
+    """Distinct screenshot paths referenced by click events of the actions log, sorted."""
+    refs = set()
+    if not os.path.exists(actions_log):
+        return []
+    with open(actions_log, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if '"screenshot"' not in line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            shot = entry.get('screenshot') if isinstance(entry, dict) else None
+            if shot:
+                refs.add(shot)
+    return sorted(refs)
+
+
+def template_path(shot: str, screenshots_dir: str = SCREENSHOTS_DIR) -> str:
+    """The file a logged screenshot path refers to; falls back to its name inside screenshots_dir."""
+    if os.path.exists(shot):
+        return shot
+    return os.path.join(screenshots_dir, os.path.basename(shot.replace("\\", "/")))
+
+
+def inputs_hash(mouse_log: str, actions_log: str, screenshots_dir: str = SCREENSHOTS_DIR) -> bytes:
+    """
+    Content hash of both logs plus size/mtime of every template the actions log references.
+    Templates are stat-hashed so they don't have to be read. Other files in screenshots_dir
+    (e.g. the capture rewritten on every replay click) don't affect the hash.
+    """
+    h = hashlib.sha256()
+    for path in (mouse_log, actions_log):
+        h.update(path.encode("utf-8", "replace") + b"\0")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        h.update(b"\1")
+    for shot in referenced_templates(actions_log):
+        try:
+            st = os.stat(template_path(shot, screenshots_dir))
+            stamp = f"{st.st_size}:{st.st_mtime_ns}"
+        except OSError:
+            stamp = "missing"
+        h.update(f"{shot}:{stamp}\n".encode("utf-8", "replace"))
+    return h.digest()
+
+
+class ReplayPlan:
+    """
+    Validated, pre-sorted replay plan compiled from mouse_moves.log and actions(.fixed).log.
+
+    Events are kept as packed fixed-size records; keys, buttons and screenshot paths
+    are interned in a string table so every distinct key is resolved only once.
+    """
+
+    def __init__(self, records: List[Tuple], strings: List[str], digest: bytes = b"\0" * 32,
+                 warnings: Optional[List[str]] = None):
+        self.records = records
+        self.strings = strings
+        self.digest = digest
+        self.warnings = warnings or []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def first_event_time(self) -> Optional[float]:
+        return self.records[0][1] if self.records else None
+
+    # ---------------- compile ----------------
+
+    @classmethod
+    def compile(cls, mouse_log: str = MOUSE_LOG, actions_log: str = ACTIONS_LOG,
+                screenshots_dir: str = SCREENSHOTS_DIR, digest: Optional[bytes] = None) -> "ReplayPlan":
+        strings: List[str] = []
+        string_ids: Dict[str, int] = {}
+        warnings: List[str] = []
+
+        def intern(value: Optional[str]) -> int:
+            if not value:
+                return -1
+            idx = string_ids.get(value)
+            if idx is None:
+                idx = string_ids[value] = len(strings)
+                strings.append(value)
+            return idx
+
+        def as_int(value: Any) -> int:
+            return int(value) if value is not None else _NO_VALUE
+
+        keyed: List[Tuple[float, int, Tuple]] = []
+        for path, stream in ((mouse_log, 0), (actions_log, 1)):
+            for lineno, entry in _iter_entries(path, warnings):
+                t = entry.get('time')
+                etype = entry.get('type')
+                if not isinstance(t, (int, float)):
+                    warnings.append(f"{os.path.basename(path)}:{lineno}: missing time")
+                    continue
+                try:
+                    if stream == 0 and etype == 'move':
+                        rec = (KIND_MOVE, float(t), int(entry['x']), int(entry['y']), 0, 0, -1, -1)
+                    elif stream == 0 and etype == 'scroll':
+                        rec = (KIND_SCROLL, float(t), int(entry['x']), int(entry['y']),
+                               int(entry.get('dx', 0)), int(entry.get('dy', 0)), -1, -1)
+                    elif stream == 1 and etype in ('press', 'release'):
+                        key = entry['key']
+                        if key.startswith('mouse_Button.'):
+                            kind = KIND_BTN_PRESS if etype == 'press' else KIND_BTN_RELEASE
+                            shot = entry.get('screenshot')
+                            if kind == KIND_BTN_PRESS and shot and not os.path.exists(shot):
+                                warnings.append(f"{os.path.basename(path)}:{lineno}: template {shot} not found")
+                            rec = (kind, float(t), as_int(entry.get('x')), as_int(entry.get('y')), 0, 0,
+                                   intern(key), intern(shot))
+                        else:
+                            kind = KIND_KEY_PRESS if etype == 'press' else KIND_KEY_RELEASE
+                            rec = (kind, float(t), 0, 0, 0, 0, intern(key), -1)
+                    else:
+                        continue
+                except (KeyError, TypeError, ValueError) as e:
+                    warnings.append(f"{os.path.basename(path)}:{lineno}: invalid event ({e})")
+                    continue
+                keyed.append((rec[1], stream, rec))
+
+        # stable: equal timestamps keep log order, mouse stream before keyboard stream
+        keyed.sort(key=lambda k: (k[0], k[1]))
+        records = [rec for _, _, rec in keyed]
+        if digest is None:
+            digest = inputs_hash(mouse_log, actions_log, screenshots_dir)
+        return cls(records, strings, digest, warnings)
+
+    # ---------------- binary cache ----------------
+
+    def save(self, path: str) -> None:
+        table = json.dumps(self.strings, ensure_ascii=False).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(PLAN_MAGIC, PLAN_VERSION, self.digest, len(self.records), len(table)))
+            f.write(table)
+            f.write(b"".join(_RECORD.pack(*rec) for rec in self.records))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, expected_digest: Optional[bytes] = None) -> Optional["ReplayPlan"]:
+        """Returns None if the file is missing, corrupt or was built from other inputs."""
+        try:
+            with open(path, "rb") as f:
+                magic, version, digest, count, table_len = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != PLAN_MAGIC or version != PLAN_VERSION:
+                    return None
+                if expected_digest is not None and digest != expected_digest:
+                    return None
+                strings = json.loads(f.read(table_len).decode("utf-8"))
+                data = f.read(count * _RECORD.size)
+        except (OSError, struct.error, ValueError):
+            return None
+        if len(data) != count * _RECORD.size:
+            return None
+        return cls(list(_RECORD.iter_unpack(data)), strings, digest)
+
+    @classmethod
+    def load_or_compile(cls, mouse_log: str = MOUSE_LOG, actions_log: str = ACTIONS_LOG,
+                        screenshots_dir: str = SCREENSHOTS_DIR, cache_path: Optional[str] = PLAN_CACHE) -> "ReplayPlan":
+        digest = inputs_hash(mouse_log, actions_log, screenshots_dir)
+        if cache_path:
+            plan = cls.load(cache_path, expected_digest=digest)
+            if plan is not None:
+                print(f"Using cached replay plan {cache_path} ({len(plan)} events)")
+                return plan
+        plan = cls.compile(mouse_log, actions_log, screenshots_dir, digest=digest)
+        for w in plan.warnings[:20]:
+            print(f"Plan warning: {w}")
+        if cache_path:
+            try:
+                plan.save(cache_path)
+            except OSError as e:
+                print(f"Could not write replay plan cache: {e}")
+        return plan
+
+    # ---------------- materialize ----------------
+
+    def mouse_events(self) -> List[Dict[str, Any]]:
+        events = []
+        for kind, t, x, y, dx, dy, _, _ in self.records:
+            if kind == KIND_MOVE:
+                events.append({'type': 'move', 'x': x, 'y': y, 'time': t})
+            elif kind == KIND_SCROLL:
+                events.append({'type': 'scroll', 'x': x, 'y': y, 'dx': dx, 'dy': dy, 'time': t})
+        return events
+
+    def keyboard_events(self, parse_key: Callable[[str], Any],
+                        parse_button: Callable[[str], Any]) -> List[Dict[str, Any]]:
+        """Builds KeyboardReplay events; each distinct key/button string is parsed once."""
+        resolved: Dict[int, Any] = {}
+        events = []
+        for kind, t, x, y, _, _, ref, shot in self.records:
+            if kind in (KIND_KEY_PRESS, KIND_KEY_RELEASE):
+                if ref not in resolved:
+                    resolved[ref] = parse_key(self.strings[ref])
+                events.append({
+                    'type': 'press' if kind == KIND_KEY_PRESS else 'release',
+                    'key': resolved[ref],
+                    'time': t
+                })
+            elif kind in (KIND_BTN_PRESS, KIND_BTN_RELEASE):
+                if ref not in resolved:
+                    resolved[ref] = parse_button(self.strings[ref])
+                events.append({
+                    'type': 'press' if kind == KIND_BTN_PRESS else 'release',
+                    'btn': resolved[ref],
+                    'x': x if x != _NO_VALUE else None,
+                    'y': y if y != _NO_VALUE else None,
+                    'time': t,
+                    'screenshot': self.strings[shot] if shot >= 0 else None
+                })
+        return events
+
+
+def _iter_entries(path: str, warnings: List[str]):
+    if not os.path.exists(path):
+        warnings.append(f"{path} does not exist")
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                warnings.append(f"{os.path.basename(path)}:{lineno}: invalid JSON")
+                continue
+            if isinstance(entry, dict):
+                yield lineno, entry
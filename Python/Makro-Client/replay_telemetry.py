@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import threading
+from array import array
+from typing import Any, Dict, Optional, Sequence
+
+from config import RESULTS_DIR, TELEMETRY_ENABLED, TELEMETRY_PERCENTILES
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (q in 0..100), None for empty input."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    pos = (len(ordered) - 1) * (q / 100.0)
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    frac = pos - lower
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * frac
+
+
+class ReplayTelemetry:
+    """
+    Writes one JSONL telemetry stream per replay run into the macro's results folder.
+
+    Every replayed event becomes a line with planned vs actual time and lateness,
+    clicks additionally carry capture/match timings and the search outcome.
+    close() appends a summary line with p50/p95/p99 values.
+    """
+
+    def __init__(self, results_dir: Optional[str] = RESULTS_DIR, run_id: Optional[str] = None,
+                 enabled: bool = TELEMETRY_ENABLED):
+        self.run_id = run_id or self._default_run_id()
+        self.path: Optional[str] = None
+        self._fh = None
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._lateness_ms = array('d')
+        self._capture_ms = array('d')
+        self._match_ms = array('d')
+        self._confidence = array('d')
+        self._counts: Dict[str, int] = {}
+        self._stages: Dict[str, int] = {}
+        self._extra: Dict[str, Any] = {}
+        if not enabled or not results_dir:
+            return
+        try:
+            os.makedirs(results_dir, exist_ok=True)
+            self._fh = self._open_unique(results_dir)
+        except OSError as e:
+            print(f"Telemetry disabled: {e}")
+            self.path = None
+            self._fh = None
+
+    @staticmethod
+    def _default_run_id() -> str:
+        now = time.time()
+        return f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}-{os.getpid()}"
+
+    def _open_unique(self, results_dir: str):
+        """Creates a new telemetry file; never truncates an existing run (suffix -1, -2, ... on clash)."""
+        run_id = self.run_id
+        for n in range(1000):
+            if n:
+                run_id = f"{self.run_id}-{n}"
+            path = os.path.join(results_dir, f"telemetry_{run_id}.jsonl")
+            try:
+                fh = open(path, "x", encoding="utf-8")
+            except FileExistsError:
+                continue
+            self.run_id = run_id
+            self.path = path
+            return fh
+        raise FileExistsError(f"No free telemetry file name for run {self.run_id}")
+
+    @property
+    def enabled(self) -> bool:
+        return self._fh is not None
+
+    def record_event(self, stream: str, event: Dict[str, Any], planned: float, actual: float,
+                     click: Optional[Dict[str, Any]] = None) -> None:
+        """planned/actual are seconds relative to replay start."""
+        if self._fh is None:
+            return
+        lateness_ms = (actual - planned) * 1000.0
+        line: Dict[str, Any] = {
+            "kind": "event",
+            "stream": stream,
+            "type": event.get('type'),
+            "planned_ms": round(planned * 1000.0, 3),
+            "actual_ms": round(actual * 1000.0, 3),
+            "lateness_ms": round(lateness_ms, 3),
+        }
+        if click is not None:
+            line.update(click)
+        with self._lock:
+            self._seq += 1
+            line["seq"] = self._seq
+            self._counts[stream] = self._counts.get(stream, 0) + 1
+            self._lateness_ms.append(lateness_ms)
+            if click is not None:
+                self._record_click(click)
+            self._fh.write(json.dumps(line) + "\n")
+
+    def _record_click(self, click: Dict[str, Any]) -> None:
+        self._counts["clicks"] = self._counts.get("clicks", 0) + 1
+        if click.get("capture_ms") is not None:
+            self._capture_ms.append(click["capture_ms"])
+        if click.get("match_ms") is not None:
+            self._match_ms.append(click["match_ms"])
+        if click.get("confidence") is not None:
+            self._confidence.append(click["confidence"])
+        stage = click.get("stage") or "miss"
+        self._stages[stage] = self._stages.get(stage, 0) + 1
+
+    def set_extra(self, key: str, value: Any) -> None:
+        """Attach additional run-level values to the summary line."""
+        with self._lock:
+            self._extra[key] = value
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {
+                "kind": "summary",
+                "run_id": self.run_id,
+                "events": self._seq,
+                "counts": dict(self._counts),
+                "stages": dict(self._stages),
+            }
+            for name, values in (("lateness_ms", self._lateness_ms), ("capture_ms", self._capture_ms),
+                                 ("match_ms", self._match_ms), ("confidence", self._confidence)):
+                out[name] = {f"p{q}": _round(percentile(values, q)) for q in TELEMETRY_PERCENTILES}
+            out.update(self._extra)
+        return out
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        if self._fh is None:
+            return None
+        summary = self.summary()
+        with self._lock:
+            self._fh.write(json.dumps(summary) + "\n")
+            self._fh.close()
+            self._fh = None
+        print(f"Telemetry written to {self.path}")
+        print(f"Lateness p50/p95/p99 (ms): {summary['lateness_ms']}")
+        return summary
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
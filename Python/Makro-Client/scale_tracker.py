@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import platform
+from typing import Dict, List, Optional, Tuple
+
+from config import SCALE_FACTORS, SCALE_PROFILE, SCALE_LOCK_HITS, SCALE_CONFIDENCE_ALPHA, SCALE_UNLOCK_CONFIDENCE
+
+
+def machine_key(screen_size: Optional[Tuple[int, int]] = None) -> str:
+    """Host name plus screen resolution; a macro replays at a different scale per machine/monitor setup."""
+    node = platform.node() or "unknown"
+    if screen_size is None:
+        return node
+    return f"{node}:{screen_size[0]}x{screen_size[1]}"
+
+
+class SessionScaleTracker:
+    """
+    Learns the display scale between recording and replay from the scales of successful
+    matches. Once SCALE_LOCK_HITS clicks agree, searches try the locked scale and its
+    neighbours in SCALE_FACTORS first; when the full sweep has to step in and finds a
+    better match elsewhere, confidence drops and below SCALE_UNLOCK_CONFIDENCE the
+    scale is unlocked again.
+
+    The learned scale is stored per macro and machine in the macro's SCALE_PROFILE file.
+    """
+
+    def __init__(self, profile_path: Optional[str] = None, key: Optional[str] = None,
+                 factors: Optional[List[float]] = None):
+        self.profile_path = profile_path
+        self.key = key or machine_key()
+        self.factors = sorted(factors if factors is not None else SCALE_FACTORS)
+        self.scale: Optional[float] = None
+        self.confidence = 0.0
+        self.hits: Dict[float, int] = {}
+        self.narrowed_misses = 0
+        if profile_path:
+            self._load()
+
+    @property
+    def locked(self) -> bool:
+        return self.scale is not None
+
+    def nearest_factor(self, scale: float) -> float:
+        return min(self.factors, key=lambda f: abs(f - scale))
+
+    def candidate_scales(self) -> Optional[List[float]]:
+        """Scales to try first, or None for the full sweep."""
+        if self.scale is None:
+            return None
+        i = self.factors.index(self.nearest_factor(self.scale))
+        return self.factors[max(0, i - 1):i + 2]
+
+    def observe(self, scale: float) -> None:
+        """Scale of a confident match (match width / template width)."""
+        scale = self.nearest_factor(scale)
+        if self.scale is not None:
+            reference = self.scale
+        else:
+            counts = dict(self.hits)
+            counts[scale] = counts.get(scale, 0) + 1
+            reference = max(counts, key=counts.get)
+        agree = 1.0 if scale == reference else 0.0
+        self.confidence += SCALE_CONFIDENCE_ALPHA * (agree - self.confidence)
+        if self.scale is not None and self.confidence < SCALE_UNLOCK_CONFIDENCE:
+            self._unlock()
+        self.hits[scale] = self.hits.get(scale, 0) + 1
+        if self.scale is None:
+            leader = max(self.hits, key=self.hits.get)
+            if self.hits[leader] >= SCALE_LOCK_HITS:
+                self.scale = leader
+                self.confidence = max(self.confidence, self.hits[leader] / sum(self.hits.values()))
+                print(f"Display scale locked at {leader} (confidence {self.confidence:.2f})")
+
+    def miss(self) -> None:
+        """The full sweep found a better match than the locked scale and its neighbours."""
+        self.narrowed_misses += 1
+        self.confidence -= SCALE_CONFIDENCE_ALPHA * self.confidence
+        if self.scale is not None and self.confidence < SCALE_UNLOCK_CONFIDENCE:
+            self._unlock()
+
+    def _unlock(self) -> None:
+        print(f"Display scale {self.scale} unlocked (confidence {self.confidence:.2f})")
+        self.scale = None
+        self.hits = {}
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "scale": self.scale,
+            "scale_confidence": round(self.confidence, 3),
+            "scale_narrowed_misses": self.narrowed_misses,
+        }
+
+    # ---------------- persistence ----------------
+
+    def _read_profile(self) -> Dict[str, Dict]:
+        try:
+            with open(self.profile_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self) -> None:
+        entry = self._read_profile().get(self.key)
+        if not isinstance(entry, dict):
+            return
+        try:
+            scale = float(entry["scale"])
+            confidence = float(entry.get("confidence", 0.0))
+        except (KeyError, TypeError, ValueError):
+            return
+        if confidence >= SCALE_UNLOCK_CONFIDENCE:
+            self.scale = self.nearest_factor(scale)
+            self.confidence = confidence
+            print(f"Using learned display scale {self.scale} for {self.key} (confidence {confidence:.2f})")
+
+    def save(self) -> None:
+        if not self.profile_path or self.scale is None:
+            return
+        data = self._read_profile()
+        data[self.key] = {
+            "scale": self.scale,
+            "confidence": round(self.confidence, 3),
+            "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        tmp = self.profile_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.profile_path)
+        except OSError as e:
+            print(f"Could not save display scale profile: {e}")
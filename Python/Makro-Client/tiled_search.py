@@ -0,0 +1,137 @@
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from config import TILE_SIZE, TILE_WORKERS
+
+# (scaled template, cv2 method, weight) as built by ImageFinderClient._match_gray
+Task = Tuple[np.ndarray, int, float]
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _init_worker() -> None:
+    # one OpenCV thread per process, the pool already uses every core
+    cv2.setNumThreads(1)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            # spawn: the replay process runs input threads, forking those is unsafe
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker)
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def shutdown() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+            _POOL = None
+
+
+def tile_grid(width: int, height: int, tile_size: int = TILE_SIZE) -> List[Tuple[int, int, int, int]]:
+    """Non-overlapping tile cores (x0, y0, x1, y1) covering the image."""
+    return [(x, y, min(x + tile_size, width), min(y + tile_size, height))
+            for y in range(0, height, tile_size)
+            for x in range(0, width, tile_size)]
+
+
+def _match_tile(shm_name: str, shape: Tuple[int, int], core: Tuple[int, int, int, int],
+                tasks: Sequence[Task]) -> Optional[Tuple[float, int, int, int, int, int]]:
+    """
+    Runs in a worker process. The tile's search area is its core grown by the template
+    size to the right and bottom, but only match positions whose top-left lies inside
+    the core count, so a match on a tile border is reported by exactly one tile.
+    Returns (confidence, task index, x, y, w, h) in frame coordinates.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        x0, y0, x1, y1 = core
+        best = None
+        area = None
+        for i, (templ, method, weight) in enumerate(tasks):
+            th, tw = templ.shape[:2]
+            area = frame[y0:min(shape[0], y1 + th - 1), x0:min(shape[1], x1 + tw - 1)]
+            if area.shape[0] < th or area.shape[1] < tw:
+                continue
+            result = cv2.matchTemplate(area, templ, method)[:y1 - y0, :x1 - x0]
+            _, max_val, _, (lx, ly) = cv2.minMaxLoc(result)
+            confidence = float(max_val) * weight
+            if best is None or (confidence, -i) > (best[0], -best[1]):
+                best = (confidence, i, x0 + lx, y0 + ly, tw, th)
+        # views into the segment must be gone before close()
+        del frame, area
+        return best
+    finally:
+        shm.close()
+
+
+def tiled_match(search_area: np.ndarray, tasks: Sequence[Task], workers: int = TILE_WORKERS,
+                tile_size: int = TILE_SIZE, early_exit: float = 1.01) -> Optional[Tuple[float, int, int, int, int, int]]:
+    """
+    Scale x method grid over a large grayscale image, split into tiles that are matched
+    in parallel worker processes. The image is placed in shared memory once; workers map
+    it instead of receiving pickled copies. Returns (confidence, task index, x, y, w, h).
+    With early_exit the result is the best of all tiles up to the first one (in grid order)
+    that reaches it, independent of which worker finishes first; ties go to the earlier task
+    and then the earlier tile.
+    """
+    height, width = search_area.shape[:2]
+    shm = shared_memory.SharedMemory(create=True, size=max(1, search_area.nbytes))
+    try:
+        shared = np.ndarray(search_area.shape, dtype=np.uint8, buffer=shm.buf)
+        shared[:] = search_area
+        pool = _pool(workers)
+        futures = [pool.submit(_match_tile, shm.name, (height, width), core, list(tasks))
+                   for core in tile_grid(width, height, tile_size)]
+        position = {f: n for n, f in enumerate(futures)}
+        results = {}
+        # grid position of the first tile known to reach early_exit
+        stop = len(futures)
+        try:
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                n = position[future]
+                results[n] = future.result()
+                if results[n] is not None and results[n][0] >= early_exit and n < stop:
+                    stop = n
+                    for f in futures[stop + 1:]:
+                        f.cancel()
+                if stop < len(futures) and all(k in results for k in range(stop + 1)):
+                    break
+        finally:
+            for f in futures:
+                f.cancel()
+            # running tiles still map the segment; wait for them before unlinking
+            for f in futures:
+                if not f.cancelled():
+                    try:
+                        f.result()
+                    except Exception:
+                        pass
+        del shared
+        best = None
+        for n in range(min(stop + 1, len(futures))):
+            result = results[n]
+            if result is not None and (best is None or (result[0], -result[1]) > (best[0], -best[1])):
+                best = result
+        return best
+    finally:
+        shm.close()
+        shm.unlink()